@@ -2,14 +2,19 @@ import streamlit as st
 import os
 from dotenv import load_dotenv
 from src.models import ScenarioParams, FinancialReport
-from src.agents.landing_ai import LandingAIClient
+from src.agents.landing_ai import LandingAIClient, ADE_RESPONSE_CACHE_VERSION, parser_fingerprint
 from src.agents.simulator import SimulatorAgent
 from src.agents.critic import CriticAgent
 from src.agents.evaluator import EvaluatorAgent
+from src.cache import ContentCache
+from src.logic import run_monte_carlo, run_monte_carlo_cached, engine_fingerprint
 
 # Load env vars
 load_dotenv()
 
+# Paths in the instant preview shown before the full simulation finishes
+PREVIEW_PATHS = 1000
+
 # Page config
 st.set_page_config(
     page_title="Counterfactual Financial Oracle | AI Platform",
@@ -83,6 +88,12 @@ with st.sidebar:
     discount_rate_delta = st.slider("Discount Rate Delta", -500, 500, 0, help="Basis points change in discount rate")
     st.markdown(f'<div style="text-align: right; margin-top: -1rem; margin-bottom: 0.5rem;"><span class="mono" style="color: var(--warning); font-size: 0.875rem;">{discount_rate_delta:+d} bps</span></div>', unsafe_allow_html=True)
     
+    with st.expander("Valuation Model"):
+        forecast_years = st.slider("Forecast Horizon (years)", 3, 30, 5, help="Explicit forecast years before the terminal value")
+        terminal_growth_pct = st.slider("Terminal Growth (%)", 0.0, 5.0, 2.0, 0.25, help="Perpetual growth in the Gordon Growth terminal value")
+        base_discount_pct = st.slider("Base Discount Rate (%)", 3.0, 20.0, 8.0, 0.25, help="WACC before the discount rate delta")
+        latency_budget_ms = st.slider("Latency Budget (ms)", 0, 1000, 0, 50, help="Run as many paths as fit in this time (0 = fixed 10,000 paths)")
+    
     st.markdown("---")
     
     # Action Buttons
@@ -103,12 +114,35 @@ st.markdown("""
 """, unsafe_allow_html=True)
 
 # Main Area
+@st.cache_resource
+def get_extraction_caches() -> dict:
+    """Raw ADE responses and parsed reports keyed by PDF hash, shared across sessions and reruns"""
+    db_path = os.getenv("EXTRACTION_CACHE_PATH", "extraction_cache.sqlite") or None
+    return {
+        "response_cache": ContentCache(namespace="ade_response", version=ADE_RESPONSE_CACHE_VERSION, db_path=db_path),
+        "report_cache": ContentCache(namespace="ade_report", version=parser_fingerprint(), db_path=db_path),
+    }
+
 # Initialize Agents (moved here to be available for upload section)
-landing_client = LandingAIClient(api_key=os.getenv("LANDINGAI_API_KEY"))
+landing_client = LandingAIClient(
+    api_key=os.getenv("LANDINGAI_API_KEY"),
+    # Split PDFs longer than this many pages into concurrently extracted ranges (0 = off)
+    pages_per_range=int(os.getenv("LANDINGAI_PAGES_PER_RANGE", "0")) or None,
+    **get_extraction_caches()
+)
 simulator = SimulatorAgent(api_key=os.getenv("GEMINI_API_KEY"))
 critic = CriticAgent(api_key=os.getenv("DEEPSEEK_API_KEY"))
 evaluator = EvaluatorAgent()
 
+@st.cache_resource
+def get_simulation_cache() -> ContentCache:
+    """One result cache per server process, shared across sessions and reruns"""
+    return ContentCache(
+        namespace="simulation",
+        version=engine_fingerprint(),
+        db_path=os.getenv("SIMULATION_CACHE_PATH", "simulation_cache.sqlite") or None
+    )
+
 # File Upload Section
 st.markdown("## 📤 Upload Financial Document")
 st.markdown('<p style="font-size: 0.875rem; color: var(--muted-foreground); margin-bottom: 1.5rem;">Upload a PDF for AI extraction or a JSON file with pre-extracted data</p>', unsafe_allow_html=True)
@@ -145,6 +179,8 @@ with upload_tab1:
                         st.metric("Pages Processed", report.pdf_metadata.page_count)
                     with m_col3:
                         st.metric("Credits Used", f"{report.pdf_metadata.credit_usage:.1f}")
+                    if report.pdf_metadata.cache_status in ("report", "response"):
+                        st.caption(f"Served from the extraction cache ({report.pdf_metadata.cache_status}); no Landing AI call was made")
             except Exception as e:
                 st.error(f"Error extracting data: {str(e)}")
                 st.stop()
@@ -722,19 +758,33 @@ if report is not None:
         params = ScenarioParams(
             opex_delta_bps=opex_delta,
             revenue_growth_bps=rev_growth_delta,
-            discount_rate_bps=discount_rate_delta
+            discount_rate_bps=discount_rate_delta,
+            forecast_years=forecast_years,
+            terminal_growth=terminal_growth_pct / 100.0,
+            base_discount_rate=base_discount_pct / 100.0
         )
     
         # Store params in session state for debate access
         st.session_state.params = params
     
-        # 2. Simulation
+        # 2. Simulation: an instant coarse preview stays on screen while the full run and the LLM stages work
+        preview_slot = st.empty()
+        preview = run_monte_carlo_cached(get_simulation_cache(), report, params, num_simulations=PREVIEW_PATHS)
+        preview_slot.info(
+            f"Preview ({preview.num_paths:,} paths): median NPV {format_currency(preview.median_npv)} "
+            f"(P10 {format_currency(preview.p10_npv)}, P90 {format_currency(preview.p90_npv)}). Refining..."
+        )
         with st.spinner("Running Monte Carlo Simulation..."):
-            st.session_state.simulation_results = simulator.run_simulation(report, params)
+            if latency_budget_ms > 0:
+                agg_results = run_monte_carlo(report, params, num_simulations=1000000, time_budget=latency_budget_ms / 1000.0)
+            else:
+                agg_results = run_monte_carlo_cached(get_simulation_cache(), report, params)
+            st.session_state.simulation_results = simulator.run_simulation(report, params, agg_results)
         
         # 3. Critique
         with st.spinner("DeepSeek is reviewing the report..."):
             st.session_state.critic_verdict = critic.critique(report, st.session_state.simulation_results)
+        preview_slot.empty()
 
     # Display results if they exist in session state
     if st.session_state.simulation_results is not None:
@@ -743,7 +793,7 @@ if report is not None:
     
         # === SIMULATION RESULTS SECTION ===
         st.markdown("## 🎯 Simulation Results")
-        st.markdown('<p style="font-size: 0.875rem; color: var(--muted-foreground); margin-bottom: 1.5rem;">Monte Carlo • 10,000 iterations • DCF Model</p>', unsafe_allow_html=True)
+        st.markdown(f'<p style="font-size: 0.875rem; color: var(--muted-foreground); margin-bottom: 1.5rem;">Monte Carlo • {simulation_results.num_paths or 10000:,} iterations • DCF Model</p>', unsafe_allow_html=True)
     
         # Metric Cards
         col1, col2, col3 = st.columns(3)
@@ -0,0 +1,169 @@
+"""
+Analysis API routes (synchronous, no LLM calls)
+
+Handlers are plain `def`: FastAPI runs them in its threadpool, so the NumPy
+work they do inline never blocks the event loop.
+"""
+from fastapi import APIRouter, Depends, HTTPException, status
+from sqlalchemy.orm import Session
+
+from app.core.database import get_db
+from app.models.report import Report
+from app.api.schemas.analysis import ScenarioFields, SensitivityRequest, GoalSeekRequest, PortfolioRequest, SobolRequest
+from app.services.analysis_service import AnalysisService
+from app.domain.models import FinancialReport, ScenarioParams, SensitivityAnalysis, GoalSeekResult, PortfolioSimulation, SobolAnalysis
+
+router = APIRouter()
+
+
+def _load_report(report_id, db: Session) -> FinancialReport:
+    report = db.query(Report).filter(Report.id == report_id).first()
+    if not report:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Report not found"
+        )
+    return FinancialReport(**report.report_data)
+
+
+def _base_params(request: ScenarioFields) -> ScenarioParams:
+    return ScenarioParams(
+        revenue_growth_delta_bps=request.revenue_growth_delta_bps,
+        opex_delta_bps=request.opex_delta_bps,
+        discount_rate_delta_bps=request.discount_rate_delta_bps,
+        tax_rate_delta_bps=request.tax_rate_delta_bps,
+        sampler=request.sampler,
+        forecast_years=request.forecast_years,
+        terminal_growth=request.terminal_growth,
+        base_discount_rate=request.base_discount_rate,
+        revenue_growth_vol=request.revenue_growth_vol,
+        opex_shift_vol=request.opex_shift_vol,
+        tax_rate_vol=request.tax_rate_vol,
+        discount_rate_vol=request.discount_rate_vol,
+        driver_model=request.driver_model,
+        driver_correlation=request.driver_correlation,
+        precision=request.precision
+    )
+
+
+@router.post("/sensitivity", response_model=SensitivityAnalysis)
+def run_sensitivity(
+    request: SensitivityRequest,
+    db: Session = Depends(get_db)
+):
+    """
+    Tornado sweeps and 2-D grids of P10/median/P90 NPV
+    
+    Every sweep point and grid cell is simulated in one batch on common random
+    numbers, so the response comes back in well under a second.
+    """
+    financial_report = _load_report(request.report_id, db)
+    
+    try:
+        return AnalysisService().run_sensitivity(
+            financial_report,
+            _base_params(request),
+            request.ranges,
+            request.grids,
+            request.num_simulations
+        )
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+
+
+@router.post("/goal-seek", response_model=GoalSeekResult)
+def run_goal_seek(
+    request: GoalSeekRequest,
+    db: Session = Depends(get_db)
+):
+    """
+    Reverse stress test: which driver value puts median/P10/P90 NPV on target?
+    
+    Candidates are evaluated in batches on shared draws; a 400 means the target
+    is not reachable within [lower_bps, upper_bps].
+    """
+    financial_report = _load_report(request.report_id, db)
+    
+    try:
+        return AnalysisService().goal_seek(
+            financial_report,
+            _base_params(request),
+            request.driver,
+            request.target_npv,
+            request.statistic,
+            (request.lower_bps, request.upper_bps),
+            request.tolerance_bps,
+            request.num_simulations
+        )
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+
+
+@router.post("/portfolio", response_model=PortfolioSimulation)
+def run_portfolio(
+    request: PortfolioRequest,
+    db: Session = Depends(get_db)
+):
+    """
+    Value a basket of reports under one scenario
+    
+    Companies are simulated as (companies x paths x years) tensors in bounded
+    slices, optionally sharing a macro shock; no background task or agent calls.
+    Requests above MAX_PORTFOLIO_CELLS cells are rejected with a 422.
+    """
+    rows = db.query(Report).filter(Report.id.in_(request.report_ids)).all()
+    by_id = {row.id: row for row in rows}
+    missing = [str(report_id) for report_id in request.report_ids if report_id not in by_id]
+    if missing:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Reports not found: {', '.join(missing)}"
+        )
+    ordered = [by_id[report_id] for report_id in request.report_ids]
+    
+    try:
+        return AnalysisService().run_portfolio(
+            [FinancialReport(**row.report_data) for row in ordered],
+            _base_params(request),
+            [row.company_name or str(row.id) for row in ordered],
+            request.weights,
+            request.macro_correlation,
+            request.num_simulations
+        )
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+
+
+@router.post("/sobol", response_model=SobolAnalysis)
+def run_sobol(
+    request: SobolRequest,
+    db: Session = Depends(get_db)
+):
+    """
+    First-order and total Sobol indices of NPV per stochastic driver
+    
+    The Saltelli design is evaluated in a few vectorized passes, so even the
+    per-year model with four drivers answers in well under a second.
+    """
+    financial_report = _load_report(request.report_id, db)
+    
+    try:
+        return AnalysisService().sobol_indices(
+            financial_report,
+            _base_params(request),
+            request.num_samples
+        )
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
@@ -9,7 +9,7 @@ import uuid
 from app.core.database import get_db
 from app.models.report import Report
 from app.api.schemas.reports import ReportResponse, ReportSummary
-from app.services.landing_ai_service import LandingAIService
+from app.services.landing_ai_service import LandingAIService, extraction_response_cache, extraction_report_cache
 
 router = APIRouter()
 
@@ -145,6 +145,12 @@ async def upload_report(
         )
 
 
+@router.get("/cache/stats")
+async def get_extraction_cache_stats():
+    """Hit/miss counters and sizes of the PDF extraction caches"""
+    return {cache.namespace: cache.stats() for cache in (extraction_response_cache, extraction_report_cache)}
+
+
 @router.get("/{report_id}", response_model=ReportResponse)
 async def get_report(
     report_id: uuid.UUID,
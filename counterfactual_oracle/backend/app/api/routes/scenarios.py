@@ -1,5 +1,6 @@
 """Scenario API routes"""
 from fastapi import APIRouter, Depends, HTTPException, status, BackgroundTasks
+from fastapi.concurrency import run_in_threadpool
 from fastapi.responses import FileResponse
 from sqlalchemy.orm import Session
 import uuid
@@ -9,7 +10,7 @@ from app.core.database import get_db
 from app.models.report import Report
 from app.models.scenario import Scenario
 from app.api.schemas.scenarios import ScenarioCreate, ScenarioResponse, ScenarioStatus
-from app.services.simulation_service import SimulationService
+from app.services.simulation_service import SimulationService, simulation_cache
 from app.services.agents_service import AgentsService
 from app.services.report_service import ReportService
 from app.domain.models import FinancialReport, ScenarioParams
@@ -43,21 +44,34 @@ def execute_scenario_task(
             
             # Initialize services
             simulation_service = SimulationService()
-            agents_service = AgentsService()
 
             # Step 1: Run Monte Carlo simulation
             scenario.progress = 30
             db.commit()
             
+            refined_results = simulation_service.run_refined(
+                financial_report,
+                scenario_params
+            )
+            
+            # Publish the refined tier straight away; the LLM stages below take much longer.
+            # Until status is COMPLETED a refined scenario has no critic or debate output yet
+            scenario.simulation_results = refined_results.model_dump()
+            scenario.results_tier = "refined"
+            db.commit()
+            
             simulation_results = simulation_service.run_simulation(
                 financial_report, 
-                scenario_params
+                scenario_params,
+                refined_results
             )
             
             # Step 2: Run critic
             scenario.progress = 50
             db.commit()
             
+            agents_service = AgentsService()
+            
             critic_verdict = agents_service.critique(
                 financial_report,
                 simulation_results
@@ -121,7 +135,18 @@ async def create_scenario(
         "revenue_growth_delta_bps": scenario_data.revenue_growth_delta_bps,
         "opex_delta_bps": scenario_data.opex_delta_bps,
         "discount_rate_delta_bps": scenario_data.discount_rate_delta_bps,
-        "tax_rate_delta_bps": scenario_data.tax_rate_delta_bps
+        "tax_rate_delta_bps": scenario_data.tax_rate_delta_bps,
+        "sampler": scenario_data.sampler,
+        "driver_model": scenario_data.driver_model,
+        "revenue_growth_vol": scenario_data.revenue_growth_vol,
+        "opex_shift_vol": scenario_data.opex_shift_vol,
+        "tax_rate_vol": scenario_data.tax_rate_vol,
+        "discount_rate_vol": scenario_data.discount_rate_vol,
+        "driver_correlation": scenario_data.driver_correlation,
+        "forecast_years": scenario_data.forecast_years,
+        "terminal_growth": scenario_data.terminal_growth,
+        "base_discount_rate": scenario_data.base_discount_rate,
+        "precision": scenario_data.precision
     }
     
     # Create scenario record
@@ -132,11 +157,23 @@ async def create_scenario(
         params=params,
         progress=0
     )
+    
+    # Instant coarse preview; invalid inputs are left for the background task to report.
+    # The simulation and its cache I/O run in the threadpool, off the event loop
+    try:
+        preview = await run_in_threadpool(
+            SimulationService().run_preview, FinancialReport(**report.report_data), ScenarioParams(**params)
+        )
+        scenario.preview_results = preview.model_dump()
+        scenario.results_tier = "preview"
+    except ValueError:
+        pass
+    
     db.add(scenario)
     db.commit()
     db.refresh(scenario)
     
-    # Trigger background task
+    # Trigger background task (refines to the full path count, then runs the agents)
     background_tasks.add_task(
         execute_scenario_task,
         scenario.id,
@@ -151,6 +188,8 @@ async def create_scenario(
         status=scenario.status,
         params=scenario.params,
         simulation_results=scenario.simulation_results,
+        preview_results=scenario.preview_results,
+        results_tier=scenario.results_tier,
         critic_verdict=scenario.critic_verdict,
         debate_result=scenario.debate_result,
         final_verdict=scenario.final_verdict,
@@ -161,6 +200,12 @@ async def create_scenario(
     )
 
 
+@router.get("/cache/stats")
+async def get_simulation_cache_stats():
+    """Hit/miss counters and sizes of the simulation result cache"""
+    return simulation_cache.stats()
+
+
 @router.get("/{scenario_id}", response_model=ScenarioResponse)
 async def get_scenario(
     scenario_id: uuid.UUID,
@@ -181,6 +226,8 @@ async def get_scenario(
         status=scenario.status,
         params=scenario.params,
         simulation_results=scenario.simulation_results,
+        preview_results=scenario.preview_results,
+        results_tier=scenario.results_tier,
         critic_verdict=scenario.critic_verdict,
         debate_result=scenario.debate_result,
         final_verdict=scenario.final_verdict,
@@ -208,7 +255,8 @@ async def get_scenario_status(
         id=scenario.id,
         status=scenario.status,
         progress=scenario.progress,
-        error_message=scenario.error_message
+        error_message=scenario.error_message,
+        results_tier=scenario.results_tier
     )
 
 
@@ -228,6 +276,8 @@ async def list_scenarios(
             status=s.status,
             params=s.params,
             simulation_results=s.simulation_results,
+            preview_results=s.preview_results,
+            results_tier=s.results_tier,
             critic_verdict=s.critic_verdict,
             debate_result=s.debate_result,
             final_verdict=s.final_verdict,
@@ -0,0 +1,85 @@
+"""Pydantic schemas for analysis API"""
+from pydantic import BaseModel, Field, model_validator
+from typing import Dict, List, Literal, Optional, Tuple
+from uuid import UUID
+
+
+SensitivityDriver = Literal[
+    "opex_delta_bps", "revenue_growth_delta_bps", "discount_rate_delta_bps", "tax_rate_delta_bps"
+]
+
+
+class ScenarioFields(BaseModel):
+    """Scenario parameters shared by analysis requests"""
+    revenue_growth_delta_bps: float = 0.0
+    opex_delta_bps: float = 0.0
+    discount_rate_delta_bps: float = 0.0
+    tax_rate_delta_bps: float = 0.0
+    sampler: Literal["pseudo", "antithetic", "sobol", "lhs"] = "pseudo"
+    forecast_years: int = Field(default=5, ge=1, le=50)
+    terminal_growth: float = 0.02
+    base_discount_rate: float = 0.08
+    # Stochastic drivers (see ScenarioParams)
+    revenue_growth_vol: float = Field(default=0.02, ge=0)
+    opex_shift_vol: float = Field(default=0.01, ge=0)
+    tax_rate_vol: float = Field(default=0.0, ge=0)
+    discount_rate_vol: float = Field(default=0.0, ge=0)
+    driver_model: Literal["static", "per_year"] = "static"
+    driver_correlation: Optional[List[List[float]]] = None
+    precision: Literal["float64", "float32"] = "float64"
+
+
+class BaseScenarioRequest(ScenarioFields):
+    """Report plus the base scenario that analysis requests vary"""
+    report_id: UUID
+
+
+class SensitivityRequest(BaseScenarioRequest):
+    """Request schema for a sensitivity sweep around a base scenario (drivers not swept stay at base)"""
+    # Values (bps) to sweep per driver, e.g. {"opex_delta_bps": [-200, -100, 0, 100, 200]}
+    ranges: Dict[SensitivityDriver, List[float]]
+    # Driver pairs to evaluate on a full 2-D grid
+    grids: List[Tuple[SensitivityDriver, SensitivityDriver]] = Field(default_factory=list)
+    num_simulations: int = Field(default=5000, ge=100, le=100000)
+
+
+class GoalSeekRequest(BaseScenarioRequest):
+    """Request schema for solving a driver value against an NPV target (the driver's base value is ignored)"""
+    driver: SensitivityDriver
+    target_npv: float = 0.0
+    statistic: Literal["p10", "median", "p90"] = "median"
+    lower_bps: float = -2000.0
+    upper_bps: float = 2000.0
+    tolerance_bps: float = Field(default=1.0, gt=0)
+    num_simulations: int = Field(default=5000, ge=100, le=100000)
+
+
+# Largest portfolio run accepted, in companies x paths x forecast years cells
+# (e.g. 200 companies x 100,000 paths x 5 years)
+MAX_PORTFOLIO_CELLS = 100_000_000
+
+
+class PortfolioRequest(ScenarioFields):
+    """Request schema for valuing a basket of reports under one scenario"""
+    report_ids: List[UUID] = Field(min_length=1, max_length=1000)
+    # Holding per report (defaults to 1 each); portfolio NPV is the weighted sum
+    weights: Optional[List[float]] = None
+    # Share of shock variance from a common macro factor (0 = independent, 1 = fully shared)
+    macro_correlation: float = Field(default=0.0, ge=0.0, le=1.0)
+    num_simulations: int = Field(default=5000, ge=100, le=100000)
+
+    @model_validator(mode="after")
+    def check_size(self) -> "PortfolioRequest":
+        cells = len(self.report_ids) * self.num_simulations * self.forecast_years
+        if cells > MAX_PORTFOLIO_CELLS:
+            raise ValueError(
+                f"Portfolio run too large: {len(self.report_ids)} reports x {self.num_simulations} paths x "
+                f"{self.forecast_years} years = {cells:,} cells (limit {MAX_PORTFOLIO_CELLS:,})"
+            )
+        return self
+
+
+class SobolRequest(BaseScenarioRequest):
+    """Request schema for variance-based (Sobol) sensitivity of NPV to the stochastic drivers"""
+    # Base sample size N; the run costs (drivers + 2) * N paths
+    num_samples: int = Field(default=4096, ge=64, le=65536)
@@ -1,6 +1,6 @@
 """Pydantic schemas for scenario API"""
-from pydantic import BaseModel
-from typing import Optional, Dict, Any
+from pydantic import BaseModel, Field
+from typing import Optional, Dict, Any, List, Literal
 from uuid import UUID
 from datetime import datetime
 
@@ -13,6 +13,20 @@ class ScenarioCreate(BaseModel):
     opex_delta_bps: float = 0.0
     discount_rate_delta_bps: float = 0.0
     tax_rate_delta_bps: float = 0.0
+    sampler: Literal["pseudo", "antithetic", "sobol", "lhs"] = "pseudo"
+    # Stochastic driver model (see ScenarioParams)
+    driver_model: Literal["static", "per_year"] = "static"
+    revenue_growth_vol: float = 0.02
+    opex_shift_vol: float = 0.01
+    tax_rate_vol: float = 0.0
+    discount_rate_vol: float = 0.0
+    driver_correlation: Optional[List[List[float]]] = None
+    # Valuation horizon and terminal value
+    forecast_years: int = Field(default=5, ge=1, le=50)
+    terminal_growth: float = 0.02
+    base_discount_rate: float = 0.08
+    # "float32" halves simulation memory (see ScenarioParams)
+    precision: Literal["float64", "float32"] = "float64"
 
 
 class ScenarioStatus(BaseModel):
@@ -21,6 +35,7 @@ class ScenarioStatus(BaseModel):
     status: str  # PENDING, RUNNING, COMPLETED, FAILED
     progress: int  # 0-100
     error_message: Optional[str] = None
+    results_tier: Optional[str] = None  # preview, refined (agent outputs arrive at COMPLETED)
     
     class Config:
         from_attributes = True
@@ -34,6 +49,11 @@ class ScenarioResponse(BaseModel):
     status: str
     params: Dict[str, Any]
     simulation_results: Optional[Dict[str, Any]] = None
+    preview_results: Optional[Dict[str, Any]] = None
+    # preview, refined. "refined" only means simulation_results hold the full
+    # run: critic_verdict, debate_result and final_verdict stay empty until
+    # status is COMPLETED
+    results_tier: Optional[str] = None
     critic_verdict: Optional[Dict[str, Any]] = None
     debate_result: Optional[Dict[str, Any]] = None
     final_verdict: Optional[str] = None
@@ -11,6 +11,12 @@ class Settings(BaseSettings):
     gemini_api_key: str = ""
     landingai_api_key: str = ""
     
+    # Landing AI page-range extraction: PDFs longer than this many pages are split
+    # and the ranges extracted concurrently (0 = upload the whole PDF at once)
+    landingai_pages_per_range: int = 0
+    landingai_max_concurrency: int = 4
+    landingai_max_retries: int = 2
+    
     # Database
     database_url: str = "sqlite:///./counterfactual.db"
     
@@ -21,6 +27,27 @@ class Settings(BaseSettings):
     # CORS
     cors_origins: List[str] = ["http://localhost:5173", "http://localhost:3000"]
     
+    # Monte Carlo execution (shards > 1 runs on a process pool)
+    simulation_num_shards: int = 1
+    simulation_max_workers: int | None = None
+    # Paths in the instant preview returned when a scenario is created
+    simulation_preview_paths: int = 1000
+    # Wall-clock budget per scenario simulation in seconds (unset = fixed 10,000 paths, cached)
+    simulation_time_budget_s: float | None = None
+    # Base sample size for Sobol indices attached to scenario results (0 = off)
+    simulation_sobol_samples: int = 0
+    
+    # Simulation result cache (empty path keeps it in memory only)
+    simulation_cache_path: str = "./simulation_cache.sqlite"
+    simulation_cache_memory_mb: int = 64
+    simulation_cache_disk_mb: int = 512
+    
+    # PDF extraction cache, keyed by the PDF's SHA-256: ADE response markdown and
+    # metadata, and parsed reports (empty path keeps it in memory only; limits apply to each)
+    extraction_cache_path: str = "./extraction_cache.sqlite"
+    extraction_cache_memory_mb: int = 64
+    extraction_cache_disk_mb: int = 1024
+    
     # Optional: Redis for background jobs
     redis_url: str | None = None
     
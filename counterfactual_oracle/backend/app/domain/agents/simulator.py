@@ -1,6 +1,7 @@
 import google.generativeai as genai
 import json
 import os
+from typing import Optional
 from app.domain.models import FinancialReport, ScenarioParams, AggregatedSimulation
 from app.domain.logic import run_monte_carlo
 
@@ -9,15 +10,18 @@ class SimulatorAgent:
         genai.configure(api_key=api_key)
         self.model = genai.GenerativeModel('gemini-2.0-flash-exp')
 
-    def run_simulation(self, report: FinancialReport, params: ScenarioParams) -> AggregatedSimulation:
+    def run_simulation(self, report: FinancialReport, params: ScenarioParams,
+                       agg_results: Optional[AggregatedSimulation] = None) -> AggregatedSimulation:
         """
         Runs the simulation pipeline.
         1. Uses Python logic for Monte Carlo (more reliable for math than LLM).
+           Pass `agg_results` to reuse an already computed run.
         2. Uses LLM to generate the qualitative "Assumption Log" and "Traceability" based on the results.
         """
         
         # 1. Run Math
-        agg_results = run_monte_carlo(report, params)
+        if agg_results is None:
+            agg_results = run_monte_carlo(report, params)
         
         # 2. Generate Qualitative Analysis via LLM
         prompt = f"""
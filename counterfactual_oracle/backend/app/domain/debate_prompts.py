@@ -183,7 +183,7 @@ SIMULATION PARAMETERS (The "Knobs"):
 - Revenue Growth Delta: {params.revenue_growth_delta_bps} bps (Shift in annual growth rate)
 - Discount Rate Delta: {params.discount_rate_delta_bps} bps
 
-SIMULATION OUTPUT (5-Year Forecast):
+SIMULATION OUTPUT ({params.forecast_years}-Year Forecast):
 {forecast_str}
 - Median NPV: ${simulation.median_npv:,.0f}
 {fcf_section}
@@ -253,7 +253,7 @@ SIMULATION PARAMETERS (The "Knobs"):
 - Revenue Growth Delta: {params.revenue_growth_delta_bps} bps
 - Discount Rate Delta: {params.discount_rate_delta_bps} bps
 
-SIMULATION OUTPUT (5-Year Forecast):
+SIMULATION OUTPUT ({params.forecast_years}-Year Forecast):
 {forecast_str}
 - Median NPV: ${simulation.median_npv:,.0f}
 {fcf_section}
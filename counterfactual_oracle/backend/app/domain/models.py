@@ -1,5 +1,5 @@
 from pydantic import BaseModel, Field
-from typing import Dict, List, Optional, Any
+from typing import Dict, List, Optional, Any, Literal
 
 # === SOURCE METADATA ===
 
@@ -19,6 +19,17 @@ class PDFMetadata(BaseModel):
     credit_usage: float
     job_id: str
     filename: Optional[str] = None
+    # Page-range extraction: [{"pages": [first, last], "attempts": n}] in page order
+    page_ranges: Optional[List[Dict[str, Any]]] = None
+    # Extraction cache: SHA-256 of the PDF bytes, the tier that answered
+    # ("report", "response" or "miss"; None when caching is off) and cache stats
+    content_sha256: Optional[str] = None
+    cache_status: Optional[Literal["report", "response", "miss"]] = None
+    cache_stats: Optional[Dict[str, Dict[str, Any]]] = None
+    # On a cache hit: duration and credits of the extraction that filled the cache
+    # (duration_ms and credit_usage then describe the hit itself)
+    original_duration_ms: Optional[float] = None
+    original_credit_usage: Optional[float] = None
 
 # === TIER 1: MUST-HAVE FINANCIAL STATEMENTS ===
 
@@ -149,6 +160,27 @@ class ScenarioParams(BaseModel):
     revenue_growth_delta_bps: float = 0.0  # Fixed: was revenue_growth_bps
     discount_rate_delta_bps: float = 0.0   # Fixed: was discount_rate_bps
     tax_rate_delta_bps: float = 0.0
+    # Random draw scheme: plain pseudo-random, antithetic pairs,
+    # scrambled Sobol (quasi-Monte Carlo) or Latin hypercube
+    sampler: Literal["pseudo", "antithetic", "sobol", "lhs"] = "pseudo"
+    # Driver volatilities (annual standard deviations)
+    revenue_growth_vol: float = 0.02
+    opex_shift_vol: float = 0.01
+    tax_rate_vol: float = 0.0
+    discount_rate_vol: float = 0.0
+    # "static": one growth and OpEx draw per path, held for every year (tax and
+    # discount vols and the correlation are ignored); "per_year": all four
+    # drivers redrawn every year, correlated within the year
+    driver_model: Literal["static", "per_year"] = "static"
+    # Correlation over (revenue growth, OpEx shift, tax rate, discount rate); identity if omitted
+    driver_correlation: Optional[List[List[float]]] = None
+    # Valuation horizon and terminal value (Gordon Growth on the final year's FCF)
+    forecast_years: int = Field(default=5, ge=1, le=50)
+    terminal_growth: float = 0.02
+    base_discount_rate: float = 0.08  # WACC before the scenario delta
+    # Path matrix dtype: "float32" halves simulation memory; NPVs and
+    # quantiles are still accumulated in float64
+    precision: Literal["float64", "float32"] = "float64"
 
 class SimulationResult(BaseModel):
     scenario_id: int
@@ -158,16 +190,39 @@ class SimulationResult(BaseModel):
     fcf: float
     npv: float
     key_driver: str
-    # Multi-year forecasts (t1 to t5)
+    # Multi-year forecasts (t1 to tN)
     revenue_forecast: List[float] = Field(default_factory=list)
     ebitda_forecast: List[float] = Field(default_factory=list)
     net_income_forecast: List[float] = Field(default_factory=list)
     fcf_forecast: List[float] = Field(default_factory=list)
 
+class SobolIndex(BaseModel):
+    driver: str
+    # Share of NPV variance explained by the driver alone
+    first_order: float
+    # Share including every interaction the driver takes part in
+    total: float
+
+class SobolAnalysis(BaseModel):
+    """Variance-based attribution of NPV to the stochastic drivers (Saltelli scheme)"""
+    indices: List[SobolIndex]  # sorted by total index, largest first
+    npv_variance: float
+    # 1 - sum of first-order indices: variance only explained by interactions
+    interaction_share: float
+    num_samples: int
+    num_evaluations: int
+
 class AggregatedSimulation(BaseModel):
     median_npv: float
     p10_npv: float
     p90_npv: float
+    # Tail risk as NPV levels: VaR is the 1%/5% quantile, CVaR (expected
+    # shortfall) the mean NPV of the paths at or below it
+    var_1_npv: Optional[float] = None
+    var_5_npv: Optional[float] = None
+    cvar_1_npv: Optional[float] = None
+    cvar_5_npv: Optional[float] = None
+    prob_negative_npv: Optional[float] = None
     median_revenue: float
     median_ebitda: float
     median_fcf: float
@@ -175,10 +230,87 @@ class AggregatedSimulation(BaseModel):
     revenue_forecast_p50: List[float] = Field(default_factory=list)
     ebitda_forecast_p50: List[float] = Field(default_factory=list)
     fcf_forecast_p50: List[float] = Field(default_factory=list)
+    # FCF fan chart: percentile band ("p5" ... "p95") -> one value per forecast year
+    fcf_fan_chart: Dict[str, List[float]] = Field(default_factory=dict)
+    # Path count actually simulated, and the NPV quantile tolerance reached (adaptive runs)
+    num_paths: Optional[int] = None
+    achieved_tolerance: Optional[float] = None
+    # Standard error of each NPV quantile (order statistics one binomial sd apart)
+    standard_errors: Dict[str, float] = Field(default_factory=dict)
+    # Streaming (sketch-based) aggregation: rank error and [low, high] band per quantile
+    quantile_rank_error: Optional[float] = None
+    quantile_error_bounds: Dict[str, List[float]] = Field(default_factory=dict)
+    # Global sensitivity of NPV (only when requested, see `run_monte_carlo`)
+    sobol_indices: Optional[SobolAnalysis] = None
     assumption_log: List[str]
     traceability: Dict[str, str]
     simulation_runs: List[SimulationResult]
 
+# === SENSITIVITY ANALYSIS MODELS ===
+
+class SensitivityPoint(BaseModel):
+    value: float
+    p10_npv: float
+    median_npv: float
+    p90_npv: float
+
+class TornadoBar(BaseModel):
+    """One driver swept from low to high with the others held at base"""
+    driver: str
+    low_value: float
+    high_value: float
+    low_npv: float
+    high_npv: float
+    swing: float
+    points: List[SensitivityPoint] = Field(default_factory=list)
+
+class SensitivityGrid(BaseModel):
+    """2-D surface: matrices are indexed [y][x]"""
+    x_driver: str
+    y_driver: str
+    x_values: List[float]
+    y_values: List[float]
+    p10_npv: List[List[float]]
+    median_npv: List[List[float]]
+    p90_npv: List[List[float]]
+
+class SensitivityAnalysis(BaseModel):
+    base_median_npv: float
+    base_p10_npv: float
+    base_p90_npv: float
+    num_simulations: int
+    num_scenarios: int
+    tornado: List[TornadoBar] = Field(default_factory=list)
+    grids: List[SensitivityGrid] = Field(default_factory=list)
+
+class GoalSeekResult(BaseModel):
+    """Driver setting that puts an NPV statistic on target"""
+    driver: str
+    statistic: str
+    target_npv: float
+    solution_bps: float
+    achieved_npv: float
+    bracket: List[float]
+    converged: bool
+    iterations: int
+    evaluations: int
+    num_simulations: int
+
+class PortfolioSimulation(BaseModel):
+    """Basket of reports valued under one scenario on shared draws"""
+    companies: List[str]
+    weights: List[float]
+    company_results: List[AggregatedSimulation]
+    # Weighted portfolio NPV, quantiles taken across paths
+    median_npv: float
+    p10_npv: float
+    p90_npv: float
+    fcf_forecast_p50: List[float] = Field(default_factory=list)
+    # Portfolio P10 minus the weighted sum of company P10s (>= 0 when shocks diversify)
+    diversification_benefit: float
+    macro_correlation: float
+    num_paths: int
+
 class CriticVerdict(BaseModel):
     verdict: str
     balance_sheet_check: Dict[str, Any]
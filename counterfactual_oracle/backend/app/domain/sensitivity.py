@@ -0,0 +1,125 @@
+"""
+Sensitivity Analysis
+
+Tornado sweeps and 2-D grids over ScenarioParams, evaluated as one batch of
+scenarios on common random numbers. No LLM calls: this answers "which driver
+matters?" without running a full scenario pipeline per parameter nudge.
+"""
+
+import numpy as np
+from itertools import product
+from typing import Dict, List, Optional, Sequence, Tuple
+from app.domain.models import FinancialReport, ScenarioParams, SensitivityPoint, TornadoBar, SensitivityGrid, SensitivityAnalysis
+from app.domain.logic import simulate_batch, select_quantiles
+
+# ScenarioParams fields that can be swept (values are the field's bps setting)
+SENSITIVITY_DRIVERS = ("opex_delta_bps", "revenue_growth_delta_bps", "discount_rate_delta_bps", "tax_rate_delta_bps")
+
+# Upper bound on scenario x path x year cells simulated at once
+MAX_BATCH_CELLS = 5_000_000
+
+def npv_quantile_table(base_report: FinancialReport, scenarios: List[ScenarioParams],
+                       num_simulations: int = 5000, seed: int = 42) -> np.ndarray:
+    """
+    (scenarios x 3) array of [P10, median, P90] NPV on shared draws.
+
+    Scenarios are simulated in slices of at most MAX_BATCH_CELLS cells; every
+    slice reuses the same seed, so all scenarios still see identical shocks.
+    """
+    forecast_years = max((p.forecast_years for p in scenarios), default=1)
+    per_slice = max(1, MAX_BATCH_CELLS // (num_simulations * forecast_years))
+    table = np.empty((len(scenarios), 3))
+    for start in range(0, len(scenarios), per_slice):
+        chunk = scenarios[start:start + per_slice]
+        npv = simulate_batch(base_report, chunk, num_simulations, seed).npv
+        table[start:start + len(chunk)] = select_quantiles(npv.T, [0.10, 0.50, 0.90])[0].T
+    return table
+
+def _check_drivers(ranges: Dict[str, Sequence[float]], grids: Sequence[Tuple[str, str]]) -> None:
+    for driver, values in ranges.items():
+        if driver not in SENSITIVITY_DRIVERS:
+            raise ValueError(f"Unknown sensitivity driver '{driver}', expected one of {SENSITIVITY_DRIVERS}")
+        if len(values) == 0:
+            raise ValueError(f"Range for '{driver}' is empty")
+    for x_driver, y_driver in grids:
+        if x_driver == y_driver:
+            raise ValueError(f"Grid needs two different drivers, got '{x_driver}' twice")
+        for driver in (x_driver, y_driver):
+            if driver not in ranges:
+                raise ValueError(f"Grid driver '{driver}' has no range")
+
+def run_sensitivity(base_report: FinancialReport, base_params: ScenarioParams,
+                    ranges: Dict[str, Sequence[float]], grids: Optional[Sequence[Tuple[str, str]]] = None,
+                    num_simulations: int = 5000, seed: int = 42) -> SensitivityAnalysis:
+    """
+    One-at-a-time tornado sweeps plus optional 2-D grids around `base_params`.
+
+    - Tornado: each driver in `ranges` is set to every listed value while the
+      others stay at their base setting. Bars are sorted by NPV swing between
+      the lowest and highest value, largest first.
+    - Grids: every (x, y) combination of the two drivers' ranges.
+
+    The base case, all sweep points and all grid cells are evaluated as one
+    batch on common random numbers, so differences reflect the parameters only.
+    """
+    grids = list(grids or [])
+    _check_drivers(ranges, grids)
+
+    scenarios = [base_params]
+    sweeps: List[Tuple[str, List[float], slice]] = []
+    for driver, values in ranges.items():
+        values = sorted(float(v) for v in values)
+        start = len(scenarios)
+        scenarios.extend(base_params.model_copy(update={driver: v}) for v in values)
+        sweeps.append((driver, values, slice(start, len(scenarios))))
+
+    grid_slices: List[Tuple[str, str, List[float], List[float], slice]] = []
+    for x_driver, y_driver in grids:
+        x_values = sorted(float(v) for v in ranges[x_driver])
+        y_values = sorted(float(v) for v in ranges[y_driver])
+        start = len(scenarios)
+        scenarios.extend(base_params.model_copy(update={x_driver: x, y_driver: y})
+                         for y, x in product(y_values, x_values))
+        grid_slices.append((x_driver, y_driver, x_values, y_values, slice(start, len(scenarios))))
+
+    table = npv_quantile_table(base_report, scenarios, num_simulations, seed)
+
+    tornado = []
+    for driver, values, rows in sweeps:
+        points = [SensitivityPoint(value=v, p10_npv=p10, median_npv=p50, p90_npv=p90)
+                  for v, (p10, p50, p90) in zip(values, table[rows].tolist())]
+        tornado.append(TornadoBar(
+            driver=driver,
+            low_value=points[0].value,
+            high_value=points[-1].value,
+            low_npv=points[0].median_npv,
+            high_npv=points[-1].median_npv,
+            swing=abs(points[-1].median_npv - points[0].median_npv),
+            points=points
+        ))
+    tornado.sort(key=lambda bar: bar.swing, reverse=True)
+
+    surfaces = []
+    for x_driver, y_driver, x_values, y_values, rows in grid_slices:
+        # Rows follow y, columns follow x (heatmap z-matrix layout)
+        cells = table[rows].reshape(len(y_values), len(x_values), 3)
+        surfaces.append(SensitivityGrid(
+            x_driver=x_driver,
+            y_driver=y_driver,
+            x_values=x_values,
+            y_values=y_values,
+            p10_npv=cells[..., 0].tolist(),
+            median_npv=cells[..., 1].tolist(),
+            p90_npv=cells[..., 2].tolist()
+        ))
+
+    base_p10, base_median, base_p90 = table[0].tolist()
+    return SensitivityAnalysis(
+        base_median_npv=base_median,
+        base_p10_npv=base_p10,
+        base_p90_npv=base_p90,
+        num_simulations=num_simulations,
+        num_scenarios=len(scenarios),
+        tornado=tornado,
+        grids=surfaces
+    )
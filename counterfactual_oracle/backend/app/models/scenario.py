@@ -16,7 +16,9 @@ class Scenario(Base):
     name = Column(String(255), nullable=True)
     status = Column(String(20), default="PENDING")  # PENDING, RUNNING, COMPLETED, FAILED
     params = Column(JSON, nullable=False)  # ScenarioParams JSON
-    simulation_results = Column(JSON, nullable=True)  # AggregatedSimulation JSON
+    simulation_results = Column(JSON, nullable=True)  # AggregatedSimulation JSON (full path count)
+    preview_results = Column(JSON, nullable=True)  # AggregatedSimulation JSON (coarse, low path count)
+    results_tier = Column(String(20), nullable=True)  # preview, refined: which simulation results are current (agent outputs may still be pending)
     critic_verdict = Column(JSON, nullable=True)  # CriticVerdict JSON
     debate_result = Column(JSON, nullable=True)  # DebateResult JSON
     final_verdict = Column(String(50), nullable=True)  # Buy/Hold/Sell
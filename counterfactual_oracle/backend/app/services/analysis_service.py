@@ -0,0 +1,73 @@
+"""Service for batch what-if analysis (no LLM calls)"""
+from typing import Dict, List, Optional, Sequence, Tuple
+from app.domain.models import FinancialReport, ScenarioParams, SensitivityAnalysis, GoalSeekResult, PortfolioSimulation, SobolAnalysis
+from app.domain.logic import sobol_indices
+from app.domain.sensitivity import run_sensitivity
+from app.domain.goal_seek import goal_seek
+from app.domain.portfolio import run_portfolio
+
+
+class AnalysisService:
+    """Service for sensitivity sweeps, goal seeking, portfolio runs and Sobol indices"""
+    
+    def run_sensitivity(
+        self,
+        report: FinancialReport,
+        base_params: ScenarioParams,
+        ranges: Dict[str, Sequence[float]],
+        grids: List[Tuple[str, str]],
+        num_simulations: int
+    ) -> SensitivityAnalysis:
+        """Tornado sweeps and 2-D grids evaluated in one batch on shared draws"""
+        return run_sensitivity(report, base_params, ranges, grids, num_simulations)
+    
+    def goal_seek(
+        self,
+        report: FinancialReport,
+        base_params: ScenarioParams,
+        driver: str,
+        target_npv: float,
+        statistic: str,
+        bounds: Tuple[float, float],
+        tolerance_bps: float,
+        num_simulations: int
+    ) -> GoalSeekResult:
+        """Solve for the driver value that puts an NPV statistic on target"""
+        return goal_seek(
+            report,
+            base_params,
+            driver,
+            target_npv=target_npv,
+            statistic=statistic,
+            bounds=bounds,
+            tolerance_bps=tolerance_bps,
+            num_simulations=num_simulations
+        )
+    
+    def run_portfolio(
+        self,
+        reports: List[FinancialReport],
+        params: ScenarioParams,
+        labels: List[str],
+        weights: Optional[List[float]],
+        macro_correlation: float,
+        num_simulations: int
+    ) -> PortfolioSimulation:
+        """Value a basket of reports in one tensorized run"""
+        return run_portfolio(
+            reports,
+            params,
+            labels=labels,
+            weights=weights,
+            macro_correlation=macro_correlation,
+            num_simulations=num_simulations
+        )
+    
+    def sobol_indices(
+        self,
+        report: FinancialReport,
+        params: ScenarioParams,
+        num_samples: int
+    ) -> SobolAnalysis:
+        """Variance-based attribution of NPV to the scenario's stochastic drivers"""
+        return sobol_indices(report, params, num_samples)
@@ -3,15 +3,38 @@ import tempfile
 import os
 from typing import Union
 from app.domain.models import FinancialReport
-from app.domain.agents.landing_ai import LandingAIClient
+from app.domain.agents.landing_ai import LandingAIClient, ADE_RESPONSE_CACHE_VERSION, parser_fingerprint
+from app.domain.cache import ContentCache
 from app.core.config import settings
 
 
+def _extraction_cache(namespace: str, version: str) -> ContentCache:
+    return ContentCache(
+        namespace=namespace,
+        version=version,
+        db_path=settings.extraction_cache_path or None,
+        max_memory_bytes=settings.extraction_cache_memory_mb * 1024 * 1024,
+        max_disk_bytes=settings.extraction_cache_disk_mb * 1024 * 1024
+    )
+
+
+# Shared across requests: ADE responses (markdown and metadata) survive parser changes, parsed reports do not
+extraction_response_cache = _extraction_cache("ade_response", ADE_RESPONSE_CACHE_VERSION)
+extraction_report_cache = _extraction_cache("ade_report", parser_fingerprint())
+
+
 class LandingAIService:
     """Service wrapper for Landing AI client"""
     
     def __init__(self):
-        self.client = LandingAIClient(api_key=settings.landingai_api_key)
+        self.client = LandingAIClient(
+            api_key=settings.landingai_api_key,
+            response_cache=extraction_response_cache,
+            report_cache=extraction_report_cache,
+            pages_per_range=settings.landingai_pages_per_range or None,
+            max_concurrency=settings.landingai_max_concurrency,
+            max_retries=settings.landingai_max_retries
+        )
     
     def extract_from_pdf(self, pdf_file: bytes, filename: str) -> FinancialReport:
         """Extract financial data from PDF file"""
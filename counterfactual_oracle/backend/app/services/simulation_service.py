@@ -1,29 +1,88 @@
 """Service for Monte Carlo simulation"""
+from typing import List, Optional
 from app.domain.models import FinancialReport, ScenarioParams, AggregatedSimulation
-from app.domain.logic import run_monte_carlo
+from app.domain.logic import run_monte_carlo, run_monte_carlo_cached, run_monte_carlo_batch, engine_fingerprint
+from app.domain.cache import ContentCache
 from app.domain.agents.simulator import SimulatorAgent
 from app.core.config import settings
 
 
+# Shared across requests; entries from an older engine are dropped on startup
+simulation_cache = ContentCache(
+    namespace="simulation",
+    version=engine_fingerprint(),
+    db_path=settings.simulation_cache_path or None,
+    max_memory_bytes=settings.simulation_cache_memory_mb * 1024 * 1024,
+    max_disk_bytes=settings.simulation_cache_disk_mb * 1024 * 1024
+)
+
+
 class SimulationService:
     """Service for running financial simulations"""
     
     def __init__(self):
         self.simulator_agent = SimulatorAgent(api_key=settings.gemini_api_key)
     
+    def run_preview(
+        self,
+        report: FinancialReport,
+        params: ScenarioParams
+    ) -> AggregatedSimulation:
+        """Coarse low-path-count simulation (no LLM calls) shown while the full run refines"""
+        return run_monte_carlo_cached(
+            simulation_cache,
+            report,
+            params,
+            num_simulations=settings.simulation_preview_paths
+        )
+    
+    def run_refined(
+        self,
+        report: FinancialReport,
+        params: ScenarioParams
+    ) -> AggregatedSimulation:
+        """Full-precision Monte Carlo run (no LLM calls)"""
+        if settings.simulation_time_budget_s is not None:
+            # Latency-bounded: as many paths as fit the budget (not cached, path count varies)
+            agg_results = run_monte_carlo(
+                report,
+                params,
+                num_simulations=1000000,
+                sobol_samples=settings.simulation_sobol_samples,
+                time_budget=settings.simulation_time_budget_s
+            )
+        else:
+            # Run Monte Carlo (vectorized NumPy, optionally sharded across processes),
+            # served from the result cache when the same inputs were simulated before
+            agg_results = run_monte_carlo_cached(
+                simulation_cache,
+                report,
+                params,
+                num_shards=settings.simulation_num_shards,
+                max_workers=settings.simulation_max_workers,
+                sobol_samples=settings.simulation_sobol_samples
+            )
+        return agg_results
+    
     def run_simulation(
         self, 
         report: FinancialReport, 
-        params: ScenarioParams
+        params: ScenarioParams,
+        agg_results: Optional[AggregatedSimulation] = None
     ) -> AggregatedSimulation:
-        """Run Monte Carlo simulation with AI-generated assumption log"""
-        # Run Monte Carlo (pure Python math)
-        agg_results = run_monte_carlo(report, params)
+        """Run Monte Carlo simulation with AI-generated assumption log (pass `agg_results` to reuse a refined run)"""
+        if agg_results is None:
+            agg_results = self.run_refined(report, params)
         
         # Enhance with AI-generated qualitative analysis
-        agg_results = self.simulator_agent.run_simulation(report, params)
+        agg_results = self.simulator_agent.run_simulation(report, params, agg_results)
         
         return agg_results
-
-
-
+    
+    def run_batch_simulation(
+        self,
+        report: FinancialReport,
+        params_list: List[ScenarioParams]
+    ) -> List[AggregatedSimulation]:
+        """Run a parameter sweep with common random numbers (no LLM calls)"""
+        return run_monte_carlo_batch(report, params_list)
@@ -0,0 +1,117 @@
+"""
+ADE Response Streaming Benchmark
+
+Serves synthetic ADE parse responses from a local HTTP server and extracts
+them twice: the way `extract_data` used to (`response.json()`, the indented
+debug dump, then `parse_landing_ai_response`) and through the streaming path
+(`extract_data` as it is now: `AdeResponseReader` over the body chunks feeding
+the incremental tokenizer). Each response carries the document markdown plus
+per-chunk markdown and grounding boxes, as ADE returns them. Reports peak
+traced memory and wall time per response size, and checks that both paths
+build the same report.
+
+Usage (from the counterfactual_oracle directory):
+    python -m benchmarks.ade_streaming
+    python -m benchmarks.ade_streaming --pages 100 1000 2000
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import random
+import tempfile
+import threading
+import time
+import tracemalloc
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import requests
+from src.agents.landing_ai import LandingAIClient
+from benchmarks.ade_tokenizer import synthetic_filing
+
+def synthetic_response(pages: int) -> bytes:
+    """ADE response body for a `pages`-page synthetic filing, one chunk per page"""
+    rng = random.Random(pages)
+    markdown = synthetic_filing(pages)
+    chunks = [
+        {
+            "id": f"chunk-{i}",
+            "type": "table" if "<table" in text or text.startswith("|") else "text",
+            "markdown": text,
+            "grounding": {"page": i, "box": {k: rng.random() for k in ("left", "top", "right", "bottom")}},
+        }
+        for i, text in enumerate(markdown.split("<a id='page-"))
+    ]
+    return json.dumps({
+        "markdown": markdown,
+        "chunks": chunks,
+        "splits": [{"class": "page", "pages": [i], "markdown": c["markdown"]} for i, c in enumerate(chunks)],
+        "metadata": {"filename": f"synthetic_{pages}.pdf", "page_count": pages, "duration_ms": 1000.0 * pages,
+                     "credit_usage": 3.0 * pages, "job_id": f"synthetic-{pages}"},
+    }).encode()
+
+class StandInServer:
+    """Local stand-in for the ADE parse endpoint, always answering with `body`"""
+    def __init__(self):
+        self.body = b""
+        server = self
+        class Handler(BaseHTTPRequestHandler):
+            def do_POST(self):
+                self.rfile.read(int(self.headers.get("Content-Length", 0)))
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(server.body)))
+                self.end_headers()
+                self.wfile.write(server.body)
+            def log_message(self, *args):
+                pass
+        self.httpd = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.url = f"http://127.0.0.1:{self.httpd.server_address[1]}"
+        threading.Thread(target=self.httpd.serve_forever, daemon=True).start()
+
+def buffered_extract(client: LandingAIClient, pdf_path: str, debug_file: str):
+    """The previous extract_data body: whole JSON in memory, re-serialized for the debug dump"""
+    with open(pdf_path, "rb") as f:
+        response = requests.post(f"{client.base_url}/parse", files={"document": f}, timeout=900)
+    raw_data = response.json()
+    with open(debug_file, "w") as f:
+        json.dump(raw_data, f, indent=2)
+    return client.parse_landing_ai_response(raw_data)
+
+def traced(fn):
+    tracemalloc.start()
+    started = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        result = fn()
+    elapsed = time.perf_counter() - started
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, elapsed, peak
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--pages", type=int, nargs="*", default=[100, 500, 1000], help="Synthetic filing sizes")
+    args = parser.parse_args()
+
+    server = StandInServer()
+    client = LandingAIClient(api_key="benchmark")
+    client.base_url = server.url
+    with tempfile.TemporaryDirectory() as tmp:
+        pdf_path = os.path.join(tmp, "filing.pdf")
+        with open(pdf_path, "wb") as f:
+            f.write(b"%PDF-1.4\n% stand-in\n")
+        debug_file = os.path.join(tmp, "debug.json")
+
+        print(f"{'pages':>6}{'response':>11}{'buffered peak':>16}{'streamed peak':>16}{'buffered':>11}{'streamed':>11}")
+        for pages in args.pages:
+            server.body = synthetic_response(pages)
+            buffered, buffered_s, buffered_peak = traced(lambda: buffered_extract(client, pdf_path, debug_file))
+            streamed, streamed_s, streamed_peak = traced(lambda: client.extract_data(pdf_path))
+            assert buffered.model_dump() == streamed.model_dump(), f"report mismatch at {pages} pages"
+            print(f"{pages:>6}{len(server.body) / 2**20:>7.1f} MiB{buffered_peak / 2**20:>12.1f} MiB"
+                  f"{streamed_peak / 2**20:>12.1f} MiB{buffered_s:>10.2f}s{streamed_s:>10.2f}s")
+    server.httpd.shutdown()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,141 @@
+"""
+ADE Markdown Tokenizer Benchmark
+
+Times `tokenize_ade_markdown` against the parser's previous front end (three
+header regexes, a DOTALL `<table.*?</table>` regex, a multiline markdown-table
+regex, a sort, then a fresh HTMLParser per table) on the data/ reports
+rendered as ADE markdown, on synthetic filings of up to 500 pages, and on a
+filing followed by unterminated `<table>` tags (the DOTALL regex rescans the
+rest of the document from each one). Both must produce the same tokens;
+timings are reported per document with throughput in MB/s, so linear
+scaling shows as flat throughput.
+
+Usage (from the counterfactual_oracle directory):
+    python -m benchmarks.ade_tokenizer
+    python -m benchmarks.ade_tokenizer --pages 100 500 1000 --repeats 3
+"""
+
+import argparse
+import random
+import re
+import time
+from html.parser import HTMLParser
+from typing import Any, Dict, List
+from src.agents.landing_ai import tokenize_ade_markdown, markdown_table_rows
+from benchmarks.perf_suite import load_filings, render_ade_markdown
+
+HEADER_PATTERNS = {
+    'is': r"(?:CONDENSED\s+)?CONSOLIDATED\s+STATEMENTS\s+OF\s+(?:OPERATIONS|INCOME|EARNINGS)",
+    'bs': r"(?:CONDENSED\s+)?CONSOLIDATED\s+BALANCE\s+SHEETS",
+    'cf': r"(?:CONDENSED\s+)?CONSOLIDATED\s+STATEMENTS\s+OF\s+CASH\s+FLOWS"
+}
+
+class TableParser(HTMLParser):
+    """The parser's previous per-table HTMLParser"""
+    def __init__(self):
+        super().__init__()
+        self.tables, self.current_table, self.current_row, self.current_cell = [], [], [], ''
+        self.in_table = self.in_row = self.in_cell = False
+    def handle_starttag(self, tag, attrs):
+        if tag == 'table':
+            self.in_table, self.current_table = True, []
+        elif tag == 'tr' and self.in_table:
+            self.in_row, self.current_row = True, []
+        elif tag == 'td' and self.in_row:
+            self.in_cell, self.current_cell = True, ''
+    def handle_endtag(self, tag):
+        if tag == 'table':
+            self.in_table = False
+            if self.current_table: self.tables.append(self.current_table)
+        elif tag == 'tr' and self.in_row:
+            self.in_row = False
+            if self.current_row: self.current_table.append(self.current_row)
+        elif tag == 'td' and self.in_cell:
+            self.in_cell = False
+            self.current_row.append(self.current_cell.strip())
+    def handle_data(self, data):
+        if self.in_cell: self.current_cell += data
+
+def legacy_tokens(markdown: str) -> List[Dict[str, Any]]:
+    """Items as the previous implementation built them, with table rows parsed"""
+    items = []
+    for section, pattern in HEADER_PATTERNS.items():
+        for match in re.finditer(pattern, markdown, re.IGNORECASE):
+            items.append({'type': 'header', 'section': section, 'start': match.start()})
+    for match in re.finditer(r"<table[^>]*>.*?</table>", markdown, re.DOTALL | re.IGNORECASE):
+        parser = TableParser()
+        parser.feed(match.group(0))
+        items.append({'type': 'html_table', 'rows': parser.tables[0] if parser.tables else [], 'start': match.start()})
+    for match in re.finditer(r"(?:^\|.*$(?:\n|$))+", markdown, re.MULTILINE):
+        items.append({'type': 'md_table', 'rows': markdown_table_rows(match.group(0)), 'start': match.start()})
+    items.sort(key=lambda x: x['start'])
+    return items
+
+LINE_ITEMS = ["Net sales", "Cost of sales", "Research and development", "Selling, general and administrative",
+              "Operating income", "Other income/(expense), net", "Provision for income taxes", "Net income",
+              "Accounts receivable, net", "Inventories", "Total assets", "Term debt", "Total liabilities",
+              "Depreciation and amortization", "Share-based compensation expense", "Payments for acquisition of "
+              "property, plant and equipment", "Repurchases of common stock", "Cash and cash equivalents"]
+STATEMENT_HEADERS = ["CONDENSED CONSOLIDATED STATEMENTS OF OPERATIONS (Unaudited)",
+                     "CONDENSED CONSOLIDATED BALANCE SHEETS (Unaudited)",
+                     "CONDENSED CONSOLIDATED STATEMENTS OF CASH FLOWS (Unaudited)"]
+
+def synthetic_filing(pages: int, seed: int = 0) -> str:
+    """
+    ADE-style markdown for a `pages`-page filing: page anchors, narrative
+    paragraphs, a statement header every 20 pages, and per page one HTML table
+    (30 rows, 3 value columns) or, every fifth page, a markdown table.
+    """
+    rng = random.Random(seed)
+    parts = []
+    for page in range(pages):
+        parts.append(f"<a id='page-{page + 1}'></a>")
+        if page % 20 == 0:
+            parts.append(f"## {STATEMENT_HEADERS[(page // 20) % 3]}")
+        parts.append("The Company's results of operations and financial condition are subject to risks. " * 12)
+        rows = [(f"{rng.choice(LINE_ITEMS)} {page}-{i}", [f"{rng.randint(-10**6, 10**6):,}" for _ in range(3)])
+                for i in range(30)]
+        if page % 5 == 4:
+            parts.append("| | Current | Prior | Change |\n|---|---|---|---|")
+            parts.append("\n".join(f"| {label} | " + " | ".join(cells) + " |" for label, cells in rows))
+        else:
+            parts.append("<table><tr><td></td><td>Three Months Ended</td><td>Prior</td><td>Change</td></tr>"
+                         + "".join(f"<tr><td>{label}</td>" + "".join(f"<td>{c}</td>" for c in cells) + "</tr>"
+                                   for label, cells in rows)
+                         + "</table>")
+        parts.append("")
+    return "\n\n".join(parts)
+
+def unclosed_tables(pages: int, tags: int = 2000) -> str:
+    """A filing followed by `<table>` openings that never close (each one rescans the tail in the regex version)"""
+    return synthetic_filing(pages) + "\n\n" + "<table> see note\n" * tags + "Narrative text. " * 20000
+
+def best_of(fn, markdown: str, repeats: int) -> float:
+    times = []
+    for _ in range(repeats):
+        started = time.perf_counter()
+        fn(markdown)
+        times.append(time.perf_counter() - started)
+    return min(times)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--pages", type=int, nargs="*", default=[10, 100, 500], help="Synthetic filing sizes")
+    parser.add_argument("--repeats", type=int, default=5, help="Runs per document (best time is reported)")
+    args = parser.parse_args()
+
+    documents = {name: render_ade_markdown(raw) for name, raw in load_filings().items()}
+    documents.update({f"synthetic {pages} pages": synthetic_filing(pages) for pages in args.pages})
+    documents["unclosed <table> x2000"] = unclosed_tables(10)
+
+    print(f"{'document':<26}{'size':>10}{'regex+HTMLParser':>20}{'tokenizer':>14}{'speedup':>10}{'MB/s':>8}")
+    for name, markdown in documents.items():
+        assert list(tokenize_ade_markdown(markdown)) == legacy_tokens(markdown), f"token mismatch on {name}"
+        legacy = best_of(legacy_tokens, markdown, args.repeats)
+        tokenizer = best_of(lambda m: list(tokenize_ade_markdown(m)), markdown, args.repeats)
+        size_mb = len(markdown) / 1e6
+        print(f"{name:<26}{size_mb:>8.2f}MB{legacy * 1000:>17.2f} ms{tokenizer * 1000:>11.2f} ms"
+              f"{legacy / tokenizer:>9.1f}x{size_mb / tokenizer:>8.1f}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,394 @@
+"""
+Performance Regression Suite
+
+Times the hot paths: run_monte_carlo at 1k/10k/100k/1M paths, 30-year runs
+under a 0.4 s time budget (which must stay close to it), ADE response parsing
+on the data/ samples, FinancialValidator and PDF generation. Each case records
+median and best wall time, peak traced memory (tracemalloc, which
+also sees NumPy buffers) and the net memory blocks the call leaves allocated.
+Every run is appended to a JSON history (benchmarks/perf_history.json, not
+tracked) and gated against the committed baseline (benchmarks/perf_baseline.json):
+the run fails (exit code 1) if any case got slower or hungrier than the
+threshold allows. A missing baseline only warns locally but fails under
+--require-baseline, which is the default when the CI environment variable is
+set, so the gate cannot pass vacuously.
+
+Peak traced memory does not depend on the hardware, but wall times do: the
+baseline records the host class it was measured on (OS, architecture, CPU
+model and count) and wall times are only gated when the current host matches.
+To gate timings in CI, refresh the baseline on the CI runner class (run with
+--update-baseline there and keep the resulting file, e.g. as a cached
+artifact passed back with --baseline).
+
+The data/ samples are already-parsed reports, so the parser case renders them
+back into ADE-style markdown (section headers followed by HTML tables).
+
+Usage (from the counterfactual_oracle directory):
+    python -m benchmarks.perf_suite
+    python -m benchmarks.perf_suite --update-baseline
+    python -m benchmarks.perf_suite --cases monte_carlo parse --threshold 0.10
+"""
+
+import argparse
+import contextlib
+import gc
+import glob
+import io
+import json
+import os
+import platform
+import re
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, List, Optional, Tuple
+import numpy as np
+from src.models import FinancialReport, ScenarioParams, CriticVerdict
+from src.logic import run_monte_carlo
+from src.validators import FinancialValidator
+from src.agents.landing_ai import LandingAIClient
+from src.agents.evaluator import EvaluatorAgent
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DATA_DIR = os.path.join(ROOT, "data")
+HISTORY_PATH = os.path.join(ROOT, "benchmarks", "perf_history.json")
+BASELINE_PATH = os.path.join(ROOT, "benchmarks", "perf_baseline.json")
+
+# Filing labels the parser's synonym lists recognise, per statement field
+ADE_LABELS = {
+    "income_statement": {
+        "Revenue": "Total net sales",
+        "CostOfGoodsSold": "Total cost of sales",
+        "GrossProfit": "Gross profit",
+        "RnD": "Research and development",
+        "SGA": "Selling, general and administrative",
+        "OpEx": "Total operating expenses",
+        "EBIT": "Operating income",
+        "InterestExpense": "Interest expense",
+        "Taxes": "Provision for income taxes",
+        "NetIncome": "Net income",
+    },
+    "cash_flow": {
+        "DepreciationAndAmortization": "Depreciation and amortization",
+        "CapEx": "Payments for acquisition of property, plant and equipment",
+        "OperatingCashFlow": "Cash generated by operating activities",
+    },
+}
+ADE_HEADERS = {
+    "income_statement": "CONDENSED CONSOLIDATED STATEMENTS OF OPERATIONS",
+    "balance_sheet": "CONDENSED CONSOLIDATED BALANCE SHEETS",
+    "cash_flow": "CONDENSED CONSOLIDATED STATEMENTS OF CASH FLOWS",
+}
+
+def load_samples(data_dir: str = DATA_DIR) -> Dict[str, dict]:
+    """Raw data/*.json documents that carry the three core statements"""
+    samples = {}
+    for path in sorted(glob.glob(os.path.join(data_dir, "*.json"))):
+        with open(path) as f:
+            raw = json.load(f)
+        if all(k in raw for k in ("income_statement", "balance_sheet", "cash_flow")):
+            samples[os.path.basename(path)] = raw
+    return samples
+
+def load_filings(data_dir: str = DATA_DIR) -> Dict[str, Dict[str, dict]]:
+    """
+    Statement tables for every data/*.json document, for rendering as ADE
+    markdown: the parsed reports as-is, and the latest period of documents
+    that keep multi-period `actuals` (sample_report.json)
+    """
+    filings = {}
+    for path in sorted(glob.glob(os.path.join(data_dir, "*.json"))):
+        with open(path) as f:
+            raw = json.load(f)
+        if "actuals" in raw:
+            actuals = raw["actuals"]
+            statements = {"income_statement": actuals.get("income_statement", {}),
+                          "balance_sheet": actuals.get("balance_sheet", {}),
+                          "cash_flow": actuals.get("cash_flow_statement", {})}
+            raw = {k: v[max(v)] if v else {} for k, v in statements.items()}
+        if all(k in raw for k in ADE_HEADERS):
+            filings[os.path.basename(path)] = raw
+    return filings
+
+def to_report(raw: dict) -> FinancialReport:
+    return FinancialReport(
+        income_statement=raw["income_statement"],
+        balance_sheet=raw["balance_sheet"],
+        cash_flow=raw["cash_flow"],
+        kpis={k: v for k, v in raw.get("kpis", {}).items() if isinstance(v, (int, float))}
+    )
+
+def _label(statement: str, field: str) -> str:
+    if field in ADE_LABELS.get(statement, {}):
+        return ADE_LABELS[statement][field]
+    # CashAndMarketableSecurities / cash_and_marketable_securities -> Cash and marketable securities
+    return re.sub(r"(?<!^)(?=[A-Z])", " ", field).replace("_", " ").capitalize()
+
+def _flatten(values: Dict[str, Any]) -> List[Tuple[str, float]]:
+    rows = []
+    for key, value in values.items():
+        if isinstance(value, dict):
+            rows.extend(_flatten(value))
+        elif isinstance(value, (int, float)):
+            rows.append((key, value))
+    return rows
+
+def render_ade_markdown(raw: dict) -> str:
+    """ADE-style markdown for a parsed report: one header and HTML table per statement"""
+    parts = ["<a id='page-1'></a>", "Three Months Ended", ""]
+    for statement, header in ADE_HEADERS.items():
+        parts.append(f"## {header}")
+        parts.append("<table>")
+        parts.append("<tr><td></td><td>Current period</td><td>Prior period</td></tr>")
+        for field, value in _flatten(raw[statement]):
+            cell = f"({abs(value):,.0f})" if value < 0 else f"{value:,.0f}"
+            parts.append(f"<tr><td>{_label(statement, field)}</td><td>{cell}</td><td>-</td></tr>")
+        parts.append("</table>")
+        parts.append("")
+    return "\n".join(parts)
+
+def sample_ade_response(raw: dict) -> Dict[str, Any]:
+    return {"markdown": render_ade_markdown(raw), "chunks": [], "metadata": {}}
+
+# --- Cases: each builds its inputs once and returns the callable to time ---
+
+def _monte_carlo_case(num_simulations: int, precision: str = "float64") -> Callable[[], Callable[[], Any]]:
+    def setup():
+        report = to_report(next(iter(load_samples().values())))
+        params = ScenarioParams(opex_delta_bps=50, revenue_growth_bps=-100, precision=precision)
+        # Bypass the path cache so every repeat pays for the kernel
+        return lambda: run_monte_carlo(report, params, num_simulations, use_path_cache=False)
+    return setup
+
+def _budget_case(driver_model: str) -> Callable[[], Callable[[], Any]]:
+    def setup():
+        report = to_report(next(iter(load_samples().values())))
+        params = ScenarioParams(driver_model=driver_model, forecast_years=30)
+        # Wall time is the budget plus the overshoot of the last batch
+        return lambda: run_monte_carlo(report, params, 10**6, time_budget=0.4, use_path_cache=False)
+    return setup
+
+def _parse_case():
+    client = LandingAIClient(api_key="benchmark")
+    responses = [sample_ade_response(raw) for raw in load_filings().values()]
+    def run():
+        # The parser logs every extraction; keep that out of the timings
+        with contextlib.redirect_stdout(io.StringIO()):
+            return [client.parse_landing_ai_response(response) for response in responses]
+    return run
+
+def _validator_case():
+    reports = [to_report(raw) for raw in load_samples().values()]
+    def run():
+        validator = FinancialValidator()
+        return [
+            (validator.validate_income_statement(r.income_statement),
+             validator.validate_balance_sheet(r.balance_sheet),
+             validator.validate_scenario_params(100.0, -200.0, 50.0))
+            for r in reports
+        ]
+    return run
+
+def _pdf_case():
+    report = to_report(next(iter(load_samples().values())))
+    simulation = run_monte_carlo(report, ScenarioParams(), 2000)
+    critic = CriticVerdict(
+        verdict="approve",
+        balance_sheet_check={"is_balanced": True},
+        cash_flow_check={},
+        comparative_analysis=[f"Comparative point {i}: margins versus peers" for i in range(20)],
+        unsupported_assumptions=[]
+    )
+    evaluator = EvaluatorAgent()
+    output = os.path.join(tempfile.mkdtemp(prefix="perf_suite_"), "report.pdf")
+    return lambda: evaluator.generate_pdf(simulation, critic, report, output)
+
+# name -> (setup, timed repeats)
+CASES: Dict[str, Tuple[Callable[[], Callable[[], Any]], int]] = {
+    "monte_carlo_1k": (_monte_carlo_case(1_000), 50),
+    "monte_carlo_10k": (_monte_carlo_case(10_000), 20),
+    "monte_carlo_100k": (_monte_carlo_case(100_000), 5),
+    "monte_carlo_1m": (_monte_carlo_case(1_000_000), 3),
+    "monte_carlo_1m_float32": (_monte_carlo_case(1_000_000, "float32"), 3),
+    "monte_carlo_budget_30y_static": (_budget_case("static"), 3),
+    "monte_carlo_budget_30y_per_year": (_budget_case("per_year"), 3),
+    "parse_landing_ai_response": (_parse_case, 20),
+    "financial_validator": (_validator_case, 200),
+    "evaluator_generate_pdf": (_pdf_case, 10),
+}
+
+# Budgeted runs allocate the largest batch the host reaches before the deadline,
+# so their peak memory tracks host speed and only their wall time is gated
+TIME_ONLY_CASES = {"monte_carlo_budget_30y_static", "monte_carlo_budget_30y_per_year"}
+
+def measure(fn: Callable[[], Any], repeats: int) -> Dict[str, float]:
+    """Wall time over `repeats` warm runs, then one traced run for memory"""
+    fn()  # warm-up: imports, lru caches, first-touch page faults
+    times = []
+    for _ in range(repeats):
+        started = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - started)
+
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot()
+    tracemalloc.reset_peak()
+    result = fn()
+    _, peak = tracemalloc.get_traced_memory()
+    after = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+    del result
+
+    # Blocks still held once the call returned (caches, leaks), excluding the snapshots themselves
+    ignore = [tracemalloc.Filter(False, tracemalloc.__file__)]
+    diff = after.filter_traces(ignore).compare_to(before.filter_traces(ignore), "filename")
+    return {
+        "wall_s": float(np.median(times)),
+        "wall_min_s": min(times),
+        "peak_bytes": int(peak),
+        "net_blocks": int(sum(stat.count_diff for stat in diff)),
+        "repeats": repeats,
+    }
+
+def run_cases(patterns: Optional[List[str]] = None) -> Dict[str, Dict[str, float]]:
+    results = {}
+    for name, (setup, repeats) in CASES.items():
+        if patterns and not any(p in name for p in patterns):
+            continue
+        try:
+            results[name] = measure(setup(), repeats)
+        except Exception as e:
+            # e.g. a missing optional dependency; record the failure and keep benchmarking
+            results[name] = {"error": f"{type(e).__name__}: {e}"}
+            print(f"{name:<32}  error: {results[name]['error']}")
+            continue
+        r = results[name]
+        print(f"{name:<32}{r['wall_s'] * 1000:>12.3f} ms{r['peak_bytes'] / 2**20:>12.2f} MiB{r['net_blocks']:>10} blocks")
+    return results
+
+def find_regressions(results: Dict[str, Dict[str, float]], baseline: Dict[str, Dict[str, float]],
+                     threshold: float, memory_threshold: float, min_delta_s: float,
+                     min_delta_bytes: int = 0, check_time: bool = True) -> List[str]:
+    """
+    Cases slower than baseline * (1 + threshold) (and by more than `min_delta_s`,
+    so sub-millisecond cases are not gated on timer noise), or with peak memory
+    above baseline * (1 + memory_threshold) (and by more than `min_delta_bytes`,
+    for cases that only allocate a few KiB; TIME_ONLY_CASES skip this).
+    `check_time=False` gates memory only, for a baseline timed on another host
+    class. Cases missing from the baseline pass; a case that errors now but was
+    measured in the baseline is a regression.
+    """
+    regressions = []
+    for name, current in results.items():
+        base = baseline.get(name)
+        if base is None or "error" in base:
+            continue
+        if "error" in current:
+            regressions.append(f"{name}: {current['error']}")
+            continue
+        slower = current["wall_s"] - base["wall_s"]
+        if check_time and current["wall_s"] > base["wall_s"] * (1 + threshold) and slower > min_delta_s:
+            regressions.append(f"{name}: wall time {current['wall_s'] * 1000:.3f} ms vs baseline "
+                               f"{base['wall_s'] * 1000:.3f} ms (+{slower / base['wall_s']:.0%})")
+        if name in TIME_ONLY_CASES:
+            continue
+        grown = current["peak_bytes"] - base["peak_bytes"]
+        if current["peak_bytes"] > base["peak_bytes"] * (1 + memory_threshold) and grown > min_delta_bytes:
+            growth = current["peak_bytes"] / max(base["peak_bytes"], 1) - 1
+            regressions.append(f"{name}: peak memory {current['peak_bytes'] / 2**20:.2f} MiB vs baseline "
+                               f"{base['peak_bytes'] / 2**20:.2f} MiB (+{growth:.0%})")
+    return regressions
+
+def host_class() -> str:
+    """What wall times depend on: OS, architecture, CPU model and CPU count"""
+    cpu = platform.processor()
+    try:
+        with open("/proc/cpuinfo") as f:
+            cpu = next((line.split(":", 1)[1].strip() for line in f if line.startswith("model name")), cpu)
+    except OSError:
+        pass
+    return f"{platform.system()} {platform.machine()} | {cpu or 'unknown CPU'} | {os.cpu_count()} CPUs"
+
+def environment() -> Dict[str, str]:
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True,
+                                text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = "unknown"
+    return {
+        "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "commit": commit,
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "machine": f"{platform.system()} {platform.machine()}",
+        "host": host_class(),
+    }
+
+def _load_json(path: str, default: Any) -> Any:
+    if not os.path.exists(path):
+        return default
+    with open(path) as f:
+        return json.load(f)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--cases", nargs="*", help="Only run cases whose name contains one of these strings")
+    parser.add_argument("--threshold", type=float, default=0.25, help="Allowed relative wall-time growth")
+    parser.add_argument("--memory-threshold", type=float, default=0.10, help="Allowed relative peak-memory growth")
+    parser.add_argument("--min-delta-ms", type=float, default=0.5, help="Ignore slowdowns smaller than this")
+    parser.add_argument("--min-delta-kib", type=float, default=64, help="Ignore peak-memory growth smaller than this")
+    parser.add_argument("--history", default=HISTORY_PATH, help="JSON history file to append to")
+    parser.add_argument("--baseline", default=BASELINE_PATH, help="Baseline file to gate against")
+    parser.add_argument("--update-baseline", action="store_true", help="Store this run as the baseline")
+    parser.add_argument("--require-baseline", action=argparse.BooleanOptionalAction,
+                        default=bool(os.environ.get("CI")), help="Fail when there is no baseline (default in CI)")
+    args = parser.parse_args()
+
+    print(f"{'case':<32}{'median wall':>15}{'peak traced':>16}{'net':>17}")
+    results = run_cases(args.cases)
+    entry = {**environment(), "results": results}
+
+    history = _load_json(args.history, [])
+    history.append(entry)
+    with open(args.history, "w") as f:
+        json.dump(history, f, indent=2)
+
+    if args.update_baseline:
+        baseline = _load_json(args.baseline, {"results": {}})
+        if baseline.get("host") != entry["host"]:
+            # Timings from another host class must not be mixed into this one
+            baseline = {"results": {}}
+        baseline.update({k: v for k, v in entry.items() if k != "results"})
+        baseline["results"].update(results)
+        with open(args.baseline, "w") as f:
+            json.dump(baseline, f, indent=2)
+        print(f"\nBaseline updated: {args.baseline}")
+        return
+
+    baseline = _load_json(args.baseline, None)
+    if baseline is None:
+        print(f"\nNo baseline at {args.baseline}; run with --update-baseline to create one")
+        if args.require_baseline:
+            sys.exit(1)
+        return
+    same_host = baseline.get("host") == entry["host"]
+    if not same_host:
+        print(f"\nBaseline was timed on another host class ({baseline.get('host', 'unrecorded')}); "
+              f"gating peak memory only")
+    regressions = find_regressions(results, baseline["results"], args.threshold, args.memory_threshold,
+                                   args.min_delta_ms / 1000.0, int(args.min_delta_kib * 1024), same_host)
+    if regressions:
+        print(f"\nRegressions against baseline {baseline.get('commit', '?')}:")
+        for line in regressions:
+            print(f"  {line}")
+        sys.exit(1)
+    time_rule = f"{args.threshold:.0%} time, " if same_host else ""
+    print(f"\nNo regressions against baseline {baseline.get('commit', '?')} "
+          f"(threshold {time_rule}{args.memory_threshold:.0%} memory)")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+"""
+Float32 Precision Benchmark
+
+Compares `precision="float32"` runs against float64 on the sample reports in
+data/, on identical random draws: relative error of every headline statistic
+(NPV quantiles, VaR/CVaR, year-1 medians, last-year FCF P50), plus peak traced
+memory and wall time per precision, for both driver models.
+
+Usage (from the counterfactual_oracle directory):
+    python -m benchmarks.precision_accuracy
+    python -m benchmarks.precision_accuracy --paths 1000000 --years 10 --json precision.json
+"""
+
+import argparse
+import json
+import time
+import tracemalloc
+from src.models import ScenarioParams
+from src.logic import run_monte_carlo
+from benchmarks.sampler_convergence import load_reports
+
+STATISTICS = ("median_npv", "p10_npv", "p90_npv", "var_1_npv", "var_5_npv", "cvar_1_npv", "cvar_5_npv",
+              "median_revenue", "median_ebitda", "median_fcf")
+DRIVER_SCENARIOS = {
+    "static": {},
+    "per_year": {"driver_model": "per_year", "tax_rate_vol": 0.02, "discount_rate_vol": 0.01},
+}
+
+def traced_run(report, params, num_paths):
+    tracemalloc.start()
+    started = time.perf_counter()
+    result = run_monte_carlo(report, params, num_paths, use_path_cache=False)
+    elapsed = time.perf_counter() - started
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, elapsed, peak
+
+def compare(report, scenario: dict, num_paths: int, years: int) -> dict:
+    runs = {
+        precision: traced_run(report, ScenarioParams(precision=precision, forecast_years=years, **scenario), num_paths)
+        for precision in ("float64", "float32")
+    }
+    exact, lean = runs["float64"][0], runs["float32"][0]
+    errors = {name: abs(getattr(lean, name) - getattr(exact, name)) / abs(getattr(exact, name))
+              for name in STATISTICS if getattr(exact, name)}
+    errors["fcf_p50_last_year"] = abs(lean.fcf_forecast_p50[-1] - exact.fcf_forecast_p50[-1]) / abs(exact.fcf_forecast_p50[-1])
+    return {
+        "max_rel_error": max(errors.values()),
+        "rel_errors": errors,
+        "prob_negative_npv_diff": abs(lean.prob_negative_npv - exact.prob_negative_npv),
+        "peak_mib": {p: run[2] / 2**20 for p, run in runs.items()},
+        "wall_s": {p: run[1] for p, run in runs.items()},
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--paths", type=int, default=200_000, help="Paths per run")
+    parser.add_argument("--years", type=int, default=5, help="Forecast horizon")
+    parser.add_argument("--json", help="Write the comparison to this file")
+    args = parser.parse_args()
+
+    results = {}
+    for name, report in load_reports().items():
+        results[name] = {}
+        print(f"\n{name}: float32 vs float64, {args.paths} paths x {args.years} years")
+        print(f"{'drivers':>10}{'max rel err':>14}{'peak f64':>12}{'peak f32':>12}{'time f64':>11}{'time f32':>11}")
+        for driver_model, scenario in DRIVER_SCENARIOS.items():
+            r = compare(report, scenario, args.paths, args.years)
+            results[name][driver_model] = r
+            print(f"{driver_model:>10}{r['max_rel_error']:>14.2e}"
+                  f"{r['peak_mib']['float64']:>9.0f} MiB{r['peak_mib']['float32']:>9.0f} MiB"
+                  f"{r['wall_s']['float64']:>10.3f}s{r['wall_s']['float32']:>10.3f}s")
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2)
+
+if __name__ == "__main__":
+    main()
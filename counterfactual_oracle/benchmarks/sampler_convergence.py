@@ -0,0 +1,83 @@
+"""
+Sampler Convergence Benchmark
+
+Error-vs-paths curve for each Monte Carlo sampler (pseudo, antithetic, Sobol,
+Latin hypercube) on the sample reports in data/. For every path count the
+median, P10 and P90 NPV are estimated over several seeds and compared with a
+high-precision reference run; the RMS relative error is reported.
+
+Usage (from the counterfactual_oracle directory):
+    python -m benchmarks.sampler_convergence
+    python -m benchmarks.sampler_convergence --repeats 50 --json curves.json
+"""
+
+import argparse
+import glob
+import json
+import os
+import numpy as np
+from src.models import FinancialReport, ScenarioParams
+from src.logic import run_monte_carlo, SAMPLERS
+
+DATA_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data")
+PATH_COUNTS = [256, 1024, 4096, 16384, 65536]
+
+def load_reports(data_dir: str = DATA_DIR) -> dict:
+    """Loads every data/*.json file that carries the three core statements"""
+    reports = {}
+    for path in sorted(glob.glob(os.path.join(data_dir, "*.json"))):
+        with open(path) as f:
+            raw = json.load(f)
+        if not all(k in raw for k in ("income_statement", "balance_sheet", "cash_flow")):
+            continue
+        reports[os.path.basename(path)] = FinancialReport(
+            income_statement=raw["income_statement"],
+            balance_sheet=raw["balance_sheet"],
+            cash_flow=raw["cash_flow"],
+            kpis={k: v for k, v in raw.get("kpis", {}).items() if isinstance(v, (int, float))}
+        )
+    return reports
+
+def quantiles(result) -> np.ndarray:
+    return np.array([result.median_npv, result.p10_npv, result.p90_npv])
+
+def convergence_curves(report: FinancialReport, repeats: int, reference_paths: int) -> dict:
+    reference = quantiles(run_monte_carlo(report, ScenarioParams(sampler="sobol"), reference_paths, seed=2024))
+    curves = {}
+    for sampler in SAMPLERS:
+        params = ScenarioParams(sampler=sampler)
+        curve = []
+        for n in PATH_COUNTS:
+            estimates = np.array([quantiles(run_monte_carlo(report, params, n, seed=s)) for s in range(repeats)])
+            rel_errors = (estimates - reference) / np.abs(reference)
+            curve.append(float(np.sqrt(np.mean(rel_errors ** 2))))
+        curves[sampler] = curve
+    return curves
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeats", type=int, default=20, help="Seeds per (sampler, path count)")
+    parser.add_argument("--reference-paths", type=int, default=2 ** 21, help="Paths in the reference run")
+    parser.add_argument("--json", help="Write the curves to this file")
+    args = parser.parse_args()
+
+    results = {}
+    for name, report in load_reports().items():
+        curves = convergence_curves(report, args.repeats, args.reference_paths)
+        results[name] = curves
+        print(f"\n{name}: RMS relative error of median/P10/P90 NPV")
+        print(f"{'paths':>10}" + "".join(f"{s:>14}" for s in SAMPLERS))
+        for i, n in enumerate(PATH_COUNTS):
+            print(f"{n:>10}" + "".join(f"{curves[s][i]:>14.3e}" for s in SAMPLERS))
+        # Paths the pseudo-random sampler needs for the error the others reach at 4096
+        base = curves["pseudo"]
+        for sampler in SAMPLERS[1:]:
+            speedup = (base[2] / curves[sampler][2]) ** 2
+            print(f"  {sampler}: ~{speedup:.1f}x fewer paths than pseudo for equal error")
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump({"path_counts": PATH_COUNTS, "curves": results}, f, indent=2)
+
+if __name__ == "__main__":
+    main()
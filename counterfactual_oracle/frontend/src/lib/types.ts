@@ -1,5 +1,8 @@
 export interface SimulationResults {
     median_npv: number;
+    p10_npv?: number;
+    p90_npv?: number;
+    num_paths?: number;
     median_revenue: number;
     median_ebitda: number;
     assumption_log: string[];
@@ -25,6 +28,8 @@ export interface Scenario {
     progress: number;
     error_message?: string;
     simulation_results?: SimulationResults;
+    preview_results?: SimulationResults;
+    results_tier?: 'preview' | 'refined';
     critic_verdict?: CriticVerdict;
     debate_result?: DebateResult;
     final_verdict?: string;
@@ -35,6 +40,7 @@ export interface ScenarioStatus {
     status: 'PENDING' | 'RUNNING' | 'COMPLETED' | 'FAILED';
     progress: number;
     error_message?: string;
+    results_tier?: 'preview' | 'refined';
 }
 
 export interface IncomeStatement {
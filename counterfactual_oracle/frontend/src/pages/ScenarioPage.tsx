@@ -21,12 +21,14 @@ export default function ScenarioPage() {
 
   const { data: status } = useScenarioStatus(scenarioId || null, !!scenarioId)
 
-  // Auto-refetch scenario data when status changes to COMPLETED
+  // Auto-refetch scenario data when status changes to COMPLETED or refined results land
   useEffect(() => {
     if (status?.status === 'COMPLETED' && scenario?.status !== 'COMPLETED') {
       refetch()
+    } else if (status?.results_tier === 'refined' && scenario?.results_tier !== 'refined') {
+      refetch()
     }
-  }, [status?.status, scenario?.status, refetch])
+  }, [status?.status, status?.results_tier, scenario?.status, scenario?.results_tier, refetch])
 
   const handleDownloadReport = async () => {
     if (!scenarioId) return
@@ -132,6 +134,15 @@ export default function ScenarioPage() {
             <br />
             This may take 30-60 seconds
           </p>
+          {(() => {
+            const current = scenario.results_tier === 'refined' ? scenario.simulation_results : scenario.preview_results
+            return current && (
+              <p className="mt-4 text-white">
+                {scenario.results_tier === 'refined' ? 'Simulation' : 'Preview'} ({current.num_paths?.toLocaleString()} paths):
+                median NPV ${current.median_npv.toLocaleString(undefined, { maximumFractionDigits: 0 })}
+              </p>
+            )
+          })()}
           {status && (
             <div className="mt-4 max-w-md mx-auto">
               <div className="w-full bg-gray-700 rounded-full h-2">
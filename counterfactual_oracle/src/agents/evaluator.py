@@ -31,6 +31,8 @@ class EvaluatorAgent:
     def generate_pdf(self, simulation: AggregatedSimulation, critic: CriticVerdict, 
                      report: FinancialReport, output_path: str, debate_result: Optional[DebateResult] = None):
         pdf = FPDF()
+        # fpdf2 leaves x at the right margin after multi_cell (PyFPDF returns to
+        # the left), so each multi_cell starts from the left margin explicitly
         pdf.add_page()
         pdf.set_font("Arial", size=12)
         
@@ -60,6 +62,7 @@ class EvaluatorAgent:
         pdf.cell(200, 8, txt="Model Assumptions:", ln=1)
         pdf.set_font("Arial", size=10)
         for log in simulation.assumption_log:
+            pdf.set_x(pdf.l_margin)
             pdf.multi_cell(0, 6, txt=self._sanitize_text(f"  - {log}"))
         pdf.ln(5)
         
@@ -68,6 +71,7 @@ class EvaluatorAgent:
         pdf.cell(200, 8, txt="Comparative Analysis:", ln=1)
         pdf.set_font("Arial", size=10)
         for point in critic.comparative_analysis:
+            pdf.set_x(pdf.l_margin)
             pdf.multi_cell(0, 6, txt=self._sanitize_text(f"  - {point}"))
         pdf.ln(5)
         
@@ -79,6 +83,7 @@ class EvaluatorAgent:
             pdf.ln(5)
             
             pdf.set_font("Arial", 'I', 10)
+            pdf.set_x(pdf.l_margin)
             pdf.multi_cell(0, 5, txt=self._sanitize_text(f"Two AI analysts debated the financial analysis for {debate_result.total_rounds} rounds. "
                                      f"{'Consensus was reached.' if debate_result.converged else 'Healthy disagreement remained.'}"))
             pdf.ln(3)
@@ -125,6 +130,7 @@ class EvaluatorAgent:
                 # Message content (truncate if too long)
                 pdf.set_font("Arial", size=9)
                 message = turn.message[:400] + "..." if len(turn.message) > 400 else turn.message
+                pdf.set_x(pdf.l_margin)
                 pdf.multi_cell(0, 5, txt=self._sanitize_text(message))
                 pdf.ln(2)
             
@@ -142,6 +148,7 @@ class EvaluatorAgent:
                 pdf.cell(200, 7, txt="Key Agreements:", ln=1)
                 pdf.set_font("Arial", size=9)
                 for agreement in debate_result.key_agreements[:3]:
+                    pdf.set_x(pdf.l_margin)
                     pdf.multi_cell(0, 5, txt=self._sanitize_text(f"  + {agreement[:150]}"))
                 pdf.ln(2)
             
@@ -151,6 +158,7 @@ class EvaluatorAgent:
                 pdf.cell(200, 7, txt="Remaining Concerns:", ln=1)
                 pdf.set_font("Arial", size=9)
                 for disagreement in debate_result.key_disagreements[:2]:
+                    pdf.set_x(pdf.l_margin)
                     pdf.multi_cell(0, 5, txt=self._sanitize_text(f"  - {disagreement[:150]}"))
                 pdf.ln(2)
         
@@ -161,6 +169,7 @@ class EvaluatorAgent:
         pdf.ln(5)
         
         pdf.set_font("Arial", 'I', 10)
+        pdf.set_x(pdf.l_margin)
         pdf.multi_cell(0, 5, txt="This appendix shows the document sources for key financial inputs used in the analysis.")
         pdf.ln(3)
         
@@ -187,6 +196,7 @@ class EvaluatorAgent:
         
         pdf.ln(5)
         pdf.set_font("Arial", 'I', 8)
+        pdf.set_x(pdf.l_margin)
         pdf.multi_cell(0, 4, txt="Note: All values extracted using Landing AI Advanced Document Extraction (ADE). "
                                   "Source references indicate the document section or calculation method.")
         
@@ -1,57 +1,816 @@
+import codecs
+import hashlib
+import html
+import inspect
+import io
 import json
 import os
+import re
+import threading
+import time
 import requests
-from typing import Dict, Any, Optional, List
+from html.parser import HTMLParser
+from concurrent.futures import ThreadPoolExecutor
+from bisect import bisect_right
+from typing import Dict, Any, Optional, List, Callable, Iterable, Iterator, Tuple, BinaryIO, Union
 from ..models import (
     FinancialReport, IncomeStatement, BalanceSheet, CashFlow,
     SegmentData, GeographicData, DebtSchedule, 
     ForwardLookingData, NonGAAPMetrics, LegalAndRegulatory,
     PDFMetadata
 )
+from ..cache import ContentCache
+
+# Statement headers (matched anywhere, table cells included): each
+# "consolidated" hit is completed in place and may be preceded by "condensed"
+HEADER_ANCHOR = re.compile(r"consolidated", re.IGNORECASE)
+HEADER_PATTERN = re.compile(
+    r"consolidated\s+(?:statements\s+of\s+(?:(?P<is>operations|income|earnings)|(?P<cf>cash\s+flows))"
+    r"|(?P<bs>balance\s+sheets))",
+    re.IGNORECASE
+)
+HEADER_PREFIX = re.compile(r"condensed", re.IGNORECASE)
+HTML_TABLE_START = re.compile(r"<table", re.IGNORECASE)
+HTML_TABLE_END = re.compile(r"</table>", re.IGNORECASE)
+# Text run followed by a well-formed start tag, end tag, comment (an
+# unterminated one hides the rest, as in HTMLParser) or declaration; any other
+# '<' before a letter or '/' is a malformed tag, and the rest is text. Quotes
+# delimit attribute values only after '=', and an unquoted value never runs
+# into a closing '/>', so HTMLParser reads every accepted tag the same way.
+HTML_TAG_PATTERN = re.compile(
+    r"([^<]*)(?:<(?:([a-zA-Z][^\t\n\r\f />\x00]*)"
+    r"((?:\s+[^\s\"'>/=]+(?:\s*=\s*(?:\"[^\"]*\"|'[^']*'|[^\s\"'=>/`]+(?=[\s>])))?)*\s*/?)>"
+    r"|/([a-zA-Z][^\t\n\r\f />\x00]*)\s*>|!--(?:.*?-->|.*)|![^>]*>|\?[^>]*>)"
+    r"|(<(?=[a-zA-Z/]))|(<)|$)",
+    re.DOTALL
+)
+
+class _TableParser(HTMLParser):
+    """The parser's original HTMLParser pass, for fragments with malformed tags"""
+    
+    def __init__(self):
+        super().__init__()
+        self.tables, self.table, self.row, self.cell = [], [], [], ''
+        self.in_table = self.in_row = self.in_cell = False
+    
+    def handle_starttag(self, tag, attrs):
+        if tag == 'table':
+            self.in_table, self.table = True, []
+        elif tag == 'tr' and self.in_table:
+            self.in_row, self.row = True, []
+        elif tag == 'td' and self.in_row:
+            self.in_cell, self.cell = True, ''
+    
+    def handle_endtag(self, tag):
+        if tag == 'table':
+            self.in_table = False
+            if self.table: self.tables.append(self.table)
+        elif tag == 'tr' and self.in_row:
+            self.in_row = False
+            if self.row: self.table.append(self.row)
+        elif tag == 'td' and self.in_cell:
+            self.in_cell = False
+            self.row.append(self.cell.strip())
+    
+    def handle_data(self, data):
+        if self.in_cell: self.cell += data
+
+def html_table_rows(content: str) -> List[List[str]]:
+    """
+    Cell text of the first table in an HTML fragment, row by row.
+    
+    Follows the parser's original HTMLParser handling: only <td> cells inside
+    <tr> rows count, cell text is entity-decoded and stripped, and empty rows
+    are dropped. HTMLParser's recovery from malformed tags (it stops at an
+    unterminated attribute quote, for one) is not worth mirroring, so such
+    fragments are handed to HTMLParser itself.
+    """
+    tables, table, row, cell = [], [], [], ''
+    in_table = in_row = in_cell = False
+    for text, start, attrs, end, malformed, stray in HTML_TAG_PATTERN.findall(content):
+        if malformed:
+            parser = _TableParser()
+            parser.feed(content)
+            return parser.tables[0] if parser.tables else []
+        if in_cell:
+            cell += html.unescape(text) + stray if '&' in text else text + stray
+        tag = (start or end).lower()
+        if not tag:
+            continue  # text only, comment or declaration
+        if start:
+            if tag == 'table':
+                in_table, table = True, []
+            elif tag == 'tr' and in_table:
+                in_row, row = True, []
+            elif tag == 'td' and in_row:
+                in_cell, cell = True, ''
+        if end or attrs.endswith('/'):
+            if tag == 'table':
+                in_table = False
+                if table: tables.append(table)
+            elif tag == 'tr' and in_row:
+                in_row = False
+                if row: table.append(row)
+            elif tag == 'td' and in_cell:
+                in_cell = False
+                row.append(cell.strip())
+    return tables[0] if tables else []
+
+def markdown_table_rows(content: str) -> List[List[str]]:
+    """Cells of each pipe-delimited line; lines with fewer than two pipes are skipped"""
+    rows = []
+    for line in content.strip().split('\n'):
+        cells = [c.strip() for c in line.split('|')]
+        if len(cells) > 2:
+            if cells[0] == '': cells.pop(0)
+            if cells[-1] == '': cells.pop(-1)
+            rows.append(cells)
+    return rows
+
+def _header_start(markdown: str, anchor: int) -> int:
+    """Start of a header whose "consolidated" is at `anchor`, moved back over "condensed<whitespace>" if present"""
+    i = anchor
+    while i > 0 and markdown[i - 1].isspace():
+        i -= 1
+    if i < anchor and i >= 9 and HEADER_PREFIX.match(markdown, i - 9, i):
+        return i - 9
+    return anchor
+
+def _partial_phrase(words: List[str]) -> str:
+    """Regex for any non-empty prefix of `words` joined by whitespace"""
+    word = re.escape(words[0])
+    heads = "|".join(re.escape(words[0][:i]) for i in range(1, len(words[0])))
+    if len(words) == 1:
+        return f"(?:{word}|{heads})"
+    return rf"(?:{word}(?:\s+{_partial_phrase(words[1:])}?|\s*)|{heads})"
+
+# A header cut off by the end of the data received so far
+HEADER_PARTIAL = re.compile(
+    "(?:" + "|".join(_partial_phrase(phrase.split()) for phrase in (
+        "consolidated statements of operations", "consolidated statements of income",
+        "consolidated statements of earnings", "consolidated statements of cash flows",
+        "consolidated balance sheets")) + r")\Z",
+    re.IGNORECASE
+)
+
+class AdeMarkdownTokenizer:
+    """
+    Single linear scan of an ADE markdown document, fed in pieces.
+    
+    `feed` returns, in document order, every token that the text received so
+    far settles: {'type': 'header', 'section': 'is'|'bs'|'cf'} for statement
+    headers and {'type': 'html_table'|'md_table', 'rows': [...]} for tables
+    (rows already split into cells), each with its 'start' offset; `close`
+    returns the rest. An HTML table runs from `<table...>` to the next
+    `</table>`; a markdown table is a run of consecutive lines starting with
+    '|'. Headers inside a table are still reported after it, and `<table` tags
+    inside an HTML table or table lines already consumed are not reported twice.
+    
+    Each token kind has its own cursor, advanced with literal searches and
+    anchored matches only, and the earliest pending token is emitted next;
+    no cursor ever moves backwards, so the scan is linear in document size.
+    A cursor that runs into the end of the data received so far waits at the
+    earliest offset a token could still start, and text before every cursor
+    is dropped, so the buffer holds little more than the table being read.
+    While an HTML table is open, pieces that cannot end it are only collected
+    and joined once the end arrives, so a long table is not copied per piece.
+    """
+    
+    def __init__(self):
+        self.buffer = ''
+        self.pending = []  # pieces received while an HTML table is open
+        self.tail = ''  # last characters received, for an end tag split across pieces
+        self.base = 0  # document offset of buffer[0]
+        self.final = False
+        self.header_pos = self.html_pos = self.md_pos = 0
+        self.header = self.html = self.md = None  # next token, once settled
+        self.html_open = self.md_start = None  # table found, end not seen yet
+        self.html_tag_closed = False
+        self.html_scan = self.md_scan = 0  # resume offsets inside those tables
+    
+    def feed(self, text: str) -> List[Dict[str, Any]]:
+        window = self.tail + text
+        self.tail = window[-(len('</table>') - 1):]
+        # Only the open table can settle next; wait for the end of its tag or the table
+        if self.html_open is not None and self.html is None and self.md_start is None:
+            if not ('>' in text if not self.html_tag_closed else HTML_TABLE_END.search(window)):
+                self.pending.append(text)
+                return []
+        self._join(text)
+        return self._scan()
+    
+    def close(self) -> List[Dict[str, Any]]:
+        self.final = True
+        self._join('')
+        return self._scan()
+    
+    def _join(self, text: str):
+        if self.pending:
+            self.pending.append(text)
+            self.buffer += ''.join(self.pending)
+            self.pending = []
+        else:
+            self.buffer += text
+    
+    def _next_header(self):
+        buffer, base = self.buffer, self.base
+        while self.header is None:
+            anchor = HEADER_ANCHOR.search(buffer, self.header_pos - base)
+            if anchor is None:
+                if self.final:
+                    self.header_pos = None
+                else:
+                    self.header_pos = max(self.header_pos, base + len(buffer) - len('consolidated') + 1)
+                return
+            match = HEADER_PATTERN.match(buffer, anchor.start())
+            if match:
+                self.header = (base + _header_start(buffer, anchor.start()), match.lastgroup, base + match.end())
+            elif not self.final and HEADER_PARTIAL.match(buffer, anchor.start()):
+                self.header_pos = base + anchor.start()
+                return
+            else:
+                self.header_pos = base + anchor.start() + 1
+    
+    def _next_html(self):
+        buffer, base = self.buffer, self.base
+        if self.html_open is None:
+            match = HTML_TABLE_START.search(buffer, self.html_pos - base)
+            if match is None:
+                if self.final:
+                    self.html_pos = None
+                else:
+                    self.html_pos = max(self.html_pos, base + len(buffer) - len('<table') + 1)
+                return
+            self.html_open = self.html_scan = base + match.start()
+            self.html_tag_closed = False
+        if not self.html_tag_closed:
+            open_end = buffer.find('>', self.html_scan - base)
+            if open_end < 0:
+                self.html_scan = base + len(buffer)
+            else:
+                self.html_tag_closed = True
+                self.html_scan = base + open_end + 1
+        if self.html_tag_closed:
+            close = HTML_TABLE_END.search(buffer, self.html_scan - base)
+            if close is not None:
+                rows = html_table_rows(buffer[self.html_open - base:close.end()])
+                self.html = (self.html_open, rows, base + close.end())
+                return
+            self.html_scan = max(self.html_scan, base + len(buffer) - len('</table>') + 1)
+        if self.final:
+            # No later '<table' can close either
+            self.html_pos = self.html_open = None
+    
+    def _next_md(self):
+        buffer, base = self.buffer, self.base
+        length = len(buffer)
+        if self.md_start is None:
+            if self.md_pos == 0 and buffer.startswith('|'):
+                newline = -1
+            elif self.md_pos == 0 and not buffer and not self.final:
+                return
+            else:
+                newline = buffer.find('\n|', max(self.md_pos - 1 - base, 0))
+                if newline < 0:
+                    if self.final:
+                        self.md_pos = None
+                    else:
+                        self.md_pos = max(self.md_pos, base + length)
+                    return
+            self.md_start = self.md_scan = base + newline + 1
+        end = self.md_scan - base
+        while end < length and buffer[end] == '|':
+            newline = buffer.find('\n', end)
+            if newline < 0:
+                if not self.final:
+                    break
+                end = length
+            else:
+                end = newline + 1
+        self.md_scan = base + end
+        # The run ends at the first line not starting with '|', which may not have arrived yet
+        if self.final or (end < length and buffer[end] != '|'):
+            self.md = (self.md_start, markdown_table_rows(buffer[self.md_start - base:end]), base + end)
+            self.md_start = None
+    
+    def _scan(self) -> List[Dict[str, Any]]:
+        tokens = []
+        while True:
+            if self.header is None and self.header_pos is not None:
+                self._next_header()
+            if self.html is None and self.html_pos is not None:
+                self._next_html()
+            if self.md is None and self.md_pos is not None:
+                self._next_md()
+            # Settled tokens, and the earliest offset each unsettled cursor can still yield
+            settled, waiting = [], []
+            if self.header is not None:
+                settled.append((self.header[0], 0))
+            elif self.header_pos is not None:
+                waiting.append(self.header_pos)
+            if self.html is not None:
+                settled.append((self.html[0], 1))
+            elif self.html_pos is not None:
+                waiting.append(self.html_open if self.html_open is not None else self.html_pos)
+            if self.md is not None:
+                settled.append((self.md[0], 2))
+            elif self.md_pos is not None:
+                waiting.append(self.md_start if self.md_start is not None else self.md_pos)
+            if not settled:
+                break
+            start, kind = min(settled)
+            if waiting and start >= min(waiting):
+                break
+            if kind == 0:
+                _, section, self.header_pos = self.header
+                self.header = None
+                tokens.append({'type': 'header', 'section': section, 'start': start})
+            elif kind == 1:
+                _, rows, self.html_pos = self.html
+                self.html = self.html_open = None
+                tokens.append({'type': 'html_table', 'rows': rows, 'start': start})
+            else:
+                _, rows, self.md_pos = self.md
+                self.md = None
+                tokens.append({'type': 'md_table', 'rows': rows, 'start': start})
+        self._trim()
+        return tokens
+    
+    def _trim(self):
+        """Drop buffered text that no cursor can reach again"""
+        positions = [p for p in (self.header_pos, self.html_pos, self.md_pos, self.html_open, self.md_start) if p is not None]
+        if not positions:
+            self.buffer, self.base = '', self.base + len(self.buffer)
+            return
+        # Keep the newline before the markdown cursor and a "condensed" prefix before a header
+        keep = max(min(positions) - 1 - self.base, 0)
+        while keep > 0 and self.buffer[keep - 1].isspace():
+            keep -= 1
+        keep = max(keep - len('condensed'), 0)
+        if keep >= len(self.buffer) // 2:
+            self.buffer = self.buffer[keep:]
+            self.base += keep
+
+def tokenize_ade_markdown(markdown: str) -> Iterator[Dict[str, Any]]:
+    """Tokens of a complete ADE markdown document (see `AdeMarkdownTokenizer`)"""
+    tokenizer = AdeMarkdownTokenizer()
+    yield from tokenizer.feed(markdown)
+    yield from tokenizer.close()
+
+# Quarterly column header, searched across streamed pieces
+QUARTERLY_PATTERN = re.compile(r"three\s+months\s+ended", re.IGNORECASE)
+QUARTERLY_PARTIAL = re.compile(_partial_phrase(["three", "months", "ended"]) + r"\Z", re.IGNORECASE)
+
+# Response body chunk size for streamed ADE responses
+RESPONSE_CHUNK_SIZE = 64 * 1024
+
+JSON_SPACE = re.compile(r"[ \t\n\r]*")
+# Complete escapes only, so a string can be decoded up to any match end
+JSON_STRING_BODY = re.compile(
+    r'(?:[^"\\]+|\\["\\/bfnrt]|\\u(?![dD][89abAB])[0-9a-fA-F]{4}'
+    r'|\\u[dD][89abAB][0-9a-fA-F]{2}(?:\\u[dD][c-fC-F][0-9a-fA-F]{2}|(?=[^\\]|\\[^u]|\\u(?:[0-9abcefABCEF]|[dD][0-9abAB]))))*'
+)
+JSON_STRING_SPECIAL = re.compile(r'["\\]')
+JSON_STRUCTURE = re.compile(r'["{}\[\]]')
+JSON_SCALAR = re.compile(r"[^,}\]\s]*")
+
+class AdeResponseReader:
+    """
+    Incremental reader for the JSON body of an ADE parse response.
+    
+    `markdown()` decodes the top-level `markdown` field chunk by chunk and
+    yields it in pieces, then reads the body to the end; `metadata` is filled
+    in from the `metadata` field along the way. Every other field (the
+    per-chunk markdown and grounding boxes make up most of a response) is
+    skipped without being decoded or kept, so memory stays at about one body
+    chunk however large the response.
+    """
+    
+    def __init__(self, chunks: Iterable[bytes]):
+        self.chunks = iter(chunks)
+        self.decoder = codecs.getincrementaldecoder('utf-8')()
+        self.buffer = ''
+        self.pos = 0
+        self.mark: Optional[int] = None  # start of a value being kept
+        self.metadata: Dict[str, Any] = {}
+    
+    def _fill(self):
+        """Append the next chunk, dropping text already consumed"""
+        text = ''
+        for chunk in self.chunks:
+            text = self.decoder.decode(chunk)
+            if text:
+                break
+        else:
+            text = self.decoder.decode(b'', final=True)
+            if not text:
+                raise ValueError("Truncated Landing AI response")
+        drop = self.pos if self.mark is None else self.mark
+        self.buffer = self.buffer[drop:] + text
+        self.pos -= drop
+        if self.mark is not None:
+            self.mark -= drop
+    
+    def _peek(self) -> str:
+        """Next non-whitespace character, left unconsumed"""
+        while True:
+            self.pos = JSON_SPACE.match(self.buffer, self.pos).end()
+            if self.pos < len(self.buffer):
+                return self.buffer[self.pos]
+            self._fill()
+    
+    def _expect(self, char: str):
+        if self._peek() != char:
+            raise ValueError(f"Malformed Landing AI response: expected {char!r} at offset {self.pos}")
+        self.pos += 1
+    
+    def _string(self) -> Iterator[str]:
+        """Decoded pieces of the string whose opening quote was just consumed"""
+        while True:
+            end = JSON_STRING_BODY.match(self.buffer, self.pos).end()
+            if end > self.pos:
+                yield json.loads('"' + self.buffer[self.pos:end] + '"')
+                self.pos = end
+            if end < len(self.buffer) and self.buffer[end] == '"':
+                self.pos = end + 1
+                return
+            if len(self.buffer) - end >= 12:  # longer than any escape, a surrogate pair included
+                raise ValueError(f"Malformed Landing AI response: bad string escape at offset {end}")
+            self._fill()
+    
+    def _skip_string(self):
+        while True:
+            match = JSON_STRING_SPECIAL.search(self.buffer, self.pos)
+            if match is None:
+                self.pos = len(self.buffer)
+            elif match.group() == '"':
+                self.pos = match.end()
+                return
+            elif match.end() < len(self.buffer):
+                self.pos = match.end() + 1
+                continue
+            else:
+                self.pos = match.start()
+            self._fill()
+    
+    def _skip_value(self):
+        char = self._peek()
+        if char == '"':
+            self.pos += 1
+            self._skip_string()
+        elif char in '{[':
+            depth = 0
+            while True:
+                match = JSON_STRUCTURE.search(self.buffer, self.pos)
+                if match is None:
+                    self.pos = len(self.buffer)
+                    self._fill()
+                    continue
+                self.pos = match.end()
+                if match.group() == '"':
+                    self._skip_string()
+                elif match.group() in '{[':
+                    depth += 1
+                else:
+                    depth -= 1
+                    if depth == 0:
+                        return
+        else:
+            while True:
+                end = JSON_SCALAR.match(self.buffer, self.pos).end()
+                if end < len(self.buffer):
+                    self.pos = end
+                    return
+                self._fill()
+    
+    def markdown(self) -> Iterator[str]:
+        self._expect('{')
+        if self._peek() == '}':
+            return
+        while True:
+            self._expect('"')
+            key = ''.join(self._string())
+            self._expect(':')
+            if key == 'markdown' and self._peek() == '"':
+                self.pos += 1
+                yield from self._string()
+            elif key == 'metadata':
+                self._peek()
+                self.mark = self.pos
+                self._skip_value()
+                self.metadata.update(json.loads(self.buffer[self.mark:self.pos]))
+                self.mark = None
+            else:
+                self._skip_value()
+            char = self._peek()
+            self.pos += 1
+            if char == '}':
+                return
+            if char != ',':
+                raise ValueError(f"Malformed Landing AI response: unexpected {char!r} at offset {self.pos - 1}")
+
+class LabelIndex:
+    """
+    Row-label index over one statement section, built once per parse.
+    
+    Synonym lookup keeps the parser's first-match-wins rule: for each synonym
+    in order, an exact label match wins, otherwise the earliest row whose
+    label (under 100 characters) contains the synonym; rows whose value does
+    not parse are skipped. Substring search runs over all labels joined into
+    one buffer, so a miss costs one C-level `str.find` rather than a Python
+    loop over every row, and each synonym is resolved at most once.
+    """
+    
+    SEPARATOR = "\x00"
+    
+    def __init__(self, field_map: Dict[str, str], parse: Callable[[str], Optional[float]]):
+        self.field_map = field_map
+        self.parse = parse
+        self.labels = [label for label in field_map if len(label) < 100]
+        self.starts = []
+        offset = 0
+        for label in self.labels:
+            self.starts.append(offset)
+            offset += len(label) + len(self.SEPARATOR)
+        self.text = self.SEPARATOR.join(self.labels)
+        self._resolved: Dict[str, Optional[float]] = {}
+    
+    def lookup(self, term: str) -> Optional[float]:
+        """Value for one lower-cased synonym, or None if no row matches"""
+        if term not in self._resolved:
+            self._resolved[term] = self._search(term)
+        return self._resolved[term]
+    
+    def _search(self, term: str) -> Optional[float]:
+        if term in self.field_map:
+            value = self.parse(self.field_map[term])
+            if value is not None:
+                return value
+        position = self.text.find(term) if self.labels else -1
+        while position >= 0:
+            row = bisect_right(self.starts, position) - 1
+            value = self.parse(self.field_map[self.labels[row]])
+            if value is not None:
+                return value
+            # Continue from the next row's label
+            position = self.text.find(term, self.starts[row] + len(self.labels[row]) + len(self.SEPARATOR))
+        return None
+    
+    def resolve(self, synonyms: List[str]) -> Optional[float]:
+        """Value of the first synonym that matches a row"""
+        for synonym in synonyms:
+            value = self.lookup(synonym.lower())
+            if value is not None:
+                return value
+        return None
+
+# Version of cached ADE responses (their markdown and metadata); bump when the
+# parse request or the cached fields change
+ADE_RESPONSE_CACHE_VERSION = "ade-parse-v2"
+
+def parser_fingerprint() -> str:
+    """
+    Version of cached parsed reports: a hash of this parser and the report
+    models, so any parser change re-derives reports from cached responses.
+    """
+    digest = hashlib.sha256()
+    for module_file in (__file__, inspect.getfile(FinancialReport)):
+        with open(module_file, "rb") as f:
+            digest.update(f.read())
+    return digest.hexdigest()[:16]
+
+def file_sha256(path: str) -> str:
+    """SHA-256 of a file's bytes, read in blocks"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1024 * 1024), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+def split_pdf_pages(pdf_path: str, pages_per_range: int) -> List[Tuple[int, int, bytes]]:
+    """
+    Splits a PDF into consecutive ranges of at most `pages_per_range` pages,
+    as (first_page, last_page, pdf_bytes) with 1-based inclusive page numbers.
+    Needs pypdf.
+    """
+    try:
+        from pypdf import PdfReader, PdfWriter
+    except ImportError:
+        raise ImportError("Page-range extraction needs pypdf: pip install pypdf") from None
+    reader = PdfReader(pdf_path)
+    page_count = len(reader.pages)
+    ranges = []
+    for start in range(0, page_count, pages_per_range):
+        writer = PdfWriter()
+        for page in reader.pages[start:start + pages_per_range]:
+            writer.add_page(page)
+        buffer = io.BytesIO()
+        writer.write(buffer)
+        ranges.append((start + 1, min(start + pages_per_range, page_count), buffer.getvalue()))
+    return ranges
+
+def _copy_chunks(chunks: Iterable[bytes], path: str) -> Iterator[bytes]:
+    """Passes response chunks through, writing them to `path` as well"""
+    with open(path, 'wb') as f:
+        for chunk in chunks:
+            f.write(chunk)
+            yield chunk
+
+def _keep_response(pieces: Iterable[str], metadata: Dict[str, Any], kept: Dict[str, Any]) -> Iterator[str]:
+    """Passes markdown pieces through; once they are exhausted, `kept` holds the markdown and metadata"""
+    markdown = []
+    for piece in pieces:
+        markdown.append(piece)
+        yield piece
+    kept.update(markdown=''.join(markdown), metadata=metadata)
 
 class LandingAIClient:
-    def __init__(self, api_key: str):
+    def __init__(self, api_key: str, response_cache: Optional[ContentCache] = None,
+                 report_cache: Optional[ContentCache] = None, pages_per_range: Optional[int] = None,
+                 max_concurrency: int = 4, max_retries: int = 2, retry_backoff_s: float = 2.0):
+        """
+        `response_cache` and `report_cache` are optional extraction caches keyed
+        by the SHA-256 of the PDF bytes: the ADE response's markdown and
+        metadata, the only fields the parser reads (build it with
+        `version=ADE_RESPONSE_CACHE_VERSION`), and the parsed report
+        (`version=parser_fingerprint()`).
+        
+        With `pages_per_range` set, PDFs longer than that are split into page
+        ranges that are extracted concurrently (see `extract_ranges`).
+        """
         self.api_key = api_key
         self.base_url = "https://api.va.landing.ai/v1/ade"
+        self.response_cache = response_cache
+        self.report_cache = report_cache
+        self.pages_per_range = pages_per_range
+        self.max_concurrency = max_concurrency
+        self.max_retries = max_retries
+        self.retry_backoff_s = retry_backoff_s
 
     def extract_data(self, pdf_path: str) -> FinancialReport:
         """
         Extracts data from a PDF using Landing AI ADE API.
+        
+        With caches configured, a PDF seen before costs no API call: its report
+        comes from the report cache, or is re-parsed from the cached raw
+        response when the parser has changed since. The report's pdf_metadata
+        then records the PDF hash, which tier answered and both caches' stats.
+        On a hit its duration_ms and credit_usage are this call's (no credits),
+        and those of the extraction that filled the cache move to
+        original_duration_ms and original_credit_usage.
         """
+        if self.response_cache is None and self.report_cache is None:
+            return self._request_report(pdf_path)
+        
+        started = time.perf_counter()
+        content_sha256 = file_sha256(pdf_path)
+        report, cache_status = None, "miss"
+        if self.report_cache is not None:
+            cached = self.report_cache.get(content_sha256)
+            if cached is not None:
+                report, cache_status = FinancialReport.model_validate_json(cached), "report"
+        if report is None and self.response_cache is not None:
+            cached = self.response_cache.get(content_sha256)
+            if cached is not None:
+                report, cache_status = self.parse_landing_ai_stream([cached.encode('utf-8')]), "response"
+        if report is None:
+            kept: Optional[Dict[str, Any]] = {} if self.response_cache is not None else None
+            report = self._request_report(pdf_path, kept)
+            if kept is not None:
+                # Only what the parser read: never the whole response body, which
+                # also carries per-chunk markdown and grounding
+                self.response_cache.put(content_sha256, json.dumps(kept))
+        if self.report_cache is not None and cache_status != "report":
+            self.report_cache.put(content_sha256, report.model_dump_json())
+        
+        cache_stats = {cache.namespace: cache.stats() for cache in (self.response_cache, self.report_cache) if cache}
+        metadata = report.pdf_metadata
+        update = {'content_sha256': content_sha256, 'cache_status': cache_status, 'cache_stats': cache_stats}
+        if cache_status != "miss":
+            update.update({
+                'duration_ms': (time.perf_counter() - started) * 1000,
+                'credit_usage': 0.0,
+                'original_duration_ms': metadata.duration_ms,
+                'original_credit_usage': metadata.credit_usage
+            })
+        return report.model_copy(update={'pdf_metadata': metadata.model_copy(update=update)})
+    
+    def _post_document(self, document: Union[BinaryIO, Tuple[str, bytes, str]]) -> requests.Response:
+        """Uploads one document for extraction; the response body is left unread"""
         headers = {
             "Authorization": f"Bearer {self.api_key}",
         }
-        
-        # Upload the PDF and request extraction
         # Increase timeout to 15 minutes for large financial PDFs
-        with open(pdf_path, 'rb') as f:
-            files = {'document': f}
-            response = requests.post(
-                f"{self.base_url}/parse",
-                headers=headers,
-                files=files,
-                timeout=900  # 15 minutes timeout for large PDFs
-            )
-        
+        response = requests.post(
+            f"{self.base_url}/parse",
+            headers=headers,
+            files={'document': document},
+            timeout=900,  # 15 minutes timeout for large PDFs
+            stream=True  # the body is parsed as it arrives
+        )
         # Only accept 200 OK. 206 (Partial Content) means corrupted data
         if response.status_code != 200:
-            error_msg = f"Landing AI API error: {response.status_code}"
-            if response.status_code == 206:
-                error_msg += " - PDF processing incomplete/corrupted. Try a simpler PDF or fewer pages."
-            else:
-                error_msg += f" - {response.text[:500]}"  # Limit error text
+            with response:
+                error_msg = f"Landing AI API error: {response.status_code}"
+                if response.status_code == 206:
+                    error_msg += " - PDF processing incomplete/corrupted. Try a simpler PDF or fewer pages."
+                else:
+                    error_msg += f" - {response.text[:500]}"  # Limit error text
             raise Exception(error_msg)
+        return response
+    
+    def _request_report(self, pdf_path: str, kept: Optional[Dict[str, Any]] = None) -> FinancialReport:
+        """Uploads the PDF and parses the response as it streams in; its markdown and metadata are stored in `kept` if given"""
+        if self.pages_per_range:
+            ranges = split_pdf_pages(pdf_path, self.pages_per_range)
+            if len(ranges) > 1:
+                return self.extract_ranges(ranges, os.path.basename(pdf_path), kept)
+        
+        # Upload the PDF and request extraction
+        with open(pdf_path, 'rb') as f:
+            response = self._post_document(f)
+        
+        with response:
+            chunks = response.iter_content(chunk_size=RESPONSE_CHUNK_SIZE)
+            
+            # Debug: set LANDING_AI_DEBUG_RESPONSE to a file path to keep the raw response body
+            debug_file = os.getenv("LANDING_AI_DEBUG_RESPONSE")
+            if debug_file:
+                chunks = _copy_chunks(chunks, debug_file)
+            
+            # Transform Landing AI response into our FinancialReport structure
+            report = self.parse_landing_ai_stream(chunks, kept)
+        
+        if debug_file:
+            print(f"Landing AI response saved to: {debug_file}")
+        return report
+    
+    def _extract_range(self, first_page: int, last_page: int, document: bytes) -> Tuple[str, Dict[str, Any], int]:
+        """Markdown and metadata of one page range, retried on failure; also returns the attempts made"""
+        for attempt in range(self.max_retries + 1):
+            try:
+                response = self._post_document((f"pages_{first_page}-{last_page}.pdf", document, 'application/pdf'))
+                with response:
+                    reader = AdeResponseReader(response.iter_content(chunk_size=RESPONSE_CHUNK_SIZE))
+                    markdown = ''.join(reader.markdown())
+                return markdown, reader.metadata, attempt + 1
+            except Exception as e:
+                if attempt == self.max_retries:
+                    raise Exception(f"Pages {first_page}-{last_page} failed after {attempt + 1} attempts: {e}") from e
+                print(f"[EXTRACTION] Pages {first_page}-{last_page} failed ({e}); retrying")
+                time.sleep(self.retry_backoff_s * 2 ** attempt)
+    
+    def extract_ranges(self, ranges: List[Tuple[int, int, bytes]], filename: Optional[str] = None,
+                       kept: Optional[Dict[str, Any]] = None) -> FinancialReport:
+        """
+        Extracts a document split into page ranges (as from `split_pdf_pages`).
         
-        raw_data = response.json()
+        Ranges are uploaded concurrently, at most `max_concurrency` at a time,
+        and a failed range (including a 206) is retried on its own up to
+        `max_retries` times with exponential backoff; the document fails only
+        if a range still fails after that (ranges not yet started are then
+        skipped). The range markdowns are merged in
+        page order and parsed as one document; page counts and credits are
+        summed, and duration is the wall-clock time of the whole extraction.
+        The merged markdown and metadata are stored in `kept` if given.
+        """
+        started = time.perf_counter()
+        abandoned = threading.Event()
+        
+        def extract(first_page, last_page, document):
+            # A range that still fails sinks the document: ranges not started yet are never uploaded
+            if abandoned.is_set():
+                return None
+            try:
+                return self._extract_range(first_page, last_page, document)
+            except Exception:
+                abandoned.set()
+                raise
         
-        # Debug: Save the raw response to a file for inspection
-        debug_file = "/tmp/landing_ai_debug_response.json"
-        with open(debug_file, 'w') as f:
-            json.dump(raw_data, f, indent=2)
-        print(f"Landing AI response saved to: {debug_file}")
+        with ThreadPoolExecutor(max_workers=self.max_concurrency) as executor:
+            futures = [executor.submit(extract, first, last, document) for first, last, document in ranges]
+        failed = [str(future.exception()) for future in futures if future.exception() is not None]
+        if failed:
+            raise Exception(f"Landing AI API error: {len(failed)} of {len(ranges)} page ranges failed - " + "; ".join(failed))
+        results = [future.result() for future in futures]
         
-        # Transform Landing AI response into our FinancialReport structure
-        return self.parse_landing_ai_response(raw_data)
+        metadata = {
+            'page_count': sum(meta.get('page_count', last - first + 1)
+                              for (first, last, _), (_, meta, _) in zip(ranges, results)),
+            'duration_ms': (time.perf_counter() - started) * 1000,
+            'credit_usage': sum(meta.get('credit_usage', 0.0) for _, meta, _ in results),
+            'job_id': ','.join(meta.get('job_id', 'unknown') for _, meta, _ in results),
+            'filename': filename,
+            'page_ranges': [{'pages': [first, last], 'attempts': attempts}
+                            for (first, last, _), (_, _, attempts) in zip(ranges, results)]
+        }
+        # Blank lines between ranges keep tables at range boundaries apart
+        pieces = []
+        for markdown, _, _ in results:
+            pieces.extend([markdown, '\n\n'])
+        if kept is not None:
+            kept.update(markdown=''.join(pieces), metadata=metadata)
+        return self._parse_markdown(pieces, metadata)
     
     def parse_landing_ai_response(self, raw_data: Dict[str, Any]) -> FinancialReport:
         """
@@ -61,11 +820,25 @@ class LandingAIClient:
         This parser extracts Tier 1-3 data using robust synonym matching and section-aware parsing.
         It handles mixed HTML/Markdown tables and plain text headers.
         """
-        import re
-        from html.parser import HTMLParser
-        
-        # Extract the markdown content
-        markdown_content = raw_data.get('markdown', '')
+        return self._parse_markdown([raw_data.get('markdown', '')], raw_data.get('metadata', {}))
+    
+    def parse_landing_ai_stream(self, chunks: Iterable[bytes],
+                                kept: Optional[Dict[str, Any]] = None) -> FinancialReport:
+        """
+        Same as `parse_landing_ai_response`, for a raw ADE response body read in
+        chunks: the markdown is tokenized as it is decoded and the rest of the
+        response is skipped, so the full JSON is never held in memory. The
+        markdown and metadata are stored in `kept` if given.
+        """
+        reader = AdeResponseReader(chunks)
+        pieces = reader.markdown()
+        if kept is not None:
+            pieces = _keep_response(pieces, reader.metadata, kept)
+        # reader.metadata is filled in by the time the markdown is exhausted
+        return self._parse_markdown(pieces, reader.metadata)
+    
+    def _parse_markdown(self, pieces: Iterable[str], metadata: Dict[str, Any]) -> FinancialReport:
+        """Builds the FinancialReport from the ADE markdown, given in consecutive pieces"""
         
         # Helper to clean and convert to number
         def clean_number(text: str) -> Optional[float]:
@@ -83,92 +856,31 @@ class LandingAIClient:
             except:
                 return None
 
-        # --- 1. Identify Sections and Tables by Position ---
+        # --- 1. Tokenize: headers and tables in document order ---
         
-        # Regex for headers
-        header_patterns = {
-            'is': r"(?:CONDENSED\s+)?CONSOLIDATED\s+STATEMENTS\s+OF\s+(?:OPERATIONS|INCOME|EARNINGS)",
-            'bs': r"(?:CONDENSED\s+)?CONSOLIDATED\s+BALANCE\s+SHEETS",
-            'cf': r"(?:CONDENSED\s+)?CONSOLIDATED\s+STATEMENTS\s+OF\s+CASH\s+FLOWS"
-        }
+        is_quarterly = False
+        quarterly_tail = ''
         
-        # Find all headers and their positions
-        items = []
-        for section, pattern in header_patterns.items():
-            for match in re.finditer(pattern, markdown_content, re.IGNORECASE):
-                items.append({'type': 'header', 'section': section, 'start': match.start()})
-        
-        # Find all HTML tables
-        html_table_pattern = r"<table[^>]*>.*?</table>"
-        for match in re.finditer(html_table_pattern, markdown_content, re.DOTALL | re.IGNORECASE):
-            items.append({'type': 'html_table', 'content': match.group(0), 'start': match.start()})
-            
-        # Find all Markdown tables (blocks of lines starting with |)
-        # We look for at least 2 consecutive lines starting with |
-        md_table_pattern = r"(?:^\|.*$(?:\n|$))+"
-        for match in re.finditer(md_table_pattern, markdown_content, re.MULTILINE):
-            items.append({'type': 'md_table', 'content': match.group(0), 'start': match.start()})
-            
-        # Sort items by position
-        items.sort(key=lambda x: x['start'])
+        def tokenize():
+            nonlocal is_quarterly, quarterly_tail
+            tokenizer = AdeMarkdownTokenizer()
+            for piece in pieces:
+                if not is_quarterly:
+                    # Carry over a phrase cut off at the end of the piece
+                    text = quarterly_tail + piece
+                    is_quarterly = QUARTERLY_PATTERN.search(text) is not None
+                    partial = QUARTERLY_PARTIAL.search(text)
+                    quarterly_tail = text[partial.start():] if partial else ''
+                yield from tokenizer.feed(piece)
+            yield from tokenizer.close()
         
         # --- 2. Process Items and Assign to Sections ---
         
         section_maps = {'is': {}, 'bs': {}, 'cf': {}}
         current_section = None
         
-        # HTML Parser Class
-        class TableParser(HTMLParser):
-            def __init__(self):
-                super().__init__()
-                self.tables = []
-                self.current_table = []
-                self.current_row = []
-                self.current_cell = ''
-                self.in_table = False
-                self.in_row = False
-                self.in_cell = False
-            def handle_starttag(self, tag, attrs):
-                if tag == 'table':
-                    self.in_table = True
-                    self.current_table = []
-                elif tag == 'tr' and self.in_table:
-                    self.in_row = True
-                    self.current_row = []
-                elif tag == 'td' and self.in_row:
-                    self.in_cell = True
-                    self.current_cell = ''
-            def handle_endtag(self, tag):
-                if tag == 'table':
-                    self.in_table = False
-                    if self.current_table: self.tables.append(self.current_table)
-                elif tag == 'tr' and self.in_row:
-                    self.in_row = False
-                    if self.current_row: self.current_table.append(self.current_row)
-                elif tag == 'td' and self.in_cell:
-                    self.in_cell = False
-                    self.current_row.append(self.current_cell.strip())
-            def handle_data(self, data):
-                if self.in_cell: self.current_cell += data
-
-        def parse_table_content(content, table_type):
+        def parse_table_content(rows):
             extracted_map = {}
-            rows = []
-            
-            if table_type == 'html_table':
-                parser = TableParser()
-                parser.feed(content)
-                if parser.tables:
-                    rows = parser.tables[0]
-            elif table_type == 'md_table':
-                lines = content.strip().split('\n')
-                for line in lines:
-                    cells = [c.strip() for c in line.split('|')]
-                    if len(cells) > 2:
-                        if cells[0] == '': cells.pop(0)
-                        if cells[-1] == '': cells.pop(-1)
-                        rows.append(cells)
-            
             # Convert rows to map
             for row in rows:
                 if len(row) >= 2:
@@ -184,7 +896,7 @@ class LandingAIClient:
             return extracted_map
 
         # Iterate and assign
-        for item in items:
+        for item in tokenize():
             if item['type'] == 'header':
                 current_section = item['section']
             elif item['type'] in ['html_table', 'md_table']:
@@ -194,7 +906,7 @@ class LandingAIClient:
                 # Let's add to all if no section found yet (unlikely with regex), or maybe 'is' as default?
                 target_sections = [current_section] if current_section else ['is', 'bs', 'cf']
                 
-                table_map = parse_table_content(item['content'], item['type'])
+                table_map = parse_table_content(item['rows'])
                 
                 for sec in target_sections:
                     section_maps[sec].update(table_map)
@@ -203,35 +915,20 @@ class LandingAIClient:
         bs_map = section_maps['bs']
         cf_map = section_maps['cf']
         
-        # Fallback: If maps are empty, try to use all data for all sections
-        if not is_map and not bs_map and not cf_map:
-            # This happens if regex headers failed completely
-            # We just merge all tables into all maps
-            all_data = {}
-            for item in items:
-                if item['type'] in ['html_table', 'md_table']:
-                    all_data.update(parse_table_content(item['content'], item['type']))
-            is_map = all_data
-            bs_map = all_data
-            cf_map = all_data
-
-        # Helper to find value using synonyms from a specific map
-        def get_value(field_map: Dict[str, str], synonyms: List[str], default: Optional[float] = None) -> float:
-            for synonym in synonyms:
-                term = synonym.lower()
-                if term in field_map:
-                    val = clean_number(field_map[term])
-                    if val is not None:
-                        return val
-                for key, val_str in field_map.items():
-                    if term == key or (len(key) < 100 and term in key):
-                        val = clean_number(val_str)
-                        if val is not None:
-                            return val
+        # Index each section once; every synonym lookup below reads the index
+        is_index = LabelIndex(is_map, clean_number)
+        bs_index = LabelIndex(bs_map, clean_number)
+        cf_index = LabelIndex(cf_map, clean_number)
+
+        # Helper to find value using synonyms from a specific section
+        def get_value(index: LabelIndex, synonyms: List[str], default: Optional[float] = None) -> float:
+            val = index.resolve(synonyms)
+            if val is not None:
+                return val
             return default if default is not None else 0.0
 
-        def get_optional_value(field_map: Dict[str, str], synonyms: List[str]) -> Optional[float]:
-            val = get_value(field_map, synonyms, default=None)
+        def get_optional_value(index: LabelIndex, synonyms: List[str]) -> Optional[float]:
+            val = get_value(index, synonyms, default=None)
             return val if val != 0.0 else None
 
         # === TIER 1: Core Financial Statements ===
@@ -239,7 +936,7 @@ class LandingAIClient:
         # --- ANNUALIZATION LOGIC ---
         # Detect if Income Statement data is quarterly based on column header
         # If "Three Months Ended" is found, multiply IS values by 4 to annualize
-        is_quarterly = bool(re.search(r'three\s+months\s+ended', markdown_content, re.IGNORECASE))
+        # (is_quarterly was set while the markdown was tokenized)
         annualization_multiplier = 4.0 if is_quarterly else 1.0
         
         if is_quarterly:
@@ -250,32 +947,32 @@ class LandingAIClient:
             return value * annualization_multiplier if value else 0.0
         
         # Income Statement (Use is_map) - Apply annualization for quarterly data
-        revenue_raw = get_value(is_map, ['Net sales', 'Total net sales', 'Revenue', 'Total revenue', 'Sales'])
+        revenue_raw = get_value(is_index, ['Net sales', 'Total net sales', 'Revenue', 'Total revenue', 'Sales'])
         revenue = annualize(revenue_raw)
         
-        cogs_raw = get_value(is_map, ['Cost of sales', 'Total cost of sales', 'Cost of goods sold', 'Cost of revenue'])
+        cogs_raw = get_value(is_index, ['Cost of sales', 'Total cost of sales', 'Cost of goods sold', 'Cost of revenue'])
         cogs = annualize(cogs_raw)
         
         # FIX 1: Separate Gross Profit (dollar amount) from Gross Margin (percentage)
-        gross_profit_raw = get_value(is_map, ['Gross profit'], default=0.0)
+        gross_profit_raw = get_value(is_index, ['Gross profit'], default=0.0)
         gross_profit = annualize(gross_profit_raw)
         # If not found, calculate it
         if gross_profit == 0 and revenue != 0 and cogs != 0:
             gross_profit = revenue - cogs
             
-        opex_raw = get_value(is_map, ['Total operating expenses', 'Operating expenses', 'Total operating costs'])
+        opex_raw = get_value(is_index, ['Total operating expenses', 'Operating expenses', 'Total operating costs'])
         opex = annualize(opex_raw)
         
-        operating_income_raw = get_value(is_map, ['Operating income', 'Income from operations', 'Operating profit'])
+        operating_income_raw = get_value(is_index, ['Operating income', 'Income from operations', 'Operating profit'])
         operating_income = annualize(operating_income_raw)
         if operating_income == 0 and gross_profit != 0 and opex != 0:
             operating_income = gross_profit - opex
             
-        net_income_raw = get_value(is_map, ['Net income', 'Net earnings', 'Net profit', 'Net loss', 'Net income (loss)'])
+        net_income_raw = get_value(is_index, ['Net income', 'Net earnings', 'Net profit', 'Net loss', 'Net income (loss)'])
         net_income = annualize(net_income_raw)
         
         # For Cash Flow, prefer YTD Net Income if available (to align with YTD cash flow)
-        net_income_ytd = get_value(cf_map, [
+        net_income_ytd = get_value(cf_index, [
             'Net income (loss)',
             'Net loss',
             'Net income'
@@ -283,9 +980,9 @@ class LandingAIClient:
         cf_net_income = net_income_ytd if net_income_ytd is not None else net_income
         
         # FIX 2: Improve SG&A extraction with better synonyms
-        rnd_raw = get_optional_value(is_map, ['Research and development', 'R&D', 'Research & development'])
+        rnd_raw = get_optional_value(is_index, ['Research and development', 'R&D', 'Research & development'])
         rnd = annualize(rnd_raw) if rnd_raw else None
-        sga_raw = get_optional_value(is_map, [
+        sga_raw = get_optional_value(is_index, [
             'Sales, general and administrative', 
             'Selling, general and administrative', 
             'SG&A',
@@ -296,15 +993,15 @@ class LandingAIClient:
         if opex == 0 and (rnd or sga):
             opex = (rnd or 0) + (sga or 0)
 
-        interest_raw = get_value(is_map, ['Interest expense', 'Interest and dividend income'], default=0.0)
+        interest_raw = get_value(is_index, ['Interest expense', 'Interest and dividend income'], default=0.0)
         interest = annualize(interest_raw)
-        taxes_raw = get_value(is_map, ['Provision for income taxes', 'Income tax expense', 'Income tax'])
+        taxes_raw = get_value(is_index, ['Provision for income taxes', 'Income tax expense', 'Income tax'])
         taxes = annualize(taxes_raw)
         
         # Try to find Depreciation in CF if not in IS (common)
-        da_raw = get_value(is_map, ['Depreciation and amortization'], default=0.0)
+        da_raw = get_value(is_index, ['Depreciation and amortization'], default=0.0)
         if da_raw == 0:
-            da_raw = get_value(cf_map, ['Depreciation and amortization', 'Depreciation'], default=0.0)
+            da_raw = get_value(cf_index, ['Depreciation and amortization', 'Depreciation'], default=0.0)
         da = annualize(da_raw)
         
         ebit = operating_income
@@ -337,11 +1034,11 @@ class LandingAIClient:
 
         
         # Balance Sheet (Use bs_map)
-        total_assets = get_value(bs_map, ['Total assets'])
-        total_liabilities = get_value(bs_map, ['Total liabilities'])
+        total_assets = get_value(bs_index, ['Total assets'])
+        total_liabilities = get_value(bs_index, ['Total liabilities'])
         
         # FIX 3: Better equity extraction
-        total_equity = get_value(bs_map, [
+        total_equity = get_value(bs_index, [
             'Shareholders\' equity',
             'Total shareholders\' equity', 
             'Total equity',
@@ -352,7 +1049,7 @@ class LandingAIClient:
             total_equity = total_assets - total_liabilities
         
         # FIX 4: Better cash extraction with more synonyms
-        cash = get_optional_value(bs_map, [
+        cash = get_optional_value(bs_index, [
             'Cash, cash equivalents and marketable securities',
             'Cash and cash equivalents', 
             'Cash and cash equivalents, end of period',
@@ -360,7 +1057,7 @@ class LandingAIClient:
         ])
         
         # FIX 5: Separate short-term and long-term debt properly
-        short_term_debt = get_optional_value(bs_map, [
+        short_term_debt = get_optional_value(bs_index, [
             'Short-term debt',
             'Current portion of long-term debt',
             'Commercial paper',
@@ -371,7 +1068,7 @@ class LandingAIClient:
         ])
         
         # FIX 6: Better long-term debt extraction
-        long_term_debt = get_optional_value(bs_map, [
+        long_term_debt = get_optional_value(bs_index, [
             'Long-term debt', 
             'Long term debt',
             'Term debt',
@@ -381,9 +1078,9 @@ class LandingAIClient:
             'Non-current debt'
         ])
         
-        ar = get_optional_value(bs_map, ['Accounts receivable, net', 'Accounts receivable'])
-        inventory = get_optional_value(bs_map, ['Inventories', 'Inventory'])
-        ap = get_optional_value(bs_map, ['Accounts payable'])
+        ar = get_optional_value(bs_index, ['Accounts receivable, net', 'Accounts receivable'])
+        inventory = get_optional_value(bs_index, ['Inventories', 'Inventory'])
+        ap = get_optional_value(bs_index, ['Accounts payable'])
         
         balance_sheet = BalanceSheet(
             Assets={'TotalAssets': total_assets},
@@ -398,7 +1095,7 @@ class LandingAIClient:
         )
         
         # Cash Flow (Use cf_map)
-        cfo = get_value(cf_map, [
+        cfo = get_value(cf_index, [
             'Net cash provided by operating activities',
             'Net cash used in operating activities',
             'Cash generated by operating activities', 
@@ -411,7 +1108,7 @@ class LandingAIClient:
             cfo = cfo  # Keep negative if cash is used
         
         # FIX 7: Better CapEx extraction
-        capex = get_value(cf_map, [
+        capex = get_value(cf_index, [
             'Purchases related to property and equipment and intangible assets',
             'Payments for acquisition of property, plant and equipment',
             'Capital expenditures',
@@ -425,21 +1122,21 @@ class LandingAIClient:
         # FIX 8: FCF = CFO - CapEx (not just CFO)
         fcf_calc = (cfo - capex) if cfo != 0 else 0.0
         
-        share_repurchases = get_optional_value(cf_map, [
+        share_repurchases = get_optional_value(cf_index, [
             'Payments related to repurchases of common stock',
             'Repurchases of common stock', 
             'Payments for dividends and dividend equivalents'
         ])
         if share_repurchases: share_repurchases = abs(share_repurchases)
         
-        dividends = get_optional_value(cf_map, [
+        dividends = get_optional_value(cf_index, [
             'Dividends paid',
             'Payments for dividends'
         ])
         if dividends: dividends = abs(dividends)
         
         # FIX 9: Better net change in cash extraction
-        net_change_cash = get_value(cf_map, [
+        net_change_cash = get_value(cf_index, [
             'Change in cash and cash equivalents',
             'Increase/(Decrease) in cash, cash equivalents and restricted cash',
             'Increase (decrease) in cash', 
@@ -448,10 +1145,10 @@ class LandingAIClient:
         ], default=0.0)
         
         # FIX 10: Calculate working capital changes from individual components
-        ar_change = get_value(cf_map, ['Accounts receivable'], default=0.0)
-        inv_change = get_value(cf_map, ['Inventories'], default=0.0)
-        ap_change = get_value(cf_map, ['Accounts payable'], default=0.0)
-        accrued_change = get_value(cf_map, ['Accrued and other current liabilities'], default=0.0)
+        ar_change = get_value(cf_index, ['Accounts receivable'], default=0.0)
+        inv_change = get_value(cf_index, ['Inventories'], default=0.0)
+        ap_change = get_value(cf_index, ['Accounts payable'], default=0.0)
+        accrued_change = get_value(cf_index, ['Accrued and other current liabilities'], default=0.0)
         wc_change = ar_change + inv_change + ap_change + accrued_change
         
         cash_flow = CashFlow(
@@ -460,7 +1157,7 @@ class LandingAIClient:
             ChangeInWorkingCapital=wc_change,
             CashFromOperations=cfo,
             CapEx=capex,
-            CashFromInvesting=get_value(cf_map, [
+            CashFromInvesting=get_value(cf_index, [
                 'Net cash used in investing activities',
                 'Cash generated by/(used in) investing activities', 
                 'Cash from investing',
@@ -468,7 +1165,7 @@ class LandingAIClient:
             ], default=0.0),
             DebtRepayment=0.0,
             Dividends=dividends or 0.0,
-            CashFromFinancing=get_value(cf_map, [
+            CashFromFinancing=get_value(cf_index, [
                 'Net cash used in financing activities',
                 'Cash used in financing activities',
                 'Cash generated by/(used in) financing activities',
@@ -511,10 +1208,11 @@ class LandingAIClient:
             },
             source_metadata=[],
             pdf_metadata=PDFMetadata(
-                page_count=raw_data.get('metadata', {}).get('page_count', 0),
-                duration_ms=raw_data.get('metadata', {}).get('duration_ms', 0.0),
-                credit_usage=raw_data.get('metadata', {}).get('credit_usage', 0.0),
-                job_id=raw_data.get('metadata', {}).get('job_id', 'unknown'),
-                filename=raw_data.get('metadata', {}).get('filename')
+                page_count=metadata.get('page_count', 0),
+                duration_ms=metadata.get('duration_ms', 0.0),
+                credit_usage=metadata.get('credit_usage', 0.0),
+                job_id=metadata.get('job_id', 'unknown'),
+                filename=metadata.get('filename'),
+                page_ranges=metadata.get('page_ranges')
             )
         )
@@ -0,0 +1,165 @@
+"""
+Content-Addressed Result Cache
+
+Two-tier cache for expensive, deterministic results (simulations, document
+extraction): an in-process LRU in front of an SQLite file. Keys are canonical
+hashes of the inputs, both tiers evict least-recently-used entries by total
+size, and every entry is stamped with a version so results produced by an
+older engine are never served.
+"""
+
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+def canonical_hash(obj: Any) -> str:
+    """SHA-256 of a canonical JSON encoding (sorted keys, no whitespace)"""
+    payload = json.dumps(obj, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+class ContentCache:
+    """
+    In-process LRU over an optional on-disk SQLite tier.
+
+    Values are strings (typically pydantic `model_dump_json()` output). A disk
+    hit is promoted into memory. `db_path=None` keeps the cache memory-only.
+    Entries whose version differs from `version` are purged when the cache
+    opens and ignored on lookup.
+    """
+
+    def __init__(self, namespace: str, version: str, db_path: Optional[str] = None,
+                 max_memory_bytes: int = 64 * 1024 * 1024, max_disk_bytes: int = 512 * 1024 * 1024):
+        self.namespace = namespace
+        self.version = version
+        self.db_path = db_path
+        self.max_memory_bytes = max_memory_bytes
+        self.max_disk_bytes = max_disk_bytes
+
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+        # key -> (value, UTF-8 size), so eviction never re-encodes a value
+        self._memory: "OrderedDict[str, Tuple[str, int]]" = OrderedDict()
+        self._memory_bytes = 0
+        self._lock = threading.Lock()
+        self._db: Optional[sqlite3.Connection] = None
+        if db_path:
+            self._db = sqlite3.connect(db_path, check_same_thread=False)
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS cache_entries ("
+                " namespace TEXT NOT NULL, key TEXT NOT NULL, version TEXT NOT NULL,"
+                " value TEXT NOT NULL, size INTEGER NOT NULL, last_access REAL NOT NULL,"
+                " PRIMARY KEY (namespace, key))"
+            )
+            # Results from another engine version can never be served again
+            self._db.execute(
+                "DELETE FROM cache_entries WHERE namespace = ? AND version != ?",
+                (namespace, version)
+            )
+            self._db.commit()
+
+    def get(self, key: str) -> Optional[str]:
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                self._memory.move_to_end(key)
+                self.memory_hits += 1
+                return entry[0]
+
+            if self._db is not None:
+                row = self._db.execute(
+                    "SELECT value, size FROM cache_entries WHERE namespace = ? AND key = ? AND version = ?",
+                    (self.namespace, key, self.version)
+                ).fetchone()
+                if row is not None:
+                    self._db.execute(
+                        "UPDATE cache_entries SET last_access = ? WHERE namespace = ? AND key = ?",
+                        (time.time(), self.namespace, key)
+                    )
+                    self._db.commit()
+                    self._remember(key, row[0], row[1])
+                    self.disk_hits += 1
+                    return row[0]
+
+            self.misses += 1
+            return None
+
+    def put(self, key: str, value: str) -> None:
+        size = len(value.encode("utf-8"))
+        with self._lock:
+            self._remember(key, value, size)
+            if self._db is not None:
+                self._db.execute(
+                    "INSERT OR REPLACE INTO cache_entries (namespace, key, version, value, size, last_access)"
+                    " VALUES (?, ?, ?, ?, ?, ?)",
+                    (self.namespace, key, self.version, value, size, time.time())
+                )
+                self._evict_disk()
+                self._db.commit()
+
+    def _remember(self, key: str, value: str, size: int) -> None:
+        previous = self._memory.pop(key, None)
+        if previous is not None:
+            self._memory_bytes -= previous[1]
+        if size > self.max_memory_bytes:
+            return
+        self._memory[key] = (value, size)
+        self._memory_bytes += size
+        while self._memory_bytes > self.max_memory_bytes:
+            _, (_, evicted_size) = self._memory.popitem(last=False)
+            self._memory_bytes -= evicted_size
+            self.evictions += 1
+
+    def _evict_disk(self) -> None:
+        total = self._db.execute(
+            "SELECT COALESCE(SUM(size), 0) FROM cache_entries WHERE namespace = ?", (self.namespace,)
+        ).fetchone()[0]
+        if total <= self.max_disk_bytes:
+            return
+        rows = self._db.execute(
+            "SELECT key, size FROM cache_entries WHERE namespace = ? ORDER BY last_access ASC",
+            (self.namespace,)
+        ).fetchall()
+        for key, size in rows:
+            if total <= self.max_disk_bytes:
+                break
+            self._db.execute("DELETE FROM cache_entries WHERE namespace = ? AND key = ?", (self.namespace, key))
+            total -= size
+            self.evictions += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._memory.clear()
+            self._memory_bytes = 0
+            if self._db is not None:
+                self._db.execute("DELETE FROM cache_entries WHERE namespace = ?", (self.namespace,))
+                self._db.commit()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            disk_entries, disk_bytes = 0, 0
+            if self._db is not None:
+                disk_entries, disk_bytes = self._db.execute(
+                    "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM cache_entries WHERE namespace = ?",
+                    (self.namespace,)
+                ).fetchone()
+            lookups = self.memory_hits + self.disk_hits + self.misses
+            return {
+                "namespace": self.namespace,
+                "version": self.version,
+                "memory_hits": self.memory_hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+                "hit_rate": (self.memory_hits + self.disk_hits) / lookups if lookups else 0.0,
+                "evictions": self.evictions,
+                "memory_entries": len(self._memory),
+                "memory_bytes": self._memory_bytes,
+                "disk_entries": disk_entries,
+                "disk_bytes": disk_bytes,
+            }
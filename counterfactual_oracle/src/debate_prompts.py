@@ -207,7 +207,7 @@ SIMULATION PARAMETERS (The "Knobs"):
 - Revenue Growth Delta: {params.revenue_growth_bps} bps (Shift in annual growth rate)
 - Discount Rate Delta: {params.discount_rate_bps} bps
 
-SIMULATION OUTPUT (5-Year Forecast):
+SIMULATION OUTPUT ({params.forecast_years}-Year Forecast):
 {forecast_str}
 - Median NPV: ${simulation.median_npv:,.0f}
 {fcf_section}
@@ -277,7 +277,7 @@ SIMULATION PARAMETERS (The "Knobs"):
 - Revenue Growth Delta: {params.revenue_growth_bps} bps
 - Discount Rate Delta: {params.discount_rate_bps} bps
 
-SIMULATION OUTPUT (5-Year Forecast):
+SIMULATION OUTPUT ({params.forecast_years}-Year Forecast):
 {forecast_str}
 - Median NPV: ${simulation.median_npv:,.0f}
 {fcf_section}
@@ -0,0 +1,94 @@
+"""
+Goal Seek / Reverse Stress Test
+
+Solves for the ScenarioParams value that puts an NPV statistic on a target
+("what revenue growth delta makes P10 NPV zero?"). Each iteration evaluates a
+batch of candidates on common random numbers, so the objective is a smooth,
+deterministic function of the driver and the bracket shrinks by a factor of
+(candidates + 1) per batched evaluation.
+"""
+
+import numpy as np
+from typing import Tuple
+from .models import FinancialReport, ScenarioParams, GoalSeekResult
+from .sensitivity import SENSITIVITY_DRIVERS, npv_quantile_table
+
+# Column of `npv_quantile_table` holding each statistic
+STATISTICS = {"p10": 0, "median": 1, "p90": 2}
+
+def goal_seek(base_report: FinancialReport, base_params: ScenarioParams, driver: str,
+              target_npv: float = 0.0, statistic: str = "median", bounds: Tuple[float, float] = (-2000.0, 2000.0),
+              tolerance_bps: float = 1.0, candidates_per_iteration: int = 8, max_iterations: int = 12,
+              num_simulations: int = 5000, seed: int = 42) -> GoalSeekResult:
+    """
+    Finds the `driver` setting (bps) at which the NPV `statistic` equals `target_npv`.
+
+    Vectorized bracketing: every iteration evaluates `candidates_per_iteration`
+    evenly spaced points inside the current bracket (the first also evaluates
+    the bounds) in one batch, then keeps the first sub-interval where the
+    objective crosses the target. Once the bracket is narrower than
+    `tolerance_bps`, a final secant step interpolates inside it and the
+    solution is evaluated once more to report the NPV actually achieved.
+
+    Raises ValueError if the target is not bracketed by `bounds`.
+    """
+    if driver not in SENSITIVITY_DRIVERS:
+        raise ValueError(f"Unknown goal-seek driver '{driver}', expected one of {SENSITIVITY_DRIVERS}")
+    if statistic not in STATISTICS:
+        raise ValueError(f"Unknown statistic '{statistic}', expected one of {tuple(STATISTICS)}")
+    lo, hi = sorted(float(b) for b in bounds)
+    if candidates_per_iteration < 1:
+        raise ValueError(f"candidates_per_iteration must be at least 1, got {candidates_per_iteration}")
+
+    column = STATISTICS[statistic]
+
+    def evaluate(values: np.ndarray) -> np.ndarray:
+        scenarios = [base_params.model_copy(update={driver: float(v)}) for v in values]
+        return npv_quantile_table(base_report, scenarios, num_simulations, seed)[:, column] - target_npv
+
+    evaluations = 0
+    iterations = 0
+    values = np.linspace(lo, hi, candidates_per_iteration + 2)
+    residuals = evaluate(values)
+    evaluations += len(values)
+    iterations += 1
+
+    while True:
+        # First sub-interval whose endpoints straddle (or touch) the target
+        crossings = np.flatnonzero(np.sign(residuals[:-1]) * np.sign(residuals[1:]) <= 0)
+        if len(crossings) == 0:
+            raise ValueError(
+                f"Target NPV {target_npv:,.0f} is not bracketed by {driver} in [{lo:g}, {hi:g}] bps "
+                f"({statistic} NPV minus target ranges from {residuals.min():,.0f} to {residuals.max():,.0f})"
+            )
+        i = crossings[0]
+        lo, hi = values[i], values[i + 1]
+        f_lo, f_hi = residuals[i], residuals[i + 1]
+
+        if hi - lo <= tolerance_bps or iterations >= max_iterations:
+            break
+
+        inner = np.linspace(lo, hi, candidates_per_iteration + 2)[1:-1]
+        inner_residuals = evaluate(inner)
+        evaluations += len(inner)
+        iterations += 1
+        values = np.concatenate([[lo], inner, [hi]])
+        residuals = np.concatenate([[f_lo], inner_residuals, [f_hi]])
+
+    # Secant step inside the final bracket
+    solution = lo if f_hi == f_lo else lo - f_lo * (hi - lo) / (f_hi - f_lo)
+    achieved = evaluate(np.array([solution]))[0] + target_npv
+    evaluations += 1
+
+    return GoalSeekResult(
+        driver=driver,
+        statistic=statistic,
+        target_npv=target_npv,
+        solution_bps=float(solution),
+        achieved_npv=float(achieved),
+        bracket=[float(lo), float(hi)],
+        converged=bool(hi - lo <= tolerance_bps),
+        iterations=iterations,
+        evaluations=evaluations,
+        num_simulations=num_simulations
+    )
@@ -1,6 +1,23 @@
 import numpy as np
-from typing import List, Dict, Tuple, Any
-from .models import FinancialReport, ScenarioParams, SimulationResult, AggregatedSimulation, BalanceSheet
+import time
+import functools
+import hashlib
+import threading
+import warnings
+from collections import OrderedDict
+from statistics import NormalDist
+from scipy.special import ndtri
+from scipy.stats import qmc
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat
+from typing import List, Dict, Tuple, Any, Optional, Sequence
+from .models import FinancialReport, ScenarioParams, SimulationResult, AggregatedSimulation, BalanceSheet, SobolIndex, SobolAnalysis
+from . import sketches
+from .sketches import KLLSketch
+from .cache import ContentCache, canonical_hash
+
+# Bump when a change alters simulation outputs for identical inputs
+ENGINE_VERSION = "2.1"
 
 def calculate_fcf(ebit: float, tax_rate: float, dep_amort: float, change_working_capital: float, capex: float) -> float:
     """
@@ -22,20 +39,771 @@ def calculate_fcf(ebit: float, tax_rate: float, dep_amort: float, change_working
     # We'll adjust signs based on the inputs in the simulation loop.
     return nopat + dep_amort + change_working_capital + capex
 
+@functools.lru_cache(maxsize=256)
+def discount_factors(discount_rate: float, forecast_years: int) -> np.ndarray:
+    """
+    Read-only discount-factor vector [1/(1+r)^1, ..., 1/(1+r)^T].
+    Cached, since runs reuse a handful of (rate, horizon) pairs.
+    """
+    factors = 1.0 / (1 + discount_rate) ** np.arange(1, forecast_years + 1)
+    factors.setflags(write=False)
+    return factors
+
 def calculate_npv(fcf_stream: List[float], discount_rate: float) -> float:
     """
-    NPV = Sum(FCF_t / (1 + r)^t)
+    NPV = Sum(FCF_t / (1 + r)^t), as one dot product with the discount-factor vector
+    """
+    fcf = np.asarray(fcf_stream, dtype=float)
+    return float(fcf @ discount_factors(float(discount_rate), len(fcf)))
+
+class SimulationPaths:
+    """
+    Columnar store for one Monte Carlo run.
+    
+    Each metric is a single contiguous (simulations x years) float matrix and
+    NPV is one float vector, so aggregation reads arrays directly. Pydantic
+    `SimulationResult` objects are only built on demand for sampled runs.
+    Batch runs carry a leading scenarios axis; `scenario(s)` slices one out.
+    Per-year driver runs also keep each path's (simulations x years) random
+    discount-rate shift, added to the scenario's rate when discounting.
+    """
+    
+    def __init__(self, revenue: np.ndarray, ebitda: np.ndarray, net_income: np.ndarray, fcf: np.ndarray,
+                 rev_growth: np.ndarray, opex_shift: np.ndarray, npv: Optional[np.ndarray] = None,
+                 discount_shift: Optional[np.ndarray] = None):
+        self.revenue = revenue
+        self.ebitda = ebitda
+        self.net_income = net_income
+        self.fcf = fcf
+        self.rev_growth = rev_growth
+        self.opex_shift = opex_shift
+        self.npv = npv
+        self.discount_shift = discount_shift
+        # Per-year medians only depend on the paths; memoized and shared by `with_npv` views
+        self._forecast_p50: Dict[str, List[float]] = {}
+    
+    def __len__(self) -> int:
+        return self.revenue.shape[-2]
+    
+    @property
+    def nbytes(self) -> int:
+        """Bytes held by the path matrices and NPV vector"""
+        arrays = (self.revenue, self.ebitda, self.net_income, self.fcf, self.rev_growth, self.opex_shift,
+                  self.npv, self.discount_shift)
+        return sum(a.nbytes for a in arrays if a is not None)
+    
+    @classmethod
+    def concatenate(cls, shards: List["SimulationPaths"]) -> "SimulationPaths":
+        """Merges shards path-wise, keeping shard order"""
+        def merge(name):
+            columns = [getattr(shard, name) for shard in shards]
+            return None if any(c is None for c in columns) else np.concatenate(columns)
+        return cls(
+            revenue=merge("revenue"),
+            ebitda=merge("ebitda"),
+            net_income=merge("net_income"),
+            fcf=merge("fcf"),
+            rev_growth=merge("rev_growth"),
+            opex_shift=merge("opex_shift"),
+            npv=merge("npv"),
+            discount_shift=merge("discount_shift")
+        )
+    
+    def with_npv(self, npv: np.ndarray) -> "SimulationPaths":
+        """Same path matrices (shared, not copied) with a new NPV vector"""
+        view = SimulationPaths(
+            revenue=self.revenue,
+            ebitda=self.ebitda,
+            net_income=self.net_income,
+            fcf=self.fcf,
+            rev_growth=self.rev_growth,
+            opex_shift=self.opex_shift,
+            npv=npv,
+            discount_shift=self.discount_shift
+        )
+        view._forecast_p50 = self._forecast_p50
+        return view
+    
+    def forecast_p50(self, metric: str) -> List[float]:
+        """Median of each forecast year for 'revenue', 'ebitda' or 'fcf'"""
+        if metric not in self._forecast_p50:
+            # Partitioning contiguous rows beats striding down the year columns
+            self._forecast_p50[metric] = np.median(np.ascontiguousarray(getattr(self, metric).T), axis=1).tolist()
+        return self._forecast_p50[metric]
+    
+    def scenario(self, s: int) -> "SimulationPaths":
+        """Single-scenario view of a batch run (no copy)"""
+        return SimulationPaths(
+            revenue=self.revenue[s],
+            ebitda=self.ebitda[s],
+            net_income=self.net_income[s],
+            fcf=self.fcf[s],
+            rev_growth=self.rev_growth[s],
+            opex_shift=self.opex_shift[s],
+            npv=None if self.npv is None else self.npv[s],
+            discount_shift=None if self.discount_shift is None else self.discount_shift[s]
+        )
+    
+    def to_result(self, i: int) -> SimulationResult:
+        """Builds the pydantic view of a single path"""
+        return SimulationResult(
+            scenario_id=i,
+            revenue=self.revenue[i, 0], # Year 1
+            ebitda=self.ebitda[i, 0], # Year 1
+            net_income=self.net_income[i, 0], # Year 1
+            fcf=self.fcf[i, 0], # Year 1
+            npv=self.npv[i],
+            key_driver="Revenue" if abs(self.rev_growth[i]) > abs(self.opex_shift[i]) else "OpEx",
+            revenue_forecast=self.revenue[i].tolist(),
+            ebitda_forecast=self.ebitda[i].tolist(),
+            net_income_forecast=self.net_income[i].tolist(),
+            fcf_forecast=self.fcf[i].tolist()
+        )
+    
+    def sample_runs(self, limit: int = 100) -> List[SimulationResult]:
+        """Pydantic views of the first `limit` paths"""
+        return [self.to_result(i) for i in range(min(len(self), limit))]
+
+def base_metrics(base_report: FinancialReport) -> Dict[str, float]:
+    """
+    Report constants the causal graph starts from: base revenue, OpEx and
+    interest, margins relative to base revenue, and organic growth.
+    """
+    income = base_report.income_statement
+    base_rev = income.Revenue
+    return {
+        "revenue": float(base_rev),
+        "opex": float(income.OpEx),
+        "interest_expense": income.InterestExpense,
+        # Fixed margins relative to base revenue
+        "gross_margin": income.GrossProfit / base_rev if base_rev > 0 else 0,
+        "da_margin": income.DepreciationAndAmortization / base_rev if base_rev > 0 else 0,
+        "capex_margin": base_report.cash_flow.CapEx / base_rev if base_rev > 0 else 0,
+        "wc_margin": base_report.cash_flow.ChangeInWorkingCapital / base_rev if base_rev > 0 else 0,
+        # Use historical RevenueGrowth from KPIs as baseline, default to 3% if missing
+        "organic_growth": base_report.kpis.get("RevenueGrowth", 0.03),
+    }
+
+def simulate_paths(base_report: FinancialReport, rev_growth: np.ndarray, opex_shift: np.ndarray,
+                   tax_rate: Any, forecast_years: int = 5, per_year: bool = False,
+                   dtype: Any = np.float64) -> SimulationPaths:
+    """
+    Propagates all Monte Carlo paths of one report through the causal graph
+    at once (see `propagate_paths`).
+    """
+    return propagate_paths(base_metrics(base_report), rev_growth, opex_shift, tax_rate, forecast_years, per_year,
+                           dtype)
+
+def propagate_paths(metrics: Dict[str, Any], rev_growth: np.ndarray, opex_shift: np.ndarray,
+                    tax_rate: Any, forecast_years: int = 5, per_year: bool = False,
+                    dtype: Any = np.float64) -> SimulationPaths:
+    """
+    Propagates all Monte Carlo paths through the causal graph at once.
+    
+    `rev_growth` and `opex_shift` hold one draw per path (shape: simulations,
+    or scenarios/companies x simulations for batch runs); `tax_rate` and the
+    `base_metrics` values are scalars or broadcast against them (portfolio
+    runs stack one column per company). With `per_year=True` every driver,
+    including `tax_rate`, carries a trailing forecast-years axis instead.
+    Fills (... x forecast_years) arrays for revenue, EBITDA, net income and
+    FCF. Each year is one array operation over every path, applied in the
+    same order as the scalar formulas. NPV is left unset until the paths are
+    discounted.
+    
+    Intermediates that are never returned (COGS, D&A, taxes, CapEx, working
+    capital) are written into a few reusable per-path buffers rather than
+    allocated every year. `dtype=np.float32` halves the path matrices and the
+    buffers; discounting and quantiles still accumulate in float64.
+    """
+    gross_margin = metrics["gross_margin"]
+    da_margin = metrics["da_margin"]
+    capex_margin = metrics["capex_margin"]
+    wc_margin = metrics["wc_margin"]
+    interest_expense = metrics["interest_expense"]
+    
+    total_rev_growth = metrics["organic_growth"] + rev_growth
+    opex_growth = total_rev_growth + opex_shift
+    # Year-on-year multipliers, computed once and stored in the kernel dtype
+    rev_factor = (1 + total_rev_growth).astype(dtype, copy=False)
+    opex_factor = (1 + opex_growth).astype(dtype, copy=False)
+    
+    path_shape = rev_growth.shape[:-1] if per_year else rev_growth.shape
+    shape = path_shape + (forecast_years,)
+    if per_year:
+        tax_rate = np.broadcast_to(tax_rate, shape)
+    paths = SimulationPaths(
+        revenue=np.empty(shape, dtype),
+        ebitda=np.empty(shape, dtype),
+        net_income=np.empty(shape, dtype),
+        fcf=np.empty(shape, dtype),
+        # Per-year drivers are summarized by their average over the horizon
+        rev_growth=rev_growth.mean(axis=-1) if per_year else rev_growth,
+        opex_shift=opex_shift.mean(axis=-1) if per_year else opex_shift
+    )
+    
+    curr_rev = np.empty(path_shape, dtype)
+    curr_rev[...] = metrics["revenue"]
+    curr_opex = np.empty(path_shape, dtype)
+    curr_opex[...] = metrics["opex"]
+    ebitda, ebit, da, scratch, out = (np.empty(path_shape, dtype) for _ in range(5))
+    profitable = np.empty(path_shape, dtype=bool)
+    
+    for t in range(forecast_years):
+        rev_factor_t = rev_factor[..., t] if per_year else rev_factor
+        opex_factor_t = opex_factor[..., t] if per_year else opex_factor
+        tax_rate_t = tax_rate[..., t] if per_year else tax_rate
+        
+        curr_rev *= rev_factor_t
+        curr_opex *= opex_factor_t
+        # EBITDA = Revenue - COGS - OpEx, with COGS = Revenue * (1 - GrossMargin)
+        np.multiply(curr_rev, 1 - gross_margin, out=scratch)
+        np.subtract(curr_rev, scratch, out=ebitda)
+        ebitda -= curr_opex
+        
+        np.multiply(curr_rev, da_margin, out=da)
+        np.subtract(ebitda, da, out=ebit)
+        
+        # Net income = EBIT - interest - taxes, taxes only on positive EBIT
+        np.greater(ebit, 0, out=profitable)
+        scratch.fill(0)
+        np.multiply(ebit, tax_rate_t, out=scratch, where=profitable)
+        np.subtract(ebit, interest_expense, out=out)
+        out -= scratch
+        paths.net_income[..., t] = out
+        
+        # calculate_fcf, fused: EBIT * (1 - t) + D&A + working capital + CapEx
+        np.multiply(ebit, 1 - tax_rate_t, out=out)
+        out += da
+        np.multiply(curr_rev, wc_margin, out=scratch)
+        out += scratch
+        np.multiply(curr_rev, capex_margin, out=scratch)
+        out += scratch
+        
+        paths.revenue[..., t] = curr_rev
+        paths.ebitda[..., t] = ebitda
+        paths.fcf[..., t] = out
+    
+    return paths
+
+def discount_paths(fcf_matrix: np.ndarray, discount_rate: Any, terminal_growth: Any) -> np.ndarray:
+    """
+    NPV of every path: explicit FCF discounted with one discount-factor vector,
+    plus a Gordon Growth terminal value on the final year's FCF.
+    
+    `discount_rate` and `terminal_growth` may also be one value per scenario
+    for a (scenarios x simulations x years) batch. `discount_rate` may instead
+    be a full per-year rate matrix shaped like `fcf_matrix`; per-year rates
+    compound year by year and the terminal value uses the final year's rate
+    (floored like scalar rates).
+    
+    NPVs are always float64; float32 FCF is accumulated year by year
+    (see `_discounted_sum`).
+    """
+    forecast_years = fcf_matrix.shape[-1]
+    growth = np.asarray(terminal_growth, dtype=float)
+    if np.ndim(discount_rate) == fcf_matrix.ndim:
+        growth = growth.reshape(growth.shape + (1,) * (fcf_matrix.ndim - growth.ndim))
+        rate = np.asarray(discount_rate, dtype=float)
+        rate = np.where(rate <= growth, growth + 0.01, rate)
+        factors = np.cumprod(1.0 / (1 + rate), axis=-1)
+        terminal_value = fcf_matrix[..., -1] * (1 + growth[..., 0]) / (rate[..., -1] - growth[..., 0])
+        if fcf_matrix.dtype != np.float64:
+            explicit_value = _discounted_sum(fcf_matrix, factors)
+        else:
+            explicit_value = np.einsum("...y,...y->...", fcf_matrix, factors)
+        return explicit_value + terminal_value * factors[..., -1]
+    
+    if np.ndim(discount_rate) == 0:
+        # One rate for every path: a single matrix-vector product
+        rate = float(discount_rate)
+        factors = discount_factors(rate, forecast_years)
+        terminal_value = fcf_matrix[..., -1] * (1 + growth) / (rate - growth)
+        if fcf_matrix.dtype != np.float64:
+            return _discounted_sum(fcf_matrix, factors) + terminal_value * factors[-1]
+        return fcf_matrix @ factors + terminal_value * factors[-1]
+    
+    rate = np.asarray(discount_rate, dtype=float)[..., None]
+    growth = growth[..., None]
+    factors = 1.0 / (1 + rate) ** np.arange(1, forecast_years + 1)
+    terminal_value = fcf_matrix[..., -1] * (1 + growth) / (rate - growth)
+    if fcf_matrix.dtype != np.float64:
+        explicit_value = _discounted_sum(fcf_matrix, factors[..., None, :])
+    else:
+        explicit_value = np.matmul(fcf_matrix, factors[..., None])[..., 0]
+    return explicit_value + terminal_value * factors[..., -1:]
+
+def _discounted_sum(fcf_matrix: np.ndarray, factors: np.ndarray) -> np.ndarray:
+    """
+    Sum over years of FCF * factor, accumulated in float64 one year column at
+    a time, so a float32 matrix is never copied to float64 as a whole.
+    """
+    total = np.zeros(fcf_matrix.shape[:-1])
+    for t in range(fcf_matrix.shape[-1]):
+        total += fcf_matrix[..., t] * factors[..., t]
+    return total
+
+# Tail levels for VaR / CVaR, and the percentile bands of the FCF fan chart
+TAIL_LEVELS = (0.01, 0.05)
+FAN_QUANTILES = (0.05, 0.10, 0.25, 0.50, 0.75, 0.90, 0.95)
+
+def select_quantiles(values: np.ndarray, qs: Sequence[float],
+                     extra_kth: Sequence[int] = ()) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Quantiles along axis 0 from a single `np.partition` call.
+    
+    Matches `np.percentile`'s default linear interpolation, but every
+    requested quantile (plus any `extra_kth` ranks) shares one O(n)
+    selection instead of each statistic paying for its own. Returns the
+    (len(qs), ...) quantiles and the partitioned copy, so callers can read
+    order statistics such as the k smallest values (`partitioned[:k]`).
+    """
+    n = values.shape[0]
+    position = np.asarray(qs, dtype=np.float64) * (n - 1)
+    lo = np.floor(position).astype(np.intp)
+    hi = np.minimum(lo + 1, n - 1)
+    kth = np.unique(np.concatenate([lo, hi, np.asarray(extra_kth, dtype=np.intp)]))
+    if values.ndim > 1:
+        # Select along contiguous rows of the transpose rather than down strided columns
+        partitioned = np.partition(np.ascontiguousarray(np.moveaxis(values, 0, -1)), kth, axis=-1)
+        partitioned = np.moveaxis(partitioned, -1, 0)
+    else:
+        partitioned = np.partition(values, kth)
+    
+    # Interpolate in float64 even when selecting from float32 paths
+    below, above = partitioned[lo].astype(np.float64, copy=False), partitioned[hi].astype(np.float64, copy=False)
+    t = (position - lo).reshape((-1,) + (1,) * (values.ndim - 1))
+    diff = above - below
+    # Same two-sided lerp as NumPy, so results agree with np.percentile
+    quantiles = np.where(t >= 0.5, above - diff * (1 - t), below + diff * t)
+    return quantiles, partitioned
+
+def _band_name(q: float) -> str:
+    return f"p{round(q * 100)}"
+
+def _quantile_se_ranks(n: int, q: float) -> Tuple[int, int]:
+    """Order statistics one binomial standard deviation either side of rank n*q"""
+    half = np.sqrt(n * q * (1 - q))
+    return int(np.clip(np.floor(n * q - half), 0, n - 1)), int(np.clip(np.ceil(n * q + half), 0, n - 1))
+
+def aggregate_paths(paths: SimulationPaths, assumption_log: List[str], traceability: Dict[str, str],
+                    sample_size: int = 100) -> AggregatedSimulation:
+    """
+    Reduces a columnar run to the AggregatedSimulation summary.
+    
+    All NPV statistics (P1, P5, P10, median, P90, the tail means and the
+    order statistics behind the quantile standard errors) come from one
+    partition of the NPV vector; the FCF fan chart is one partition of the
+    FCF matrix, whose P50 row doubles as the FCF forecast.
+    """
+    npv = paths.npv
+    tail_counts = [max(1, int(np.ceil(level * len(npv)))) for level in TAIL_LEVELS]
+    se_ranks = {name: _quantile_se_ranks(len(npv), q) for name, q in
+                (("median_npv", 0.5), ("p10_npv", 0.1), ("p90_npv", 0.9))}
+    (var_1, var_5, p10, median, p90), ranked = select_quantiles(
+        npv, TAIL_LEVELS + (0.10, 0.50, 0.90),
+        extra_kth=[k - 1 for k in tail_counts] + [r for pair in se_ranks.values() for r in pair]
+    )
+    cvar_1, cvar_5 = (float(ranked[:k].mean()) for k in tail_counts)
+    standard_errors = {name: float(ranked[hi] - ranked[lo]) / 2 for name, (lo, hi) in se_ranks.items()}
+    
+    fan, _ = select_quantiles(paths.fcf, FAN_QUANTILES)
+    fan_chart = {_band_name(q): row.tolist() for q, row in zip(FAN_QUANTILES, fan)}
+    paths._forecast_p50.setdefault("fcf", fan_chart["p50"])
+    
+    return AggregatedSimulation(
+        median_npv=median,
+        p10_npv=p10,
+        p90_npv=p90,
+        var_1_npv=var_1,
+        var_5_npv=var_5,
+        cvar_1_npv=cvar_1,
+        cvar_5_npv=cvar_5,
+        prob_negative_npv=np.count_nonzero(npv < 0) / len(npv),
+        median_revenue=paths.forecast_p50("revenue")[0],
+        median_ebitda=paths.forecast_p50("ebitda")[0],
+        median_fcf=paths.forecast_p50("fcf")[0],
+        # Aggregate Forecasts (P50) - one median per year column
+        revenue_forecast_p50=paths.forecast_p50("revenue"),
+        ebitda_forecast_p50=paths.forecast_p50("ebitda"),
+        fcf_forecast_p50=paths.forecast_p50("fcf"),
+        fcf_fan_chart=fan_chart,
+        num_paths=len(paths),
+        standard_errors=standard_errors,
+        assumption_log=assumption_log,
+        traceability=traceability,
+        simulation_runs=paths.sample_runs(sample_size)
+    )
+
+class StreamingAggregator:
+    """
+    Constant-memory replacement for `aggregate_paths`.
+    
+    Consumes simulation chunks and keeps one KLL sketch for NPV and one per
+    forecast year for revenue, EBITDA and FCF. Aggregators from parallel
+    workers merge, and the first `sample_size` paths seen are kept as runs.
+    """
+    
+    METRICS = ("revenue", "ebitda", "fcf")
+    
+    def __init__(self, forecast_years: int = 5, k: int = 200, sample_size: int = 100, seed: Any = None):
+        self.k = k
+        self.sample_size = sample_size
+        # Every sketch gets its own child seed: shared coin flips would correlate
+        # compaction errors across metrics and shards instead of averaging them out
+        if not isinstance(seed, np.random.SeedSequence):
+            seed = np.random.SeedSequence(seed)
+        npv_seed, *metric_seeds = seed.spawn(1 + len(self.METRICS))
+        self.npv = KLLSketch(k, npv_seed)
+        self.yearly = {m: [KLLSketch(k, s) for s in metric_seed.spawn(forecast_years)]
+                       for m, metric_seed in zip(self.METRICS, metric_seeds)}
+        self.sample: List[SimulationResult] = []
+    
+    @property
+    def count(self) -> int:
+        return self.npv.count
+    
+    def update(self, paths: SimulationPaths) -> None:
+        if len(self.sample) < self.sample_size:
+            offset = len(self.sample)
+            for run in paths.sample_runs(self.sample_size - offset):
+                run.scenario_id += offset
+                self.sample.append(run)
+        self.npv.update(paths.npv)
+        for metric in self.METRICS:
+            matrix = getattr(paths, metric)
+            for t, sketch in enumerate(self.yearly[metric]):
+                sketch.update(matrix[:, t])
+    
+    def merge(self, other: "StreamingAggregator") -> None:
+        """Folds in another worker's aggregator (its runs are appended after ours)"""
+        offset = self.count
+        self.npv.merge(other.npv)
+        for metric in self.METRICS:
+            for mine, theirs in zip(self.yearly[metric], other.yearly[metric]):
+                mine.merge(theirs)
+        for run in other.sample[:max(self.sample_size - len(self.sample), 0)]:
+            self.sample.append(run.model_copy(update={"scenario_id": run.scenario_id + offset}))
+    
+    def result(self, assumption_log: List[str], traceability: Dict[str, str]) -> AggregatedSimulation:
+        median_npv, p10_npv, p90_npv, var_1, var_5 = self.npv.quantiles([0.5, 0.1, 0.9] + list(TAIL_LEVELS))
+        p50 = {m: [sketch.quantile(0.5) for sketch in self.yearly[m]] for m in self.METRICS}
+        fan = np.array([sketch.quantiles(FAN_QUANTILES) for sketch in self.yearly["fcf"]]).T
+        return AggregatedSimulation(
+            median_npv=median_npv,
+            p10_npv=p10_npv,
+            p90_npv=p90_npv,
+            var_1_npv=var_1,
+            var_5_npv=var_5,
+            cvar_1_npv=self.npv.tail_mean(TAIL_LEVELS[0]),
+            cvar_5_npv=self.npv.tail_mean(TAIL_LEVELS[1]),
+            prob_negative_npv=self.npv.rank(0.0),
+            median_revenue=p50["revenue"][0],
+            median_ebitda=p50["ebitda"][0],
+            median_fcf=p50["fcf"][0],
+            revenue_forecast_p50=p50["revenue"],
+            ebitda_forecast_p50=p50["ebitda"],
+            fcf_forecast_p50=p50["fcf"],
+            fcf_fan_chart={_band_name(q): row.tolist() for q, row in zip(FAN_QUANTILES, fan)},
+            num_paths=self.count,
+            quantile_rank_error=self.npv.normalized_rank_error,
+            quantile_error_bounds={
+                "median_npv": self.npv.quantile_bounds(0.5),
+                "p10_npv": self.npv.quantile_bounds(0.1),
+                "p90_npv": self.npv.quantile_bounds(0.9),
+                "var_1_npv": self.npv.quantile_bounds(TAIL_LEVELS[0]),
+                "var_5_npv": self.npv.quantile_bounds(TAIL_LEVELS[1]),
+                "median_revenue": self.yearly["revenue"][0].quantile_bounds(0.5),
+                "median_ebitda": self.yearly["ebitda"][0].quantile_bounds(0.5),
+                "median_fcf": self.yearly["fcf"][0].quantile_bounds(0.5),
+            },
+            assumption_log=assumption_log,
+            traceability=traceability,
+            simulation_runs=self.sample
+        )
+
+TRACEABILITY = {"Revenue": "Base * (1+g)^t", "OpEx": "Base * (1+g+delta)^t", "EBITDA": "Rev - COGS - OpEx"}
+
+def _check_base_revenue(base_report: FinancialReport) -> None:
+    # Sanity check: Revenue must be positive
+    base_rev = base_report.income_statement.Revenue
+    if base_rev <= 0:
+        raise ValueError(f"Base revenue must be positive, got {base_rev}")
+
+def _discount_rate(params: ScenarioParams) -> float:
+    """Base WACC (default 8%) plus the scenario delta (before the r > g guard)"""
+    return params.base_discount_rate + params.discount_rate_bps / 10000.0
+
+SAMPLERS = ("pseudo", "antithetic", "sobol", "lhs")
+
+def _draw_normals(rng: np.random.Generator, num_paths: int, dims: int, sampler: str = "pseudo") -> np.ndarray:
+    """
+    (num_paths x dims) standard-normal shocks from the requested sampler.
+    
+    - pseudo: independent draws.
+    - antithetic: each draw is paired with its mirror image (z, -z).
+    - sobol: scrambled Sobol points mapped through the inverse normal CDF.
+    - lhs: Latin hypercube points mapped through the inverse normal CDF.
     """
-    npv = 0.0
-    for t, fcf in enumerate(fcf_stream, start=1):
-        npv += fcf / ((1 + discount_rate) ** t)
-    return npv
+    if sampler == "pseudo":
+        return rng.standard_normal((num_paths, dims))
+    
+    if sampler == "antithetic":
+        half = rng.standard_normal(((num_paths + 1) // 2, dims))
+        return np.concatenate([half, -half])[:num_paths]
+    
+    if sampler == "sobol":
+        with warnings.catch_warnings():
+            # Balance is best at powers of two, but any path count is valid
+            warnings.simplefilter("ignore", UserWarning)
+            points = qmc.Sobol(d=dims, scramble=True, seed=rng).random(num_paths)
+    elif sampler == "lhs":
+        points = qmc.LatinHypercube(d=dims, seed=rng).random(num_paths)
+    else:
+        raise ValueError(f"Unknown sampler '{sampler}', expected one of {SAMPLERS}")
+    
+    return ndtri(np.clip(points, 1e-12, 1 - 1e-12))
 
-def run_monte_carlo(base_report: FinancialReport, params: ScenarioParams, num_simulations: int = 10000) -> AggregatedSimulation:
+def _draw_shocks(rng: np.random.Generator, num_paths: int, sampler: str = "pseudo") -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Standard-normal shocks for revenue growth, then OpEx shift (static model).
+    
+    Pseudo-random shocks are drawn as two separate vectors: scaling them by
+    `_scenario_drivers` reproduces `rng.normal(mean, sd)` exactly (the original
+    engine's stream). Other samplers come from `_draw_normals`.
+    """
+    if sampler == "pseudo":
+        growth_shocks = rng.standard_normal(num_paths)
+        opex_shocks = rng.standard_normal(num_paths)
+        return growth_shocks, opex_shocks
+    
+    shocks = _draw_normals(rng, num_paths, 2, sampler)
+    return shocks[:, 0], shocks[:, 1]
+
+def _scenario_drivers(params: ScenarioParams, growth_shocks: np.ndarray,
+                      opex_shocks: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    # Revenue Growth Distribution (Annual)
+    # We assume the user's delta applies to the CAGR or annual growth rate
+    rev_growth_dist = params.revenue_growth_bps / 10000.0 + params.revenue_growth_vol * growth_shocks # 2% std dev by default
+    
+    # OpEx Delta Distribution (Structural Shift)
+    # This represents an efficiency gain/loss relative to revenue scaling
+    opex_delta_dist = params.opex_delta_bps / 10000.0 + params.opex_shift_vol * opex_shocks # 1% std dev by default
+    return rev_growth_dist, opex_delta_dist
+
+# Per-year stochastic drivers, in correlation-matrix order
+DRIVERS = ("revenue_growth", "opex_shift", "tax_rate", "discount_rate")
+
+def _driver_cholesky(params: ScenarioParams) -> np.ndarray:
+    """Lower Cholesky factor of the scenario's driver correlation (identity if unset)"""
+    if params.driver_correlation is None:
+        return np.eye(len(DRIVERS))
+    corr = np.asarray(params.driver_correlation, dtype=float)
+    if corr.shape != (len(DRIVERS), len(DRIVERS)):
+        raise ValueError(f"Driver correlation must be a {len(DRIVERS)}x{len(DRIVERS)} matrix over {DRIVERS}, "
+                         f"got shape {corr.shape}")
+    if not np.allclose(corr, corr.T) or not np.allclose(np.diag(corr), 1.0):
+        raise ValueError("Driver correlation matrix must be symmetric with a unit diagonal")
+    try:
+        return np.linalg.cholesky(corr)
+    except np.linalg.LinAlgError:
+        raise ValueError("Driver correlation matrix must be positive definite")
+
+def _draw_yearly_shocks(rng: np.random.Generator, num_paths: int, forecast_years: int,
+                        sampler: str = "pseudo") -> np.ndarray:
+    """Independent standard normals shaped (paths x years x drivers)"""
+    shocks = _draw_normals(rng, num_paths, forecast_years * len(DRIVERS), sampler)
+    return shocks.reshape(num_paths, forecast_years, len(DRIVERS))
+
+def simulate_yearly(base_report: FinancialReport, scenarios: List[ScenarioParams],
+                    shocks: np.ndarray) -> SimulationPaths:
+    """
+    Per-year driver model: growth, OpEx shift, tax rate and discount rate are
+    redrawn every year and correlated within the year.
+    
+    The shared (paths x years x drivers) shock tensor is viewed as one
+    (paths*years x drivers) matrix, so each scenario's Cholesky transform is a
+    single GEMM (skipped for uncorrelated drivers). This gives (scenarios x
+    paths x years) driver matrices; the year loop in `simulate_paths` then
+    indexes one column per year. The random discount-rate shift is kept on the
+    paths so the scenario's base rate can still be changed without re-simulating.
+    """
+    num_paths, forecast_years, _ = shocks.shape
+    shape = (len(scenarios), num_paths, forecast_years)
+    dtype = np.dtype(scenarios[0].precision)
+    rev_growth, opex_shift, tax_rate, discount_shift = (np.empty(shape, dtype) for _ in range(4))
+    base_tax_rate = base_report.kpis.get("TaxRate", 0.25)
+    
+    for s, params in enumerate(scenarios):
+        correlated = shocks
+        if params.driver_correlation is not None:
+            correlated = (shocks.reshape(-1, len(DRIVERS)) @ _driver_cholesky(params).T).reshape(shocks.shape)
+        rev_growth[s] = params.revenue_growth_bps / 10000.0 + params.revenue_growth_vol * correlated[..., 0]
+        opex_shift[s] = params.opex_delta_bps / 10000.0 + params.opex_shift_vol * correlated[..., 1]
+        tax_rate[s] = base_tax_rate + params.tax_rate_delta_bps / 10000.0 + params.tax_rate_vol * correlated[..., 2]
+        discount_shift[s] = params.discount_rate_vol * correlated[..., 3]
+    
+    paths = simulate_paths(base_report, rev_growth, opex_shift, tax_rate, forecast_years, per_year=True, dtype=dtype)
+    paths.discount_shift = discount_shift
+    return paths
+
+def _simulate_scenario(base_report: FinancialReport, params: ScenarioParams, rng: np.random.Generator,
+                       num_paths: int) -> SimulationPaths:
+    """Draws `num_paths` shocks from `rng` and propagates them under the scenario's driver model"""
+    if params.driver_model == "per_year":
+        shocks = _draw_yearly_shocks(rng, num_paths, params.forecast_years, params.sampler)
+        return simulate_yearly(base_report, [params], shocks).scenario(0)
+    
+    rev_growth_dist, opex_delta_dist = _scenario_drivers(params, *_draw_shocks(rng, num_paths, params.sampler))
+    tax_rate = base_report.kpis.get("TaxRate", 0.25) + (params.tax_rate_delta_bps / 10000.0)
+    return simulate_paths(base_report, rev_growth_dist, opex_delta_dist, tax_rate, params.forecast_years,
+                          dtype=np.dtype(params.precision))
+
+def _scenario_npv(paths: SimulationPaths, params: ScenarioParams) -> np.ndarray:
+    """Discounts a scenario's paths (per-year rates when the paths carry a rate shift)"""
+    g = params.terminal_growth  # perpetual growth
+    r = _discount_rate(params)
+    if paths.discount_shift is not None:
+        return discount_paths(paths.fcf, r + paths.discount_shift, g)
+    
+    if r <= g: r = g + 0.01
+    return discount_paths(paths.fcf, r, g)
+
+def _driver_model_log(params: ScenarioParams) -> List[str]:
+    if params.driver_model != "per_year":
+        return []
+    correlation = "user-supplied correlation" if params.driver_correlation is not None else "uncorrelated"
+    return [
+        f"Stochastic Drivers: redrawn every year ({correlation}); annual vol growth {params.revenue_growth_vol:.2%}, "
+        f"OpEx {params.opex_shift_vol:.2%}, tax {params.tax_rate_vol:.2%}, discount {params.discount_rate_vol:.2%}"
+    ]
+
+def _assumption_log(params: ScenarioParams, num_simulations: int) -> List[str]:
+    return [
+        f"Causal Model: {params.forecast_years}-Year Explicit Forecast + Terminal Value (g={params.terminal_growth:.1%})",
+        f"Revenue Driver: Base Growth (3%) + User Delta ({params.revenue_growth_bps} bps)",
+        f"OpEx Driver: Revenue Scaling + Efficiency Delta ({params.opex_delta_bps} bps)",
+        f"Discount Rate: {_discount_rate(params):.2%}",
+        f"Monte Carlo: {num_simulations} iterations"
+    ] + _driver_model_log(params)
+
+def _simulate_shard(base_report: FinancialReport, params: ScenarioParams, num_paths: int,
+                    seed: Any) -> SimulationPaths:
+    """
+    Draws one random stream and propagates its paths.
+    Module-level so it can be shipped to worker processes.
+    """
+    return _simulate_scenario(base_report, params, np.random.default_rng(seed), num_paths)
+
+def simulate_sharded(base_report: FinancialReport, params: ScenarioParams, num_simulations: int,
+                     seed: int = 42, num_shards: int = 1, max_workers: Optional[int] = None) -> SimulationPaths:
+    """
+    Splits `num_simulations` into `num_shards` independent streams and merges them.
+    
+    A single shard draws from `default_rng(seed)` exactly as the unsharded engine
+    always has. With several shards each one gets its own child stream from
+    `SeedSequence(seed).spawn`, and shards are concatenated in shard order, so the
+    output depends only on (seed, num_shards) - never on how many processes ran them.
+    `max_workers=1` runs the shards in-process.
+    """
+    if num_shards <= 1:
+        return _simulate_shard(base_report, params, num_simulations, seed)
+    
+    # First `remainder` shards take one extra path
+    shard_size, remainder = divmod(num_simulations, num_shards)
+    sizes = [shard_size + (1 if i < remainder else 0) for i in range(num_shards)]
+    seeds = np.random.SeedSequence(seed).spawn(num_shards)
+    
+    if max_workers == 1:
+        shards = [_simulate_shard(base_report, params, n, s) for n, s in zip(sizes, seeds)]
+    else:
+        with ProcessPoolExecutor(max_workers=max_workers) as executor:
+            shards = list(executor.map(_simulate_shard, repeat(base_report), repeat(params), sizes, seeds))
+    
+    return SimulationPaths.concatenate(shards)
+
+class PathCache:
+    """
+    Thread-safe LRU of simulated, not yet discounted, path matrices.
+    
+    Discounting is the only step that depends on the discount rate, so the key
+    covers the report, every other scenario parameter, the path count and the
+    seed stream. A discount-rate-only change hits the cache and costs one
+    matrix-vector product instead of a full simulation. Entries are bounded by
+    count and by total matrix bytes; a run larger than `max_memory_bytes` on
+    its own is not cached.
+    """
+    
+    # ScenarioParams fields that only affect discounting, not the paths
+    DISCOUNT_ONLY_FIELDS = {"discount_rate_bps", "base_discount_rate", "terminal_growth"}
+    
+    def __init__(self, max_entries: int = 16, max_memory_bytes: int = 512 * 1024 * 1024):
+        self.max_entries = max_entries
+        self.max_memory_bytes = max_memory_bytes
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries: "OrderedDict[str, Tuple[SimulationPaths, int]]" = OrderedDict()
+        self._memory_bytes = 0
+        self._lock = threading.Lock()
+    
+    @property
+    def memory_bytes(self) -> int:
+        return self._memory_bytes
+    
+    def key(self, base_report: FinancialReport, params: ScenarioParams, num_simulations: int,
+            seed: int, num_shards: int) -> str:
+        path_params = params.model_dump_json(exclude=self.DISCOUNT_ONLY_FIELDS)
+        payload = f"{base_report.model_dump_json()}|{path_params}|{num_simulations}|{seed}|{num_shards}"
+        return hashlib.sha256(payload.encode()).hexdigest()
+    
+    def get(self, key: str) -> Optional[SimulationPaths]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+    
+    def put(self, key: str, paths: SimulationPaths) -> None:
+        size = paths.nbytes
+        if size > self.max_memory_bytes:
+            return
+        # Cached matrices are shared between callers, so freeze them
+        for matrix in (paths.revenue, paths.ebitda, paths.net_income, paths.fcf, paths.rev_growth, paths.opex_shift,
+                       paths.discount_shift):
+            if matrix is not None:
+                matrix.setflags(write=False)
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self._memory_bytes -= previous[1]
+            self._entries[key] = (paths, size)
+            self._memory_bytes += size
+            while len(self._entries) > self.max_entries or self._memory_bytes > self.max_memory_bytes:
+                _, (_, evicted_size) = self._entries.popitem(last=False)
+                self._memory_bytes -= evicted_size
+                self.evictions += 1
+    
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._memory_bytes = 0
+            self.hits = 0
+            self.misses = 0
+            self.evictions = 0
+
+path_cache = PathCache()
+
+def run_monte_carlo(base_report: FinancialReport, params: ScenarioParams, num_simulations: int = 10000,
+                    seed: int = 42, num_shards: int = 1, max_workers: Optional[int] = None,
+                    use_path_cache: bool = True, sobol_samples: int = 0,
+                    time_budget: Optional[float] = None) -> AggregatedSimulation:
     """
     Runs Monte Carlo simulation using a CAUSAL GRAPH with Time-Based Propagation.
     
-    MODEL: 5-Year Explicit Forecast + Terminal Value
+    MODEL: N-Year Explicit Forecast + Terminal Value (default N=5)
     ================================================
     
     CAUSAL GRAPH (Hardcoded Formulas):
@@ -59,172 +827,474 @@ def run_monte_carlo(base_report: FinancialReport, params: ScenarioParams, num_si
     
     TIME-BASED PROPAGATION:
     -----------------------
-    - Forecast Period: 5 Years (t1 to t5)
-    - Terminal Value at t5 using Gordon Growth (g=2%)
+    - Forecast Period: `params.forecast_years` years (t1 to tN, default 5)
+    - Terminal Value at tN using Gordon Growth (g = `params.terminal_growth`, default 2%)
+    - Discount rate: `params.base_discount_rate` (default 8%) plus the scenario delta
+    
+    VECTORIZATION:
+    --------------
+    All paths are propagated at once as (simulations x years) matrices by
+    `simulate_paths`; the only Python loop left is over the forecast years.
+    Draw order and arithmetic match the original per-path loop, so a given
+    seed reproduces the same path values.
+    
+    SHARDING:
+    ---------
+    `num_shards > 1` splits the paths into independent seed streams run on a
+    process pool (see `simulate_sharded`); results are reproducible for a
+    given (seed, num_shards) on any machine.
     
+    RE-DISCOUNTING FAST PATH:
+    -------------------------
+    Undiscounted paths are kept in `path_cache`; when only the discount rate
+    changed since a previous run, the cached FCF matrix is simply re-discounted.
+    
+    TIME BUDGET:
+    ------------
+    `time_budget` (seconds) switches to a latency-bounded run for interactive
+    callers: as many vectorized batches as fit the budget, capped at
+    `num_simulations` paths (see `run_monte_carlo_budgeted`). Sharding and the
+    path cache do not apply, and the path count depends on machine speed.
+    
+    PRECISION:
+    ----------
+    `params.precision="float32"` runs the path kernel in single precision:
+    path matrices and per-year driver matrices are float32, NPVs, quantile
+    interpolation and tail means stay float64. On the data/ reports at 1M
+    paths x 10 years it halves the static model's peak memory (565 -> 298 MiB;
+    per-year 1298 -> 802 MiB, its shocks and rate matrices stay float64), and
+    every reported statistic agrees with float64 to a relative 1e-6 or better,
+    far inside Monte Carlo error (benchmarks/precision_accuracy.py).
+    
+    GLOBAL SENSITIVITY:
+    -------------------
+    `sobol_samples > 0` also attaches Sobol indices of NPV per driver
+    (see `sobol_indices`), at a cost of (drivers + 2) * sobol_samples paths.
+    They stay None when no driver is stochastic (nothing to attribute) and
+    on time-budgeted runs, whose latency bound they would break.
     """
     
-    # Base values
-    base_rev = base_report.income_statement.Revenue
-    base_opex = base_report.income_statement.OpEx
-    base_tax_rate = base_report.kpis.get("TaxRate", 0.25)
+    _check_base_revenue(base_report)
     
-    # Sanity check: Revenue must be positive
-    if base_rev <= 0:
-        raise ValueError(f"Base revenue must be positive, got {base_rev}")
+    if time_budget is not None:
+        result = run_monte_carlo_budgeted(base_report, params, time_budget, num_simulations, seed)
+        if sobol_samples > 0:
+            # Sobol runs (drivers + 2) * sobol_samples more paths, which no budget allows for
+            result.assumption_log.append("Sobol indices skipped: not computed on time-budgeted runs")
+        return result
     
-    # Deltas (convert bps to decimal)
-    rev_growth_mean = params.revenue_growth_bps / 10000.0
-    opex_delta_mean = params.opex_delta_bps / 10000.0
-    discount_rate_base = 0.08 # Default 8% WACC
-    discount_rate_delta = params.discount_rate_bps / 10000.0
+    cache_key = path_cache.key(base_report, params, num_simulations, seed, num_shards) if use_path_cache else None
+    paths = path_cache.get(cache_key) if use_path_cache else None
+    if paths is None:
+        paths = simulate_sharded(base_report, params, num_simulations, seed, num_shards, max_workers)
+        if use_path_cache:
+            path_cache.put(cache_key, paths)
     
-    # Distributions
-    rng = np.random.default_rng(42)
+    # --- VALUATION ---
+    # Terminal Value at tN, discount rate floored at g + 1%
+    paths = paths.with_npv(_scenario_npv(paths, params))
     
-    # Revenue Growth Distribution (Annual)
-    # We assume the user's delta applies to the CAGR or annual growth rate
-    rev_growth_dist = rng.normal(rev_growth_mean, 0.02, num_simulations) # 2% std dev
+    result = aggregate_paths(paths, _assumption_log(params, num_simulations), dict(TRACEABILITY))
+    if sobol_samples > 0 and _sobol_groups(params):
+        result.sobol_indices = sobol_indices(base_report, params, sobol_samples, seed)
+    return result
+
+def engine_fingerprint() -> str:
+    """
+    Version stamp for cached simulation results: ENGINE_VERSION plus a digest
+    of the engine source, so edits invalidate caches even without a bump.
+    """
+    digest = hashlib.sha256()
+    for module_file in (__file__, sketches.__file__):
+        with open(module_file, "rb") as f:
+            digest.update(f.read())
+    return f"{ENGINE_VERSION}+{digest.hexdigest()[:12]}"
+
+def run_monte_carlo_cached(cache: ContentCache, base_report: FinancialReport, params: ScenarioParams,
+                           num_simulations: int = 10000, seed: int = 42, num_shards: int = 1,
+                           max_workers: Optional[int] = None, sobol_samples: int = 0) -> AggregatedSimulation:
+    """
+    `run_monte_carlo` behind a content-addressed result cache.
     
-    # OpEx Delta Distribution (Structural Shift)
-    # This represents an efficiency gain/loss relative to revenue scaling
-    opex_delta_dist = rng.normal(opex_delta_mean, 0.01, num_simulations) # 1% std dev
+    The key hashes the canonical report and parameters together with the path
+    count, seed, shard count and Sobol sample count (worker count never
+    changes the output). The
+    cache should be built with `version=engine_fingerprint()`.
+    """
+    key = canonical_hash({
+        "report": base_report.model_dump(mode="json"),
+        "params": params.model_dump(mode="json"),
+        "num_simulations": num_simulations,
+        "seed": seed,
+        "num_shards": num_shards,
+        "sobol_samples": sobol_samples,
+    })
+    cached = cache.get(key)
+    if cached is not None:
+        return AggregatedSimulation.model_validate_json(cached)
     
-    results = []
-    forecast_years = 5
+    result = run_monte_carlo(base_report, params, num_simulations, seed, num_shards, max_workers,
+                             sobol_samples=sobol_samples)
+    cache.put(key, result.model_dump_json())
+    return result
+
+def quantile_ci_halfwidths(npv: np.ndarray, quantiles: List[float], confidence: float = 0.95) -> List[float]:
+    """
+    Relative half-widths of distribution-free confidence intervals for NPV quantiles.
     
-    for i in range(num_simulations):
-        # Scenario Parameters
-        sim_rev_growth = rev_growth_dist[i]
-        sim_opex_shift = opex_delta_dist[i]
-        
-        # Initialize Time Series
-        rev_stream = []
-        ebitda_stream = []
-        fcf_stream = []
-        net_income_stream = []
-        
-        # Current state (starts at t0)
-        curr_rev = base_rev
-        curr_opex = base_opex
-        
-        # Gross Margin (Fixed)
-        gross_margin = base_report.income_statement.GrossProfit / base_report.income_statement.Revenue if base_report.income_statement.Revenue > 0 else 0
-        
-        # D&A (Fixed for simplicity, or scale? Let's scale with revenue to be realistic for 5 years)
-        da_margin = base_report.income_statement.DepreciationAndAmortization / base_report.income_statement.Revenue if base_report.income_statement.Revenue > 0 else 0
-        
-        # Tax Rate
-        tax_rate = base_tax_rate + (params.tax_rate_delta_bps / 10000.0)
-        
-        # --- TIME PROPAGATION LOOP (t1 to t5) ---
-        for t in range(1, forecast_years + 1):
-            # 1. Revenue Propagation
-            # Revenue grows by (Base Growth + Delta)
-            # Use historical RevenueGrowth from KPIs as baseline, default to 3% if missing
-            organic_growth = base_report.kpis.get("RevenueGrowth", 0.03)
-            total_rev_growth = organic_growth + sim_rev_growth
-            curr_rev = curr_rev * (1 + total_rev_growth)
-            
-            # 2. OpEx Propagation
-            # OpEx typically scales with revenue, modified by the efficiency delta
-            # If delta is negative (efficiency), OpEx grows slower than Revenue
-            # OpEx_growth = Revenue_growth + OpEx_Delta
-            opex_growth = total_rev_growth + sim_opex_shift
-            curr_opex = curr_opex * (1 + opex_growth)
-            
-            # 3. COGS Propagation
-            curr_cogs = curr_rev * (1 - gross_margin)
-            
-            # 4. EBITDA Calculation
-            curr_ebitda = curr_rev - curr_cogs - curr_opex
-            
-            # 5. Net Income & FCF
-            curr_da = curr_rev * da_margin
-            curr_ebit = curr_ebitda - curr_da
-            curr_taxes = curr_ebit * tax_rate if curr_ebit > 0 else 0
-            curr_net_income = curr_ebit - base_report.income_statement.InterestExpense - curr_taxes
-            
-            # Scale CapEx and WC
-            # Simple assumption: % of Revenue
-            capex_margin = base_report.cash_flow.CapEx / base_report.income_statement.Revenue if base_report.income_statement.Revenue > 0 else 0
-            wc_margin = base_report.cash_flow.ChangeInWorkingCapital / base_report.income_statement.Revenue if base_report.income_statement.Revenue > 0 else 0
-            
-            curr_capex = curr_rev * capex_margin
-            curr_wc = curr_rev * wc_margin
-            
-            curr_fcf = calculate_fcf(curr_ebit, tax_rate, curr_da, curr_wc, curr_capex)
-            
-            # Store
-            rev_stream.append(curr_rev)
-            ebitda_stream.append(curr_ebitda)
-            fcf_stream.append(curr_fcf)
-            net_income_stream.append(curr_net_income)
-            
-        # --- VALUATION ---
-        # Terminal Value at t5
-        g = 0.02  # 2% perpetual growth
-        r = discount_rate_base + discount_rate_delta
-        
-        if r <= g: r = g + 0.01
+    Uses the binomial order-statistic interval: the q-quantile of n paths lies
+    between ranks n*q -/+ z*sqrt(n*q*(1-q)). All ranks are selected with one
+    `np.partition` call, so this is O(n) rather than a full sort.
+    """
+    n = len(npv)
+    z = NormalDist().inv_cdf(0.5 + confidence / 2)
+    ranks = []
+    for q in quantiles:
+        half = z * np.sqrt(n * q * (1 - q))
+        ranks.append((
+            int(np.clip(np.floor(n * q - half), 0, n - 1)),
+            int(np.clip(round(n * q), 0, n - 1)),
+            int(np.clip(np.ceil(n * q + half), 0, n - 1)),
+        ))
+    selected = np.partition(npv, sorted({r for triple in ranks for r in triple}))
+    return [
+        (selected[hi] - selected[lo]) / 2 / max(abs(selected[mid]), 1e-12)
+        for lo, mid, hi in ranks
+    ]
+
+def run_monte_carlo_adaptive(base_report: FinancialReport, params: ScenarioParams, rel_tolerance: float = 0.005,
+                             initial_paths: int = 2000, max_paths: int = 1000000,
+                             max_seconds: Optional[float] = None, confidence: float = 0.95,
+                             seed: int = 42) -> AggregatedSimulation:
+    """
+    Runs batches until the median, P10 and P90 NPV have converged.
+    
+    After each batch the confidence-interval half-width of every NPV quantile
+    (relative to its estimate) is checked against `rel_tolerance`. The run stops
+    once all three are within tolerance, or when `max_paths` or `max_seconds`
+    is reached. Batches grow by 50% of the paths so far, so the convergence
+    checks cost O(n) overall. `num_paths` and `achieved_tolerance` on the
+    result record where it stopped. Shocks are drawn per batch, so paths are
+    not the same as a fixed-size run with the same seed.
+    """
+    _check_base_revenue(base_report)
+    started = time.perf_counter()
+    
+    rng = np.random.default_rng(seed)
+    
+    batches: List[SimulationPaths] = []
+    num_paths = 0
+    batch_size = min(initial_paths, max_paths)
+    while True:
+        batch = _simulate_scenario(base_report, params, rng, batch_size)
+        batch.npv = _scenario_npv(batch, params)
+        batches.append(batch)
+        num_paths += batch_size
         
-        terminal_fcf = fcf_stream[-1] * (1 + g)
-        terminal_value = terminal_fcf / (r - g)
+        npv = np.concatenate([b.npv for b in batches])
+        achieved = max(quantile_ci_halfwidths(npv, [0.5, 0.1, 0.9], confidence))
+        if achieved <= rel_tolerance:
+            stop_reason = "converged"
+            break
+        if num_paths >= max_paths:
+            stop_reason = "path budget reached"
+            break
+        if max_seconds is not None and time.perf_counter() - started >= max_seconds:
+            stop_reason = "time budget reached"
+            break
+        batch_size = min(max(num_paths // 2, initial_paths), max_paths - num_paths)
+    
+    assumption_log = _assumption_log(params, num_paths)
+    assumption_log.append(
+        f"Adaptive sampling: {num_paths} paths, NPV quantile CI half-width {achieved:.3%} "
+        f"(target {rel_tolerance:.3%}, {stop_reason})"
+    )
+    agg = aggregate_paths(SimulationPaths.concatenate(batches), assumption_log, dict(TRACEABILITY))
+    agg.achieved_tolerance = achieved
+    return agg
+
+# Time-budgeted runs: size of the first (timing) batch, smallest batch worth
+# starting, headroom on the aggregation estimate (its per-path cost grows
+# once the matrices fall out of cache), how much larger than the previous
+# batch the next may be, and the share of the spare time one batch may use
+BUDGET_FIRST_BATCH = 2000
+BUDGET_MIN_BATCH = 500
+BUDGET_AGGREGATION_MARGIN = 1.5
+BUDGET_BATCH_GROWTH = 4
+BUDGET_SPARE_SHARE = 0.5
+
+def run_monte_carlo_budgeted(base_report: FinancialReport, params: ScenarioParams, time_budget: float,
+                             max_paths: int = 1000000, seed: int = 42) -> AggregatedSimulation:
+    """
+    Runs as many paths as fit in `time_budget` seconds, then aggregates.
+    
+    A small first batch measures the per-path cost of the kernel and of
+    aggregation (which scales with paths x years and rivals the kernel for
+    the static model). Every later batch is sized from what is left of the
+    budget after reserving time to aggregate all paths, re-measuring the
+    kernel after each batch. The kernel's per-path cost rises once a batch
+    outgrows the CPU caches (about 2x for long horizons), so a batch is at
+    most BUDGET_BATCH_GROWTH times the previous one and uses at most
+    BUDGET_SPARE_SHARE of the spare time: a misestimate of up to 2x on the
+    last batch still lands inside the budget. The run stops when no
+    worthwhile batch fits or `max_paths` is reached. At least one batch
+    always runs, so a tiny budget still returns a (coarse) answer.
+    
+    `num_paths` and `standard_errors` on the result say what the budget
+    bought. Shocks are drawn per batch from one seeded stream, so the paths
+    equal a fixed-size run's only when the batch sizes happen to match.
+    """
+    _check_base_revenue(base_report)
+    if time_budget <= 0:
+        raise ValueError(f"time_budget must be positive, got {time_budget}")
+    started = time.perf_counter()
+    
+    rng = np.random.default_rng(seed)
+    batches: List[SimulationPaths] = []
+    num_paths = 0
+    batch_size = min(BUDGET_FIRST_BATCH, max_paths)
+    aggregate_per_path = None
+    while batch_size > 0:
+        batch_started = time.perf_counter()
+        batch = _simulate_scenario(base_report, params, rng, batch_size)
+        batch.npv = _scenario_npv(batch, params)
+        batches.append(batch)
+        num_paths += batch_size
+        per_path = (time.perf_counter() - batch_started) / batch_size
         
-        # NPV
-        npv = calculate_npv(fcf_stream, r) + (terminal_value / ((1 + r)**forecast_years))
+        if aggregate_per_path is None:
+            aggregate_started = time.perf_counter()
+            aggregate_paths(batch, [], {}, sample_size=0)
+            aggregate_per_path = BUDGET_AGGREGATION_MARGIN * (time.perf_counter() - aggregate_started) / batch_size
         
-        results.append(SimulationResult(
-            scenario_id=i,
-            revenue=rev_stream[0], # Year 1
-            ebitda=ebitda_stream[0], # Year 1
-            net_income=net_income_stream[0], # Year 1
-            fcf=fcf_stream[0], # Year 1
-            npv=npv,
-            key_driver="Revenue" if abs(sim_rev_growth) > abs(sim_opex_shift) else "OpEx",
-            revenue_forecast=rev_stream,
-            ebitda_forecast=ebitda_stream,
-            net_income_forecast=net_income_stream,
-            fcf_forecast=fcf_stream
-        ))
+        # Whatever is left after aggregating the paths we already have
+        spare = time_budget - (time.perf_counter() - started) - aggregate_per_path * num_paths
+        batch_size = min(int(BUDGET_SPARE_SHARE * spare / (per_path + aggregate_per_path)),
+                         BUDGET_BATCH_GROWTH * batch_size, max_paths - num_paths)
+        if batch_size < min(BUDGET_MIN_BATCH, max_paths - num_paths):
+            break
+    
+    paths = SimulationPaths.concatenate(batches) if len(batches) > 1 else batches[0]
+    assumption_log = _assumption_log(params, num_paths)
+    assumption_log.append(
+        f"Time budget: {num_paths} paths in {len(batches)} batches within {time_budget * 1000:.0f} ms"
+    )
+    return aggregate_paths(paths, assumption_log, dict(TRACEABILITY))
 
-    # Aggregate
-    npvs = [r.npv for r in results]
-    revenues_y1 = [r.revenue for r in results]
-    ebitdas_y1 = [r.ebitda for r in results]
-    fcfs_y1 = [r.fcf for r in results]
-    
-    # Aggregate Forecasts (P50)
-    # Transpose list of lists to get distribution per year
-    rev_forecast_matrix = np.array([r.revenue_forecast for r in results])
-    ebitda_forecast_matrix = np.array([r.ebitda_forecast for r in results])
-    fcf_forecast_matrix = np.array([r.fcf_forecast for r in results])
-    
-    median_rev_forecast = np.median(rev_forecast_matrix, axis=0).tolist()
-    median_ebitda_forecast = np.median(ebitda_forecast_matrix, axis=0).tolist()
-    median_fcf_forecast = np.median(fcf_forecast_matrix, axis=0).tolist()
-    
-    agg = AggregatedSimulation(
-        median_npv=np.median(npvs),
-        p10_npv=np.percentile(npvs, 10),
-        p90_npv=np.percentile(npvs, 90),
-        median_revenue=np.median(revenues_y1),
-        median_ebitda=np.median(ebitdas_y1),
-        median_fcf=np.median(fcfs_y1),
-        revenue_forecast_p50=median_rev_forecast,
-        ebitda_forecast_p50=median_ebitda_forecast,
-        fcf_forecast_p50=median_fcf_forecast,
-        assumption_log=[
-            f"Causal Model: 5-Year Explicit Forecast + Terminal Value (g=2%)",
-            f"Revenue Driver: Base Growth (3%) + User Delta ({params.revenue_growth_bps} bps)",
-            f"OpEx Driver: Revenue Scaling + Efficiency Delta ({params.opex_delta_bps} bps)",
-            f"Discount Rate: {discount_rate_base + discount_rate_delta:.2%}",
-            f"Monte Carlo: {num_simulations} iterations"
-        ],
-        traceability={"Revenue": "Base * (1+g)^t", "OpEx": "Base * (1+g+delta)^t", "EBITDA": "Rev - COGS - OpEx"},
-        simulation_runs=results[:100]
+def simulate_batch(base_report: FinancialReport, scenarios: List[ScenarioParams],
+                   num_simulations: int = 10000, seed: int = 42) -> SimulationPaths:
+    """
+    Simulates and discounts several scenarios on COMMON RANDOM NUMBERS.
+    
+    The shocks are drawn once and broadcast over a (scenarios x simulations x
+    years) tensor, so differences between scenarios reflect the parameters
+    rather than sampling noise. Scenarios must share one sampler, one
+    driver model (static or per-year) and one precision. Scenario `s` of the
+    result (`paths.scenario(s)`) holds exactly the paths that
+    `run_monte_carlo(base_report, scenarios[s], num_simulations, seed)` uses.
+    """
+    _check_base_revenue(base_report)
+    samplers = {p.sampler for p in scenarios}
+    if len(samplers) > 1:
+        raise ValueError(f"Batch scenarios must share one sampler, got {sorted(samplers)}")
+    driver_models = {p.driver_model for p in scenarios}
+    if len(driver_models) > 1:
+        raise ValueError(f"Batch scenarios must share one driver model, got {sorted(driver_models)}")
+    horizons = {p.forecast_years for p in scenarios}
+    if len(horizons) > 1:
+        raise ValueError(f"Batch scenarios must share one forecast horizon, got {sorted(horizons)}")
+    precisions = {p.precision for p in scenarios}
+    if len(precisions) > 1:
+        raise ValueError(f"Batch scenarios must share one precision, got {sorted(precisions)}")
+    forecast_years = horizons.pop()
+    
+    rng = np.random.default_rng(seed)
+    g = np.array([p.terminal_growth for p in scenarios])
+    r = np.array([_discount_rate(p) for p in scenarios])
+    
+    if driver_models.pop() == "per_year":
+        shocks = _draw_yearly_shocks(rng, num_simulations, forecast_years, samplers.pop())
+        paths = simulate_yearly(base_report, scenarios, shocks)
+        paths.npv = discount_paths(paths.fcf, r[:, None, None] + paths.discount_shift, g)
+        return paths
+    
+    growth_shocks, opex_shocks = _draw_shocks(rng, num_simulations, samplers.pop())
+    
+    # Per-scenario means and volatilities as (scenarios x 1) columns broadcast over the shared shocks
+    rev_growth_means = np.array([p.revenue_growth_bps for p in scenarios])[:, None] / 10000.0
+    opex_delta_means = np.array([p.opex_delta_bps for p in scenarios])[:, None] / 10000.0
+    rev_growth_vols = np.array([p.revenue_growth_vol for p in scenarios])[:, None]
+    opex_shift_vols = np.array([p.opex_shift_vol for p in scenarios])[:, None]
+    tax_deltas = np.array([p.tax_rate_delta_bps for p in scenarios])[:, None] / 10000.0
+    
+    rev_growth_dist = rev_growth_means + rev_growth_vols * growth_shocks
+    opex_delta_dist = opex_delta_means + opex_shift_vols * opex_shocks
+    tax_rate = base_report.kpis.get("TaxRate", 0.25) + tax_deltas
+    
+    paths = simulate_paths(base_report, rev_growth_dist, opex_delta_dist, tax_rate, forecast_years,
+                           dtype=np.dtype(precisions.pop()))
+    
+    r = np.where(r <= g, g + 0.01, r)
+    paths.npv = discount_paths(paths.fcf, r, g)
+    return paths
+
+def run_monte_carlo_batch(base_report: FinancialReport, scenarios: List[ScenarioParams],
+                          num_simulations: int = 10000, seed: int = 42) -> List[AggregatedSimulation]:
+    """
+    Evaluates several scenarios against one report with common random numbers
+    (see `simulate_batch`). Each scenario's result is identical to
+    `run_monte_carlo(base_report, params, num_simulations, seed)`.
+    """
+    _check_base_revenue(base_report)
+    if not scenarios:
+        return []
+    
+    paths = simulate_batch(base_report, scenarios, num_simulations, seed)
+    return [
+        aggregate_paths(paths.scenario(s), _assumption_log(params, num_simulations), dict(TRACEABILITY))
+        for s, params in enumerate(scenarios)
+    ]
+
+# Upper bound on path x year cells per kernel pass of a Sobol evaluation
+SOBOL_BATCH_CELLS = 5_000_000
+
+def _sobol_groups(params: ScenarioParams) -> List[Tuple[str, int]]:
+    """(driver, index into the innovation axis) for every driver that moves NPV"""
+    if params.driver_model != "per_year":
+        return [("revenue_growth", 0), ("opex_shift", 1)]
+    if params.driver_correlation is not None:
+        # Each innovation can feed several correlated drivers
+        return [(driver, i) for i, driver in enumerate(DRIVERS)]
+    vols = (params.revenue_growth_vol, params.opex_shift_vol, params.tax_rate_vol, params.discount_rate_vol)
+    return [(driver, i) for i, (driver, vol) in enumerate(zip(DRIVERS, vols)) if vol > 0]
+
+def _npv_from_normals(base_report: FinancialReport, params: ScenarioParams, normals: np.ndarray) -> np.ndarray:
+    """NPV of paths driven by explicit innovations, (paths x years x drivers) or (paths x 2) for static runs"""
+    if params.driver_model == "per_year":
+        paths = simulate_yearly(base_report, [params], normals).scenario(0)
+    else:
+        rev_growth_dist, opex_delta_dist = _scenario_drivers(params, normals[:, 0], normals[:, 1])
+        tax_rate = base_report.kpis.get("TaxRate", 0.25) + (params.tax_rate_delta_bps / 10000.0)
+        paths = simulate_paths(base_report, rev_growth_dist, opex_delta_dist, tax_rate, params.forecast_years,
+                               dtype=np.dtype(params.precision))
+    return _scenario_npv(paths, params)
+
+def sobol_indices(base_report: FinancialReport, params: ScenarioParams, num_samples: int = 4096,
+                  seed: int = 42) -> SobolAnalysis:
+    """
+    First-order and total Sobol indices of NPV for each stochastic driver.
+    
+    Saltelli scheme: two independent innovation matrices A and B (one draw of
+    twice the dimension from the scenario's sampler, so `sobol` gives the
+    usual quasi-random design) and, per driver i, the matrix AB_i equal to A
+    with driver i's innovations taken from B. The (k + 2) * N rows are stacked
+    and run through the vectorized kernel in a few large passes rather than
+    (k + 2) separate runs. Estimators: Saltelli (2010) for first order,
+    Jansen for total, both normalized by the variance of [f(A), f(B)].
+    
+    Static runs have two inputs (growth and OpEx shift). Per-year runs treat
+    each driver's innovations over all years as one group; with a driver
+    correlation the groups are the independent Cholesky innovations, so the
+    attribution follows the DRIVERS order. Indices are Monte Carlo estimates
+    and may dip slightly below zero for drivers that barely matter. When NPV
+    does not vary at all, every index and the interaction share are 0.
+    """
+    _check_base_revenue(base_report)
+    groups = _sobol_groups(params)
+    if not groups:
+        raise ValueError("Scenario has no stochastic driver with non-zero volatility")
+    if num_samples < 2:
+        raise ValueError(f"num_samples must be at least 2, got {num_samples}")
+    
+    shape = (2,) if params.driver_model != "per_year" else (params.forecast_years, len(DRIVERS))
+    rng = np.random.default_rng(seed)
+    draws = _draw_normals(rng, num_samples, 2 * int(np.prod(shape)), params.sampler)
+    a, b = (half.reshape((num_samples,) + shape) for half in np.split(draws, 2, axis=1))
+    
+    design = np.empty((len(groups) + 2, num_samples) + shape)
+    design[0], design[1] = a, b
+    for g, (_, i) in enumerate(groups):
+        design[g + 2] = a
+        design[g + 2][..., i] = b[..., i]
+    design = design.reshape((-1,) + shape)
+    
+    rows = max(1, SOBOL_BATCH_CELLS // params.forecast_years)
+    f = np.concatenate([
+        _npv_from_normals(base_report, params, design[start:start + rows])
+        for start in range(0, len(design), rows)
+    ]).reshape(len(groups) + 2, num_samples)
+    # Centering leaves the estimators unbiased but strips the NPV level out of their noise
+    f -= f[:2].mean()
+    f_a, f_b, f_ab = f[0], f[1], f[2:]
+    
+    variance = float(np.var(f[:2]))
+    if variance == 0:
+        first_order = total = np.zeros(len(groups))
+    else:
+        first_order = np.mean(f_b * (f_ab - f_a), axis=1) / variance
+        total = 0.5 * np.mean((f_a - f_ab) ** 2, axis=1) / variance
+    
+    indices = [SobolIndex(driver=driver, first_order=s1, total=st)
+               for (driver, _), s1, st in zip(groups, first_order.tolist(), total.tolist())]
+    indices.sort(key=lambda index: index.total, reverse=True)
+    return SobolAnalysis(
+        indices=indices,
+        npv_variance=variance,
+        interaction_share=0.0 if variance == 0 else 1.0 - float(first_order.sum()),
+        num_samples=num_samples,
+        num_evaluations=len(design)
     )
-    return agg
+
+def _stream_shard(base_report: FinancialReport, params: ScenarioParams, num_paths: int, seed: Any,
+                  chunk_size: int, k: int) -> StreamingAggregator:
+    """Simulates one stream chunk by chunk into a sketch aggregator (worker entry point)"""
+    if not isinstance(seed, np.random.SeedSequence):
+        seed = np.random.SeedSequence(seed)
+    rng = np.random.default_rng(seed)
+    
+    aggregator = StreamingAggregator(params.forecast_years, k=k, seed=seed.spawn(1)[0])
+    for start in range(0, num_paths, chunk_size):
+        n = min(chunk_size, num_paths - start)
+        paths = _simulate_scenario(base_report, params, rng, n)
+        paths.npv = _scenario_npv(paths, params)
+        aggregator.update(paths)
+    return aggregator
+
+def run_monte_carlo_streaming(base_report: FinancialReport, params: ScenarioParams,
+                              num_simulations: int = 10000, seed: int = 42, chunk_size: int = 100000,
+                              k: int = 200, num_shards: int = 1,
+                              max_workers: Optional[int] = None) -> AggregatedSimulation:
+    """
+    Bounded-memory variant of `run_monte_carlo` for very large path counts.
+    
+    Paths are simulated `chunk_size` at a time and folded into mergeable KLL
+    sketches, so memory is O(chunk_size + k log n) however many paths run.
+    Shards (from `SeedSequence(seed).spawn`) stream independently and their
+    sketches are merged. Quantiles are approximate: `quantile_rank_error` and
+    `quantile_error_bounds` on the result state how far off they can be.
+    CVaR and P(NPV<0) are read off the NPV sketch too; the 1% tail holds
+    fewer retained items than the rank error, so treat `cvar_1_npv` as rough.
+    Draws are taken per chunk, so paths differ from the exact engine's.
+    """
+    _check_base_revenue(base_report)
+    
+    if num_shards <= 1:
+        aggregator = _stream_shard(base_report, params, num_simulations, seed, chunk_size, k)
+    else:
+        shard_size, remainder = divmod(num_simulations, num_shards)
+        sizes = [shard_size + (1 if i < remainder else 0) for i in range(num_shards)]
+        seeds = np.random.SeedSequence(seed).spawn(num_shards)
+        if max_workers == 1:
+            shards = [_stream_shard(base_report, params, n, s, chunk_size, k) for n, s in zip(sizes, seeds)]
+        else:
+            with ProcessPoolExecutor(max_workers=max_workers) as executor:
+                shards = list(executor.map(_stream_shard, repeat(base_report), repeat(params), sizes, seeds,
+                                           repeat(chunk_size), repeat(k)))
+        aggregator = shards[0]
+        for shard in shards[1:]:
+            aggregator.merge(shard)
+    
+    return aggregator.result(_assumption_log(params, num_simulations), dict(TRACEABILITY))
 
 def check_balance_sheet(bs: BalanceSheet) -> Dict[str, Any]:
     """
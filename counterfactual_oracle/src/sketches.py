@@ -0,0 +1,143 @@
+"""
+Mergeable Quantile Sketches
+
+Bounded-memory quantile estimation for Monte Carlo outputs that are too large
+to materialize. Implements a KLL sketch (Karnin, Lang & Liberty, 2016) with
+NumPy compactors so whole simulation chunks are absorbed in one call.
+"""
+
+import numpy as np
+from typing import Any, List
+
+class KLLSketch:
+    """
+    KLL quantile sketch.
+
+    Items live in a hierarchy of compactors; an item at level h stands for 2^h
+    inputs. When a level overflows it is sorted and every other item (random
+    offset) is promoted, so memory stays O(k log(n/k)) regardless of stream
+    length. Two sketches built with the same `k` merge into a sketch of the
+    combined stream with the same error guarantee.
+    """
+
+    # Capacity decay between consecutive levels (top level holds k items)
+    DECAY = 2.0 / 3.0
+
+    def __init__(self, k: int = 200, seed: Any = None):
+        if k < 8:
+            raise ValueError(f"Sketch size k must be at least 8, got {k}")
+        self.k = k
+        self.count = 0
+        self.min_value = np.inf
+        self.max_value = -np.inf
+        self.levels: List[np.ndarray] = [np.empty(0)]
+        self._rng = np.random.default_rng(seed)
+
+    @property
+    def normalized_rank_error(self) -> float:
+        """
+        Single-quantile rank error at ~99% confidence (DataSketches KLL constants).
+        A reported q-quantile has true rank within q +/- this value.
+        """
+        return 2.296 / self.k ** 0.9723
+
+    def _capacity(self, level: int) -> int:
+        depth = len(self.levels) - level - 1
+        return max(2, int(np.ceil(self.k * self.DECAY ** depth)))
+
+    def update(self, values: np.ndarray) -> None:
+        """Absorbs a batch of values"""
+        values = np.asarray(values, dtype=np.float64).ravel()
+        if values.size == 0:
+            return
+        self.count += values.size
+        self.min_value = min(self.min_value, float(values.min()))
+        self.max_value = max(self.max_value, float(values.max()))
+        self.levels[0] = np.concatenate([self.levels[0], values])
+        self._compress()
+
+    def merge(self, other: "KLLSketch") -> None:
+        """Folds another sketch (same k) into this one"""
+        if other.k != self.k:
+            raise ValueError(f"Cannot merge sketches with k={self.k} and k={other.k}")
+        if other.count == 0:
+            return
+        while len(self.levels) < len(other.levels):
+            self.levels.append(np.empty(0))
+        for h, items in enumerate(other.levels):
+            self.levels[h] = np.concatenate([self.levels[h], items])
+        self.count += other.count
+        self.min_value = min(self.min_value, other.min_value)
+        self.max_value = max(self.max_value, other.max_value)
+        self._compress()
+
+    def _compress(self) -> None:
+        h = 0
+        while h < len(self.levels):
+            items = self.levels[h]
+            if len(items) > self._capacity(h):
+                if h + 1 == len(self.levels):
+                    self.levels.append(np.empty(0))
+                items = np.sort(items)
+                # An odd item out stays behind at this level
+                keep = items[:1] if len(items) % 2 else items[:0]
+                pairs = items[len(keep):]
+                promoted = pairs[self._rng.integers(2)::2]
+                self.levels[h] = keep
+                self.levels[h + 1] = np.concatenate([self.levels[h + 1], promoted])
+                # Capacities shift when a level is added, so restart the sweep
+                h = 0
+                continue
+            h += 1
+
+    def _sorted_view(self):
+        """Retained items in ascending order with their weights"""
+        if self.count == 0:
+            raise ValueError("Cannot query an empty sketch")
+        items = np.concatenate(self.levels)
+        weights = np.concatenate([np.full(len(lvl), 2.0 ** h) for h, lvl in enumerate(self.levels)])
+        order = np.argsort(items, kind="stable")
+        return items[order], weights[order]
+
+    def quantiles(self, qs: List[float]) -> List[float]:
+        """Estimated values at the requested quantiles (0-1)"""
+        items, weights = self._sorted_view()
+        cumulative = np.cumsum(weights)
+
+        results = []
+        for q in qs:
+            if q <= 0:
+                results.append(self.min_value)
+            elif q >= 1:
+                results.append(self.max_value)
+            else:
+                idx = int(np.searchsorted(cumulative, q * cumulative[-1], side="left"))
+                results.append(float(items[min(idx, len(items) - 1)]))
+        return results
+
+    def quantile(self, q: float) -> float:
+        return self.quantiles([q])[0]
+
+    def rank(self, value: float) -> float:
+        """Estimated fraction of inputs strictly below `value`"""
+        items, weights = self._sorted_view()
+        return float(weights[:np.searchsorted(items, value, side="left")].sum() / weights.sum())
+
+    def tail_mean(self, q: float) -> float:
+        """
+        Estimated mean of the lowest q fraction of inputs (expected shortfall).
+        The item straddling the cut-off contributes only its share of weight.
+        """
+        items, weights = self._sorted_view()
+        budget = max(q * weights.sum(), weights[0])
+        taken = np.clip(budget - (np.cumsum(weights) - weights), 0.0, weights)
+        return float(items @ taken / taken.sum())
+
+    def quantile_bounds(self, q: float) -> List[float]:
+        """[low, high] values bracketing the q-quantile at the sketch's rank error"""
+        eps = self.normalized_rank_error
+        low, high = self.quantiles([max(q - eps, 0.0), min(q + eps, 1.0)])
+        return [low, high]
+
+    def num_retained(self) -> int:
+        return sum(len(lvl) for lvl in self.levels)
@@ -141,13 +141,15 @@ class FinancialValidator:
         return errors
     
     def validate_scenario_params(self, opex_delta_bps: float, rev_growth_bps: float, 
-                                 discount_rate_bps: float) -> List[ValidationError]:
+                                 discount_rate_bps: float, base_discount_rate: float = 0.08,
+                                 terminal_growth: float = 0.02) -> List[ValidationError]:
         """
         Validates scenario parameters are within reasonable bounds.
         
         Checks:
         - Deltas are not extreme (> ±5000 bps = ±50%)
         - Discount rate doesn't go negative
+        - Discount rate exceeds terminal growth (else the engine floors it at g + 1%)
         """
         errors = []
         
@@ -169,8 +171,7 @@ class FinancialValidator:
             ))
         
         # Check: Discount rate going negative
-        base_discount = 0.08  # 8% default
-        new_discount = base_discount + (discount_rate_bps / 10000.0)
+        new_discount = base_discount_rate + (discount_rate_bps / 10000.0)
         if new_discount < 0:
             errors.append(ValidationError(
                 "ERROR",
@@ -178,6 +179,14 @@ class FinancialValidator:
                 f"Discount rate would become negative ({new_discount:.2%})",
                 new_discount
             ))
+        elif new_discount <= terminal_growth:
+            errors.append(ValidationError(
+                "WARNING",
+                "DiscountRate",
+                f"Discount rate ({new_discount:.2%}) does not exceed terminal growth ({terminal_growth:.2%}); "
+                f"it will be floored at {terminal_growth + 0.01:.2%}",
+                new_discount
+            ))
         
         return errors
     
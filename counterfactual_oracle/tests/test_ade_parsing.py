@@ -5,7 +5,15 @@ Tests the Landing AI parser with fixed JSON samples to ensure correct extraction
 """
 
 import pytest
-from counterfactual_oracle.src.agents.landing_ai import LandingAIClient
+import json
+import io
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from counterfactual_oracle.src.agents.landing_ai import (
+    LandingAIClient, LabelIndex, tokenize_ade_markdown, AdeMarkdownTokenizer, AdeResponseReader, split_pdf_pages,
+    html_table_rows
+)
 from counterfactual_oracle.src.models import FinancialReport
 
 # Sample ADE response (simplified)
@@ -86,5 +94,244 @@ def test_malformed_numbers():
     # Should handle parentheses as negative
     assert report.income_statement.EBIT == -50000.0
 
+def _number(text):
+    digits = text.replace(",", "")
+    return float(digits) if digits.isdigit() else None
+
+def _scan(field_map, synonyms):
+    """Reference lookup: exact label first, then the earliest row containing the synonym"""
+    for synonym in synonyms:
+        term = synonym.lower()
+        if term in field_map and _number(field_map[term]) is not None:
+            return _number(field_map[term])
+        for key, text in field_map.items():
+            if (term == key or (len(key) < 100 and term in key)) and _number(text) is not None:
+                return _number(text)
+    return None
+
+LABEL_ROWS = {
+    "total net sales": "300",
+    "net sales": "100",
+    "net sales - products": "n/a",
+    "cost of sales - products": "40",
+    "cost of sales": "-",
+    "total cost of sales": "60",
+    "x" * 100 + " operating income": "7",
+    "operating income": "n/a",
+    "operating income (loss)": "9",
+}
+
+@pytest.mark.parametrize("synonyms", [
+    ["Net sales", "Revenue"],  # exact label beats the earlier 'total net sales'
+    ["Revenue", "Total revenue", "Sales"],  # earliest containing row, after earlier misses
+    ["Cost of sales", "Total cost of sales"],  # unparseable exact value falls through to the scan
+    ["Operating income"],  # long labels are not substring candidates
+    ["Net sales - products"],
+    ["Gross profit"],
+])
+def test_label_index_preserves_first_match_precedence(synonyms):
+    index = LabelIndex(LABEL_ROWS, _number)
+    assert index.resolve(synonyms) == _scan(LABEL_ROWS, synonyms)
+    assert index.resolve(synonyms) == _scan(LABEL_ROWS, synonyms)  # memoized
+
+def test_label_index_empty_section():
+    assert LabelIndex({}, _number).resolve(["Net sales"]) is None
+
+def test_tokenizer_emits_items_in_document_order():
+    markdown = (
+        "Condensed Consolidated Statements of Operations\n"
+        "<table><tr><td>Net sales</td><td>1,000</td></tr></table>\n"
+        "CONSOLIDATED BALANCE SHEETS\n"
+        "| Total assets | 5,000 |\n| Total liabilities | 3,000 |\n"
+    )
+    items = list(tokenize_ade_markdown(markdown))
+    assert [(item['type'], item.get('section')) for item in items] == [
+        ('header', 'is'), ('html_table', None), ('header', 'bs'), ('md_table', None)]
+    assert items[0]['start'] == 0  # 'Condensed' prefix belongs to the header
+    assert items[1]['rows'] == [['Net sales', '1,000']]
+    assert items[3]['rows'] == [['Total assets', '5,000'], ['Total liabilities', '3,000']]
+
+def test_tokenizer_header_inside_table_follows_it():
+    markdown = "<table><tr><td>Consolidated Statements of Cash Flows</td><td>1</td></tr></table>"
+    assert [item['type'] for item in tokenize_ade_markdown(markdown)] == ['html_table', 'header']
+
+def test_tokenizer_ignores_unclosed_table():
+    assert [item['type'] for item in tokenize_ade_markdown("<table><tr><td>Net sales</td><td>1</td>")] == []
+
+@pytest.mark.parametrize("content, rows", [
+    ("<table><tr><td>a</td></tr><table==<td ='</table>", []),  # unterminated quote hides the rest
+    ("<table \"><tr \"><td>1</td></tr></table>", [['1']]),  # quotes only delimit values after '='
+    ("<table><tr><td a=b/>x</td></tr></table>", [['x']]),  # 'b/' is the value, not a self-closing tag
+    ("<table><tr><td></ td></tr></table>", [['']]),  # '</ ' opens a bogus comment
+    ("<table id=\"t\"><tr><td colspan=\"2\">Net sales</td><td>1&amp;2</td></tr></table>", [['Net sales', '1&2']]),
+])
+def test_html_table_rows_matches_html_parser(content, rows):
+    assert html_table_rows(content) == rows
+
+def test_tokenizer_collects_open_table_pieces():
+    markdown = "<table>" + "<tr><td>Net sales</td><td>1,000</td></tr>" * 50 + "</table>"
+    tokenizer = AdeMarkdownTokenizer()
+    pieces = [markdown[i:i + 7] for i in range(0, len(markdown), 7)]
+    assert [token for piece in pieces[:-1] for token in tokenizer.feed(piece)] == []
+    assert len(tokenizer.buffer) < 16 and tokenizer.pending
+    assert tokenizer.feed(pieces[-1]) + tokenizer.close() == list(tokenize_ade_markdown(markdown))
+
+STREAMED_MARKDOWN = (
+    "CONDENSED CONSOLIDATED STATEMENTS OF OPERATIONS\n"
+    "<table><tr><td></td><td>Three Months Ended</td></tr><tr><td>Total net sales</td><td>119,575</td></tr>"
+    "<tr><td>Operating income</td><td>40,373</td></tr></table>\n"
+    "CONSOLIDATED BALANCE SHEETS\n| Total assets | 352,583 |\n| Total liabilities | \"290,437\" |\n"
+)
+
+def test_tokenizer_fed_in_pieces_matches_whole_document():
+    tokenizer = AdeMarkdownTokenizer()
+    tokens = [token for char in STREAMED_MARKDOWN for token in tokenizer.feed(char)] + tokenizer.close()
+    assert tokens == list(tokenize_ade_markdown(STREAMED_MARKDOWN))
+
+def test_response_reader_skips_other_fields():
+    body = json.dumps({
+        "chunks": [{"markdown": "<table>\"}", "grounding": {"box": [0.1, 0.2]}}],
+        "markdown": STREAMED_MARKDOWN + "caf\u00e9 \U0001F600",
+        "metadata": {"page_count": 3, "job_id": "job-1"},
+    }).encode()
+    reader = AdeResponseReader(body[i:i + 5] for i in range(0, len(body), 5))
+    assert "".join(reader.markdown()) == STREAMED_MARKDOWN + "caf\u00e9 \U0001F600"
+    assert reader.metadata == {"page_count": 3, "job_id": "job-1"}
+
+def test_streamed_response_parses_like_loaded_response():
+    raw = {"markdown": STREAMED_MARKDOWN, "chunks": [], "metadata": {"page_count": 3, "job_id": "job-1"}}
+    body = json.dumps(raw, ensure_ascii=False).encode()
+    client = LandingAIClient(api_key="test")
+    streamed = client.parse_landing_ai_stream(body[i:i + 3] for i in range(0, len(body), 3))
+    assert streamed == client.parse_landing_ai_response(raw)
+    assert streamed.pdf_metadata.job_id == "job-1"
+
+class StandInADE:
+    """
+    Local HTTP stand-in for the ADE parse endpoint. `respond(request_body)`
+    returns (status, response_body) for each upload; uploads are counted.
+    """
+    def __init__(self, respond):
+        self.respond = respond
+        self.requests = 0
+        stand_in = self
+        class Handler(BaseHTTPRequestHandler):
+            def do_POST(self):
+                request_body = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+                stand_in.requests += 1
+                status, body = stand_in.respond(request_body)
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+            def log_message(self, *args):
+                pass
+        self.httpd = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.url = f"http://127.0.0.1:{self.httpd.server_address[1]}"
+
+    def __enter__(self):
+        threading.Thread(target=self.httpd.serve_forever, daemon=True).start()
+        return self
+
+    def __exit__(self, *exc):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+def test_extract_data_streams_response_from_server(tmp_path):
+    pdf = tmp_path / "filing.pdf"
+    pdf.write_bytes(b"%PDF-1.4 stand-in")
+    raw = {"markdown": STREAMED_MARKDOWN, "chunks": [{"markdown": "x" * 100000}], "metadata": {"job_id": "job-2"}}
+    with StandInADE(lambda request: (200, json.dumps(raw).encode())) as server:
+        client = LandingAIClient(api_key="test")
+        client.base_url = server.url
+        report = client.extract_data(str(pdf))
+    assert report == client.parse_landing_ai_response(raw)
+    assert report.pdf_metadata.cache_status is None
+
+RANGE_MARKDOWN = {
+    b"range-a": "CONSOLIDATED STATEMENTS OF OPERATIONS\n| Total net sales | 1,000 |\n| Operating income | 300 |",
+    b"range-b": "CONSOLIDATED BALANCE SHEETS\n| Total assets | 5,000 |\n| Total liabilities | 3,000 |",
+    b"range-c": "| Total shareholders' equity | 2,000 |\nCONSOLIDATED STATEMENTS OF CASH FLOWS\n| Cash generated by operating activities | 700 |",
+}
+RANGES = [(1, 2, b"%PDF range-a"), (3, 4, b"%PDF range-b"), (5, 6, b"%PDF range-c")]
+
+class RangeADE(StandInADE):
+    """Stand-in answering each range with its markdown; `failures[label]` uploads fail first with `status`"""
+    def __init__(self, failures=None, status=206, delays=None):
+        self.failures, self.status, self.delays = dict(failures or {}), status, delays or {}
+        self.attempts, self.in_flight, self.max_in_flight = {}, 0, 0
+        self.lock = threading.Lock()
+        super().__init__(self.answer)
+
+    def answer(self, request):
+        label = next(label for label in RANGE_MARKDOWN if label in request)
+        with self.lock:
+            self.attempts[label] = self.attempts.get(label, 0) + 1
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        time.sleep(self.delays.get(label, 0.05))
+        with self.lock:
+            self.in_flight -= 1
+            if self.failures.get(label, 0) > 0:
+                self.failures[label] -= 1
+                return self.status, b"{}"
+        page = int(label[-1:] == b"b") * 2 + int(label[-1:] == b"c") * 4 + 1
+        return 200, json.dumps({"markdown": RANGE_MARKDOWN[label], "chunks": [],
+                                "metadata": {"page_count": 2, "credit_usage": 6.0, "job_id": f"job-{page}"}}).encode()
+
+def range_client(server, **options):
+    client = LandingAIClient(api_key="test", retry_backoff_s=0.0, **options)
+    client.base_url = server.url
+    return client
+
+def test_page_ranges_merge_in_page_order():
+    # The first range finishes last
+    with RangeADE(delays={b"range-a": 0.3}) as server:
+        report = range_client(server, max_concurrency=2).extract_ranges(RANGES, "filing.pdf")
+    merged = "".join(markdown + "\n\n" for markdown in RANGE_MARKDOWN.values())
+    assert report.model_dump(exclude={"pdf_metadata"}) == \
+        LandingAIClient(api_key="test").parse_landing_ai_response({"markdown": merged}).model_dump(exclude={"pdf_metadata"})
+    assert report.income_statement.Revenue == 1000 and report.cash_flow.CashFromOperations == 700
+    assert server.max_in_flight == 2
+    metadata = report.pdf_metadata
+    assert (metadata.page_count, metadata.credit_usage, metadata.job_id) == (6, 18.0, "job-1,job-3,job-5")
+    assert [r["pages"] for r in metadata.page_ranges] == [[1, 2], [3, 4], [5, 6]]
+
+def test_failed_page_range_is_retried_alone():
+    with RangeADE(failures={b"range-b": 1}) as server:
+        report = range_client(server).extract_ranges(RANGES)
+    assert server.attempts == {b"range-a": 1, b"range-b": 2, b"range-c": 1}
+    assert [r["attempts"] for r in report.pdf_metadata.page_ranges] == [1, 2, 1]
+    assert report.balance_sheet.Assets == {"TotalAssets": 5000.0}
+    # The equity row at the top of the last range still belongs to the balance sheet
+    assert report.balance_sheet.Equity == {"TotalEquity": 2000.0}
+
+def test_page_range_failing_every_attempt_fails_document():
+    with RangeADE(failures={b"range-b": 10}, status=500) as server:
+        with pytest.raises(Exception, match="Pages 3-4 failed after 3 attempts"):
+            range_client(server, max_concurrency=1).extract_ranges(RANGES)
+    # Ranges queued behind the failure are never uploaded
+    assert b"range-c" not in server.attempts
+
+def test_extract_data_splits_long_pdfs(tmp_path):
+    pypdf = pytest.importorskip("pypdf")
+    writer = pypdf.PdfWriter()
+    for _ in range(5):
+        writer.add_blank_page(width=612, height=792)
+    pdf = tmp_path / "filing.pdf"
+    with open(pdf, "wb") as f:
+        writer.write(f)
+
+    ranges = split_pdf_pages(str(pdf), 2)
+    assert [(first, last) for first, last, _ in ranges] == [(1, 2), (3, 4), (5, 5)]
+    assert [len(pypdf.PdfReader(io.BytesIO(document)).pages) for _, _, document in ranges] == [2, 2, 1]
+
+    raw = {"markdown": STREAMED_MARKDOWN, "metadata": {"page_count": 2}}
+    with StandInADE(lambda request: (200, json.dumps(raw).encode())) as server:
+        report = range_client(server, pages_per_range=2).extract_data(str(pdf))
+        assert server.requests == 3
+    assert report.pdf_metadata.filename == "filing.pdf"
+
 if __name__ == "__main__":
     pytest.main([__file__, "-v"])
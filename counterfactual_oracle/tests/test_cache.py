@@ -0,0 +1,133 @@
+"""
+Result Cache Tests
+
+Covers the two-tier content-addressed cache, the cached simulation entry point
+and the PDF extraction cache.
+"""
+
+import hashlib
+import json
+import pytest
+from counterfactual_oracle.src.cache import ContentCache, canonical_hash
+from counterfactual_oracle.src.agents.landing_ai import LandingAIClient, ADE_RESPONSE_CACHE_VERSION, parser_fingerprint
+from counterfactual_oracle.src.models import ScenarioParams
+from counterfactual_oracle.src.logic import run_monte_carlo, run_monte_carlo_cached, engine_fingerprint
+from counterfactual_oracle.tests.test_benchmarks import STABLE_TECH
+from counterfactual_oracle.tests.test_ade_parsing import StandInADE, STREAMED_MARKDOWN
+
+def test_canonical_hash_ignores_key_order():
+    assert canonical_hash({"a": 1, "b": [1.5, 2]}) == canonical_hash({"b": [1.5, 2], "a": 1})
+    assert canonical_hash({"a": 1}) != canonical_hash({"a": 2})
+
+def test_memory_tier_evicts_least_recently_used_by_size():
+    cache = ContentCache("test", "v1", max_memory_bytes=10)
+    cache.put("a", "xxxx")
+    cache.put("b", "yyyy")
+    assert cache.get("a") == "xxxx"  # a is now most recent
+    cache.put("c", "zzzz")
+
+    assert cache.get("b") is None
+    assert cache.get("a") == "xxxx" and cache.get("c") == "zzzz"
+    stats = cache.stats()
+    assert (stats["memory_hits"], stats["misses"], stats["evictions"]) == (3, 1, 1)
+    assert stats["memory_bytes"] == 8
+
+def test_memory_tier_tracks_utf8_size_across_replacements():
+    cache = ContentCache("test", "v1", max_memory_bytes=10)
+    cache.put("a", "\u00e9\u00e9")  # 4 bytes
+    cache.put("a", "xyz")
+    assert cache.stats()["memory_bytes"] == 3
+    # An oversized replacement is not kept in memory, and neither is the stale value
+    cache.put("a", "\u00e9" * 6)
+    assert cache.get("a") is None
+    assert cache.stats()["memory_bytes"] == 0
+
+def test_disk_tier_survives_restart_and_honours_version(tmp_path):
+    db = str(tmp_path / "cache.sqlite")
+    ContentCache("test", "v1", db_path=db).put("key", "value")
+
+    reopened = ContentCache("test", "v1", db_path=db)
+    assert reopened.get("key") == "value"
+    assert reopened.get("key") == "value"
+    assert (reopened.stats()["disk_hits"], reopened.stats()["memory_hits"]) == (1, 1)
+
+    # A new engine version purges the old entries
+    upgraded = ContentCache("test", "v2", db_path=db)
+    assert upgraded.get("key") is None
+    assert upgraded.stats()["disk_entries"] == 0
+
+def test_disk_tier_evicts_to_size_limit(tmp_path):
+    cache = ContentCache("test", "v1", db_path=str(tmp_path / "cache.sqlite"), max_disk_bytes=25)
+    for i in range(5):
+        cache.put(f"k{i}", "0123456789")
+    stats = cache.stats()
+    assert stats["disk_entries"] == 2 and stats["disk_bytes"] <= 25
+
+def test_cached_simulation_matches_fresh_run(tmp_path):
+    cache = ContentCache("simulation", engine_fingerprint(), db_path=str(tmp_path / "sim.sqlite"))
+    params = ScenarioParams(opex_delta_bps=80, revenue_growth_bps=-50)
+
+    first = run_monte_carlo_cached(cache, STABLE_TECH, params, num_simulations=2000)
+    second = run_monte_carlo_cached(cache, STABLE_TECH, params, num_simulations=2000)
+    assert second == first == run_monte_carlo(STABLE_TECH, params, num_simulations=2000)
+    assert (cache.misses, cache.memory_hits) == (1, 1)
+
+    # Different inputs never share an entry
+    run_monte_carlo_cached(cache, STABLE_TECH, params, num_simulations=2000, seed=7)
+    assert cache.misses == 2
+
+def test_engine_fingerprint_carries_version():
+    assert engine_fingerprint().startswith("2.1+")
+
+def test_extraction_cache_skips_repeat_uploads(tmp_path):
+    pdf = tmp_path / "filing.pdf"
+    pdf.write_bytes(b"%PDF-1.4 filing")
+    db = str(tmp_path / "extraction.sqlite")
+    responses = ContentCache("ade_response", ADE_RESPONSE_CACHE_VERSION, db_path=db)
+    raw = {"markdown": STREAMED_MARKDOWN, "chunks": [{"markdown": STREAMED_MARKDOWN, "grounding": {"page": 0}}],
+           "metadata": {"job_id": "job-1", "credit_usage": 3.0}}
+
+    with StandInADE(lambda request: (200, json.dumps(raw).encode())) as server:
+        client = LandingAIClient("test", responses, ContentCache("ade_report", parser_fingerprint(), db_path=db))
+        client.base_url = server.url
+        first, second = client.extract_data(str(pdf)), client.extract_data(str(pdf))
+
+        # A changed parser re-derives the report from the stored raw response
+        reparsed = LandingAIClient("test", responses, ContentCache("ade_report", "next-parser", db_path=db))
+        reparsed.base_url = server.url
+        third = reparsed.extract_data(str(pdf))
+
+        # Different bytes are a different document
+        pdf.write_bytes(b"%PDF-1.4 amended filing")
+        fourth = client.extract_data(str(pdf))
+        assert server.requests == 2
+
+    assert [r.pdf_metadata.cache_status for r in (first, second, third, fourth)] == ["miss", "report", "response", "miss"]
+    # Only the fields the parser reads are cached, not the whole response body
+    assert json.loads(responses.get(first.pdf_metadata.content_sha256)) == {
+        "markdown": raw["markdown"], "metadata": raw["metadata"]}
+    assert first.income_statement == second.income_statement == third.income_statement
+    assert first.pdf_metadata.content_sha256 == hashlib.sha256(b"%PDF-1.4 filing").hexdigest()
+    assert second.pdf_metadata.cache_stats["ade_report"]["memory_hits"] == 1
+    assert third.pdf_metadata.cache_stats["ade_response"]["memory_hits"] == 1
+    # Hits cost no credits; the extraction that filled the cache is kept alongside
+    assert first.pdf_metadata.credit_usage == 3.0 and first.pdf_metadata.original_credit_usage is None
+    for hit in (second, third):
+        assert hit.pdf_metadata.credit_usage == 0.0 and hit.pdf_metadata.original_credit_usage == 3.0
+        assert hit.pdf_metadata.original_duration_ms == first.pdf_metadata.duration_ms
+
+def test_failed_extraction_is_not_cached(tmp_path):
+    pdf = tmp_path / "filing.pdf"
+    pdf.write_bytes(b"%PDF-1.4 filing")
+    client = LandingAIClient("test", ContentCache("ade_response", ADE_RESPONSE_CACHE_VERSION),
+                             ContentCache("ade_report", parser_fingerprint()))
+    with StandInADE(lambda request: (206, b"{}")) as server:
+        client.base_url = server.url
+        for _ in range(2):
+            with pytest.raises(Exception, match="206"):
+                client.extract_data(str(pdf))
+        assert server.requests == 2
+    assert client.response_cache.stats()["memory_entries"] == 0
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
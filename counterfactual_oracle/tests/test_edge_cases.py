@@ -142,5 +142,20 @@ def test_negative_discount_rate():
     # Should error on negative rate
     assert any(e.severity == "ERROR" and "negative" in e.message.lower() for e in errors)
 
+def test_discount_rate_uses_scenario_base():
+    """The negative-rate check follows the scenario's base rate, not a fixed 8%"""
+    validator = FinancialValidator()
+    errors = validator.validate_scenario_params(
+        opex_delta_bps=0,
+        rev_growth_bps=0,
+        discount_rate_bps=-1000,
+        base_discount_rate=0.12
+    )
+    assert not any(e.severity == "ERROR" for e in errors)
+    
+    # 3% does not exceed 3.5% terminal growth: flagged as floored
+    errors = validator.validate_scenario_params(0, 0, -500, base_discount_rate=0.08, terminal_growth=0.035)
+    assert any(e.severity == "WARNING" and "floored" in e.message for e in errors)
+
 if __name__ == "__main__":
     pytest.main([__file__, "-v"])
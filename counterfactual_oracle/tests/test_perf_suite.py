@@ -0,0 +1,63 @@
+"""
+Performance Gate Tests
+
+Covers the regression rule the perf suite applies against its baseline.
+"""
+
+import os
+import sys
+import pytest
+
+# The suite imports `src` the way `python -m benchmarks.perf_suite` sees it
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from benchmarks.perf_suite import find_regressions
+
+BASELINE = {
+    "monte_carlo_10k": {"wall_s": 0.010, "peak_bytes": 3_000_000},
+    "financial_validator": {"wall_s": 0.00001, "peak_bytes": 1_500},
+    "evaluator_generate_pdf": {"error": "FPDFException: Not enough horizontal space"},
+}
+
+def gate(results, **overrides):
+    limits = {"threshold": 0.25, "memory_threshold": 0.10, "min_delta_s": 0.0005, "min_delta_bytes": 65536}
+    return find_regressions(results, BASELINE, **{**limits, **overrides})
+
+def test_within_thresholds_passes():
+    assert gate({"monte_carlo_10k": {"wall_s": 0.012, "peak_bytes": 3_200_000}}) == []
+
+def test_slower_than_threshold_is_a_regression():
+    regressions = gate({"monte_carlo_10k": {"wall_s": 0.013, "peak_bytes": 3_000_000}})
+    assert len(regressions) == 1 and "wall time" in regressions[0] and "+30%" in regressions[0]
+
+def test_memory_growth_is_a_regression():
+    regressions = gate({"monte_carlo_10k": {"wall_s": 0.010, "peak_bytes": 3_400_000}})
+    assert len(regressions) == 1 and "peak memory" in regressions[0]
+
+def test_small_absolute_changes_are_noise():
+    # +100% time and +20% memory, but below min_delta_s and min_delta_bytes
+    assert gate({"financial_validator": {"wall_s": 0.00002, "peak_bytes": 1_800}}) == []
+    assert len(gate({"financial_validator": {"wall_s": 0.00002, "peak_bytes": 1_800}},
+                    min_delta_s=0.0, min_delta_bytes=0)) == 2
+
+def test_other_host_gates_memory_only():
+    slower_and_hungrier = {"monte_carlo_10k": {"wall_s": 0.030, "peak_bytes": 3_400_000}}
+    assert len(gate(slower_and_hungrier)) == 2
+    regressions = gate(slower_and_hungrier, check_time=False)
+    assert len(regressions) == 1 and "peak memory" in regressions[0]
+
+def test_budgeted_runs_gate_wall_time_only():
+    baseline = {"monte_carlo_budget_30y_static": {"wall_s": 0.40, "peak_bytes": 200_000_000}}
+    hungrier = {"monte_carlo_budget_30y_static": {"wall_s": 0.41, "peak_bytes": 800_000_000}}
+    slower = {"monte_carlo_budget_30y_static": {"wall_s": 0.60, "peak_bytes": 200_000_000}}
+    assert find_regressions(hungrier, baseline, 0.25, 0.10, 0.0005) == []
+    assert len(find_regressions(slower, baseline, 0.25, 0.10, 0.0005)) == 1
+
+def test_missing_and_errored_cases():
+    # New case (no baseline) and a case that only errored in the baseline both pass
+    assert gate({"monte_carlo_100m": {"wall_s": 99.0, "peak_bytes": 10**12},
+                 "evaluator_generate_pdf": {"wall_s": 0.03, "peak_bytes": 330_000}}) == []
+    # A measured case that now errors is a regression
+    assert gate({"monte_carlo_10k": {"error": "MemoryError: "}}) == ["monte_carlo_10k: MemoryError: "]
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,69 @@
+"""
+Portfolio Simulation Tests
+
+Covers the tensorized multi-company run and its macro-shock correlation.
+"""
+
+import numpy as np
+import pytest
+from counterfactual_oracle.src.models import ScenarioParams
+from counterfactual_oracle.src.logic import run_monte_carlo
+from counterfactual_oracle.src import portfolio
+from counterfactual_oracle.src.portfolio import run_portfolio
+from counterfactual_oracle.tests.test_benchmarks import STABLE_TECH, HIGH_GROWTH_STARTUP
+
+PARAMS = ScenarioParams(opex_delta_bps=50, revenue_growth_bps=-100)
+
+def test_single_company_portfolio_matches_company_result():
+    result = run_portfolio([STABLE_TECH], PARAMS, num_simulations=4000)
+    company = result.company_results[0]
+    assert result.companies == ["Company 1"]
+    assert result.median_npv == pytest.approx(company.median_npv)
+    assert result.p10_npv == pytest.approx(company.p10_npv)
+    assert result.diversification_benefit == pytest.approx(0.0, abs=1e-6)
+
+def test_fully_correlated_company_matches_standalone_distribution():
+    # With rho = 1 every company sees the macro shock only, which has the same
+    # law as a standalone run; medians agree up to sampling noise
+    result = run_portfolio([STABLE_TECH, STABLE_TECH], PARAMS, macro_correlation=1.0, num_simulations=20000)
+    standalone = run_monte_carlo(STABLE_TECH, PARAMS, num_simulations=20000)
+    first, second = result.company_results
+    assert first.median_npv == pytest.approx(second.median_npv)
+    assert first.median_npv == pytest.approx(standalone.median_npv, rel=0.02)
+    assert result.median_npv == pytest.approx(2 * first.median_npv)
+    assert result.diversification_benefit == pytest.approx(0.0, abs=1e-3 * abs(result.p10_npv))
+
+def test_weights_scale_portfolio_npv():
+    unit = run_portfolio([STABLE_TECH, HIGH_GROWTH_STARTUP], PARAMS, weights=[1, 1], num_simulations=2000)
+    doubled = run_portfolio([STABLE_TECH, HIGH_GROWTH_STARTUP], PARAMS, weights=[2, 2], num_simulations=2000)
+    assert doubled.median_npv == pytest.approx(2 * unit.median_npv)
+    assert np.allclose(doubled.fcf_forecast_p50, 2 * np.array(unit.fcf_forecast_p50))
+
+def test_diversification_benefit_shrinks_with_macro_correlation():
+    benefits = [
+        run_portfolio([STABLE_TECH] * 5, PARAMS, macro_correlation=rho, num_simulations=4000).diversification_benefit
+        for rho in (0.0, 0.5, 1.0)
+    ]
+    assert benefits[0] > benefits[1] > benefits[2] >= -1e-6
+
+def test_sliced_basket_matches_single_slice(monkeypatch):
+    """Slicing companies under the cell budget does not change any result"""
+    basket = [STABLE_TECH, HIGH_GROWTH_STARTUP, STABLE_TECH]
+    whole = run_portfolio(basket, PARAMS, weights=[1, 2, 3], macro_correlation=0.4, num_simulations=2000)
+    monkeypatch.setattr(portfolio, "MAX_BATCH_CELLS", 2000 * PARAMS.forecast_years)
+    sliced = run_portfolio(basket, PARAMS, weights=[1, 2, 3], macro_correlation=0.4, num_simulations=2000)
+    assert sliced.model_dump() == whole.model_dump()
+
+@pytest.mark.parametrize("kwargs", [
+    {"reports": []},
+    {"macro_correlation": 1.5},
+    {"weights": [1.0]},
+    {"params": ScenarioParams(driver_model="per_year")},
+])
+def test_invalid_portfolio_inputs_raise(kwargs):
+    call = {"reports": [STABLE_TECH, HIGH_GROWTH_STARTUP], "params": PARAMS, **kwargs}
+    with pytest.raises(ValueError):
+        run_portfolio(call.pop("reports"), call.pop("params"), num_simulations=500, **call)
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
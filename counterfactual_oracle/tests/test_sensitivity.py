@@ -0,0 +1,132 @@
+"""
+Sensitivity Engine Tests
+
+Tornado sweeps, 2-D grids and goal seeking must agree with standalone simulation runs;
+Sobol indices must attribute NPV variance to the drivers that actually carry it.
+"""
+
+import pytest
+from counterfactual_oracle.src.models import ScenarioParams
+from counterfactual_oracle.src.logic import run_monte_carlo, sobol_indices
+from counterfactual_oracle.src import logic, sensitivity
+from counterfactual_oracle.src.sensitivity import run_sensitivity
+from counterfactual_oracle.src.goal_seek import goal_seek
+from counterfactual_oracle.tests.test_benchmarks import STABLE_TECH
+
+def test_tornado_points_match_standalone_runs():
+    base = ScenarioParams(revenue_growth_bps=100)
+    analysis = run_sensitivity(STABLE_TECH, base, {"opex_delta_bps": [200, -200, 0]}, num_simulations=2000)
+
+    bar = analysis.tornado[0]
+    assert [p.value for p in bar.points] == [-200, 0, 200]
+    single = run_monte_carlo(STABLE_TECH, base.model_copy(update={"opex_delta_bps": 200}), 2000)
+    assert bar.high_npv == pytest.approx(single.median_npv, rel=1e-12)
+    assert bar.points[-1].p90_npv == pytest.approx(single.p90_npv, rel=1e-12)
+    assert analysis.base_median_npv == pytest.approx(run_monte_carlo(STABLE_TECH, base, 2000).median_npv, rel=1e-12)
+
+def test_tornado_sorted_by_swing():
+    ranges = {
+        "tax_rate_delta_bps": [-100, 100],
+        "discount_rate_bps": [-200, 200],
+        "opex_delta_bps": [-50, 50],
+    }
+    analysis = run_sensitivity(STABLE_TECH, ScenarioParams(), ranges, num_simulations=1000)
+    swings = [bar.swing for bar in analysis.tornado]
+    assert swings == sorted(swings, reverse=True)
+    assert analysis.tornado[0].driver == "discount_rate_bps"
+    assert analysis.num_scenarios == 7
+
+def test_grid_layout_and_chunking_are_consistent(monkeypatch):
+    ranges = {"opex_delta_bps": [-100, 0, 100], "revenue_growth_bps": [-200, 200]}
+    grids = [("opex_delta_bps", "revenue_growth_bps")]
+    whole = run_sensitivity(STABLE_TECH, ScenarioParams(), ranges, grids, num_simulations=1000)
+
+    # Force one scenario per slice: shared seeds keep every cell identical
+    monkeypatch.setattr(sensitivity, "MAX_BATCH_CELLS", 1)
+    sliced = run_sensitivity(STABLE_TECH, ScenarioParams(), ranges, grids, num_simulations=1000)
+    assert sliced == whole
+
+    grid = whole.grids[0]
+    assert len(grid.median_npv) == 2 and len(grid.median_npv[0]) == 3
+    corner = run_monte_carlo(STABLE_TECH, ScenarioParams(opex_delta_bps=100, revenue_growth_bps=-200), 1000)
+    assert grid.median_npv[0][2] == pytest.approx(corner.median_npv, rel=1e-12)
+
+@pytest.mark.parametrize("ranges, grids", [
+    ({"capex_bps": [0, 100]}, []),
+    ({"opex_delta_bps": []}, []),
+    ({"opex_delta_bps": [0, 100]}, [("opex_delta_bps", "tax_rate_delta_bps")]),
+])
+def test_invalid_requests_rejected(ranges, grids):
+    with pytest.raises(ValueError):
+        run_sensitivity(STABLE_TECH, ScenarioParams(), ranges, grids, num_simulations=100)
+
+def test_goal_seek_hits_target_in_few_batches():
+    """P10 NPV break-even OpEx delta, verified with a standalone run"""
+    result = goal_seek(STABLE_TECH, ScenarioParams(), "opex_delta_bps", target_npv=0.0, statistic="p10",
+                       bounds=(-3000, 3000), tolerance_bps=0.5, num_simulations=2000)
+    assert result.converged and result.iterations <= 6
+    assert result.bracket[0] <= result.solution_bps <= result.bracket[1]
+
+    check = run_monte_carlo(STABLE_TECH, ScenarioParams(opex_delta_bps=result.solution_bps), 2000)
+    assert check.p10_npv == pytest.approx(result.achieved_npv, rel=1e-12)
+    assert abs(result.achieved_npv) < 1e-3 * abs(run_monte_carlo(STABLE_TECH, ScenarioParams(), 2000).p10_npv)
+
+def test_goal_seek_rejects_unbracketed_target():
+    with pytest.raises(ValueError, match="not bracketed"):
+        goal_seek(STABLE_TECH, ScenarioParams(), "tax_rate_delta_bps", target_npv=1e15,
+                  bounds=(-100, 100), num_simulations=500)
+
+def test_sobol_indices_static_drivers_are_additive():
+    analysis = sobol_indices(STABLE_TECH, ScenarioParams(sampler="sobol"), num_samples=4096)
+    by_driver = {index.driver: index for index in analysis.indices}
+
+    assert set(by_driver) == {"revenue_growth", "opex_shift"}
+    assert analysis.indices[0].total >= analysis.indices[1].total
+    assert sum(index.first_order for index in analysis.indices) == pytest.approx(1.0, abs=0.02)
+    for index in analysis.indices:
+        assert index.first_order == pytest.approx(index.total, abs=0.02)
+    assert analysis.num_evaluations == 4 * 4096
+
+def test_sobol_indices_ignore_zero_volatility_drivers():
+    static = sobol_indices(STABLE_TECH, ScenarioParams(opex_shift_vol=0.0), num_samples=1024)
+    by_driver = {index.driver: index for index in static.indices}
+    assert by_driver["revenue_growth"].total == pytest.approx(1.0, abs=0.05)
+    assert by_driver["opex_shift"].total == 0.0
+
+    per_year = sobol_indices(STABLE_TECH, ScenarioParams(driver_model="per_year", discount_rate_vol=0.01),
+                             num_samples=2048)
+    assert [index.driver for index in per_year.indices][0] == "discount_rate"
+    assert {index.driver for index in per_year.indices} == {"revenue_growth", "opex_shift", "discount_rate"}
+
+def test_sobol_evaluation_is_chunked(monkeypatch):
+    params = ScenarioParams(driver_model="per_year", tax_rate_vol=0.02)
+    whole = sobol_indices(STABLE_TECH, params, num_samples=512)
+    monkeypatch.setattr(logic, "SOBOL_BATCH_CELLS", 1000)
+    assert sobol_indices(STABLE_TECH, params, num_samples=512) == whole
+
+def test_run_monte_carlo_attaches_sobol_indices():
+    params = ScenarioParams()
+    assert run_monte_carlo(STABLE_TECH, params, num_simulations=1000).sobol_indices is None
+    result = run_monte_carlo(STABLE_TECH, params, num_simulations=1000, sobol_samples=512)
+    assert result.sobol_indices == sobol_indices(STABLE_TECH, params, num_samples=512)
+
+def test_sobol_requires_a_stochastic_driver():
+    params = ScenarioParams(driver_model="per_year", revenue_growth_vol=0.0, opex_shift_vol=0.0)
+    with pytest.raises(ValueError, match="no stochastic driver"):
+        sobol_indices(STABLE_TECH, params)
+
+def test_run_monte_carlo_skips_sobol_without_stochastic_driver():
+    """The run still succeeds; there is just nothing to attribute"""
+    params = ScenarioParams(driver_model="per_year", revenue_growth_vol=0.0, opex_shift_vol=0.0)
+    result = run_monte_carlo(STABLE_TECH, params, num_simulations=1000, sobol_samples=512)
+    assert result.sobol_indices is None
+
+def test_sobol_indices_of_constant_npv_are_zero():
+    analysis = sobol_indices(STABLE_TECH, ScenarioParams(revenue_growth_vol=0.0, opex_shift_vol=0.0),
+                             num_samples=256)
+    assert analysis.npv_variance == 0.0
+    assert analysis.interaction_share == 0.0
+    assert all(index.first_order == index.total == 0.0 for index in analysis.indices)
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,371 @@
+"""
+Simulation Engine Tests
+
+Checks the vectorized Monte Carlo kernel against the original per-path loop.
+"""
+
+import numpy as np
+import pytest
+from counterfactual_oracle.src.models import ScenarioParams
+from counterfactual_oracle.src.logic import (
+    run_monte_carlo, run_monte_carlo_batch, _draw_shocks, path_cache, PathCache, simulate_sharded, run_monte_carlo_adaptive, quantile_ci_halfwidths, simulate_paths, discount_paths, calculate_fcf, calculate_npv,
+    simulate_yearly, _draw_yearly_shocks, select_quantiles
+)
+from counterfactual_oracle.tests.test_benchmarks import STABLE_TECH, HIGH_GROWTH_STARTUP, MATURE_LOW_MARGIN
+
+def reference_npvs(base_report, params, num_simulations):
+    """Original scalar implementation: one Python loop per path and per year"""
+    income = base_report.income_statement
+    rng = np.random.default_rng(42)
+    rev_growth_dist = rng.normal(params.revenue_growth_bps / 10000.0, 0.02, num_simulations)
+    opex_delta_dist = rng.normal(params.opex_delta_bps / 10000.0, 0.01, num_simulations)
+    tax_rate = base_report.kpis.get("TaxRate", 0.25) + params.tax_rate_delta_bps / 10000.0
+    r = 0.08 + params.discount_rate_bps / 10000.0
+    g = 0.02
+
+    npvs, revenues = [], []
+    for i in range(num_simulations):
+        curr_rev, curr_opex = income.Revenue, income.OpEx
+        rev_stream, fcf_stream = [], []
+        for t in range(5):
+            total_rev_growth = base_report.kpis.get("RevenueGrowth", 0.03) + rev_growth_dist[i]
+            curr_rev = curr_rev * (1 + total_rev_growth)
+            curr_opex = curr_opex * (1 + total_rev_growth + opex_delta_dist[i])
+            curr_ebitda = curr_rev - curr_rev * (1 - income.GrossProfit / income.Revenue) - curr_opex
+            curr_da = curr_rev * (income.DepreciationAndAmortization / income.Revenue)
+            curr_ebit = curr_ebitda - curr_da
+            capex = curr_rev * (base_report.cash_flow.CapEx / income.Revenue)
+            wc = curr_rev * (base_report.cash_flow.ChangeInWorkingCapital / income.Revenue)
+            rev_stream.append(curr_rev)
+            fcf_stream.append(calculate_fcf(curr_ebit, tax_rate, curr_da, wc, capex))
+        terminal_value = fcf_stream[-1] * (1 + g) / (r - g)
+        npvs.append(calculate_npv(fcf_stream, r) + terminal_value / ((1 + r) ** 5))
+        revenues.append(rev_stream)
+    return np.array(npvs), np.array(revenues)
+
+@pytest.mark.parametrize("report", [STABLE_TECH, HIGH_GROWTH_STARTUP])
+def test_vectorized_matches_reference_loop(report):
+    """Same seed must give the same aggregates as the per-path loop"""
+    params = ScenarioParams(opex_delta_bps=-150, revenue_growth_bps=200, discount_rate_bps=50)
+    result = run_monte_carlo(report, params, num_simulations=2000)
+    npvs, revenues = reference_npvs(report, params, 2000)
+
+    assert result.median_npv == pytest.approx(np.median(npvs), rel=1e-12)
+    assert result.p10_npv == pytest.approx(np.percentile(npvs, 10), rel=1e-12)
+    assert result.p90_npv == pytest.approx(np.percentile(npvs, 90), rel=1e-12)
+    assert result.revenue_forecast_p50 == np.median(revenues, axis=0).tolist()
+
+    # Sampled runs are the first paths, in order
+    assert len(result.simulation_runs) == 100
+    assert result.simulation_runs[3].npv == pytest.approx(npvs[3], rel=1e-12)
+    assert result.simulation_runs[3].revenue_forecast == revenues[3].tolist()
+
+def test_small_run_keeps_all_paths():
+    """Runs with fewer than 100 paths keep every path as a sample"""
+    result = run_monte_carlo(STABLE_TECH, ScenarioParams(), num_simulations=10)
+    assert len(result.simulation_runs) == 10
+    assert len(result.fcf_forecast_p50) == 5
+
+def test_columnar_paths_build_views_on_demand():
+    """SimulationPaths keeps flat arrays and only materializes requested runs"""
+    rev_growth = np.array([0.05, -0.01, 0.0])
+    opex_shift = np.array([0.0, 0.02, 0.01])
+    paths = simulate_paths(STABLE_TECH, rev_growth, opex_shift, tax_rate=0.25)
+    paths.npv = discount_paths(paths.fcf, 0.08, 0.02)
+
+    assert len(paths) == 3
+    assert paths.fcf.shape == (3, 5) and paths.fcf.flags["C_CONTIGUOUS"]
+
+    runs = paths.sample_runs(limit=2)
+    assert [r.scenario_id for r in runs] == [0, 1]
+    assert runs[0].key_driver == "Revenue"
+    assert runs[1].key_driver == "OpEx"
+    assert runs[1].fcf_forecast == paths.fcf[1].tolist()
+
+def test_sharded_runs_are_independent_of_worker_count():
+    """Output depends only on (seed, num_shards), not on how shards are executed"""
+    params = ScenarioParams(revenue_growth_bps=100)
+    in_process = run_monte_carlo(STABLE_TECH, params, num_simulations=1001, num_shards=4, max_workers=1,
+                                 use_path_cache=False)
+    pooled = run_monte_carlo(STABLE_TECH, params, num_simulations=1001, num_shards=4, max_workers=2,
+                             use_path_cache=False)
+
+    assert in_process.median_npv == pooled.median_npv
+    assert in_process.p10_npv == pooled.p10_npv
+    assert in_process.fcf_forecast_p50 == pooled.fcf_forecast_p50
+
+def test_single_shard_keeps_legacy_stream():
+    """num_shards=1 draws from default_rng(seed) like the unsharded engine"""
+    params = ScenarioParams(opex_delta_bps=75)
+    legacy = run_monte_carlo(STABLE_TECH, params, num_simulations=500)
+    seeded = run_monte_carlo(STABLE_TECH, params, num_simulations=500, seed=42, num_shards=1)
+    other_seed = run_monte_carlo(STABLE_TECH, params, num_simulations=500, seed=7)
+
+    assert legacy.median_npv == seeded.median_npv
+    assert legacy.median_npv != other_seed.median_npv
+
+def test_batch_matches_individual_runs():
+    """Common random numbers: each batch entry equals the standalone run with the same seed"""
+    scenarios = [
+        ScenarioParams(),
+        ScenarioParams(revenue_growth_bps=-300, tax_rate_delta_bps=200),
+        ScenarioParams(opex_delta_bps=250, discount_rate_bps=-700),
+    ]
+    batch = run_monte_carlo_batch(HIGH_GROWTH_STARTUP, scenarios, num_simulations=3000)
+
+    assert len(batch) == 3
+    for params, result in zip(scenarios, batch):
+        single = run_monte_carlo(HIGH_GROWTH_STARTUP, params, num_simulations=3000)
+        assert result.median_npv == single.median_npv
+        assert result.p90_npv == single.p90_npv
+        assert result.ebitda_forecast_p50 == single.ebitda_forecast_p50
+        assert result.simulation_runs[0] == single.simulation_runs[0]
+
+def test_adaptive_stops_once_converged():
+    """A loose tolerance converges on far fewer paths than the path budget"""
+    result = run_monte_carlo_adaptive(STABLE_TECH, ScenarioParams(), rel_tolerance=0.01, max_paths=100000)
+    assert result.num_paths < 100000
+    assert result.achieved_tolerance <= 0.01
+    assert "converged" in result.assumption_log[-1]
+
+def test_adaptive_respects_path_budget():
+    """An unreachable tolerance stops exactly at max_paths"""
+    result = run_monte_carlo_adaptive(HIGH_GROWTH_STARTUP, ScenarioParams(), rel_tolerance=1e-6,
+                                      initial_paths=1000, max_paths=5000)
+    assert result.num_paths == 5000
+    assert result.achieved_tolerance > 1e-6
+    assert "path budget" in result.assumption_log[-1]
+
+def test_quantile_ci_shrinks_with_more_paths():
+    """Order-statistic CI half-widths shrink roughly with 1/sqrt(n)"""
+    npv = np.random.default_rng(0).normal(100.0, 10.0, 40000)
+    wide = quantile_ci_halfwidths(npv[:10000], [0.5])[0]
+    narrow = quantile_ci_halfwidths(npv, [0.5])[0]
+    assert narrow == pytest.approx(wide / 2, rel=0.2)
+
+def test_antithetic_shocks_are_mirrored():
+    growth, opex = _draw_shocks(np.random.default_rng(0), 6, "antithetic")
+    np.testing.assert_array_equal(growth[:3], -growth[3:])
+    np.testing.assert_array_equal(opex[:3], -opex[3:])
+
+@pytest.mark.parametrize("sampler", ["sobol", "lhs"])
+def test_quasi_random_samplers_reduce_error(sampler):
+    """Sobol and LHS estimate the median NPV more accurately than pseudo-random at equal paths"""
+    reference = run_monte_carlo(STABLE_TECH, ScenarioParams(sampler="sobol"), 2 ** 18, seed=99).median_npv
+
+    def rms_error(name):
+        estimates = [run_monte_carlo(STABLE_TECH, ScenarioParams(sampler=name), 1024, seed=s).median_npv
+                     for s in range(10)]
+        return np.sqrt(np.mean((np.array(estimates) - reference) ** 2))
+
+    assert rms_error(sampler) < rms_error("pseudo")
+
+def test_unknown_sampler_rejected():
+    with pytest.raises(ValueError):
+        ScenarioParams(sampler="halton")
+
+def test_discount_only_change_reuses_paths():
+    """Changing only the discount rate re-discounts cached paths instead of re-simulating"""
+    path_cache.clear()
+    base = ScenarioParams(revenue_growth_bps=120, opex_delta_bps=-40)
+    run_monte_carlo(MATURE_LOW_MARGIN, base, num_simulations=4000)
+    assert (path_cache.hits, path_cache.misses) == (0, 1)
+
+    cached = run_monte_carlo(MATURE_LOW_MARGIN, base.model_copy(update={"discount_rate_bps": 150}), 4000)
+    assert (path_cache.hits, path_cache.misses) == (1, 1)
+
+    fresh = run_monte_carlo(MATURE_LOW_MARGIN, base.model_copy(update={"discount_rate_bps": 150}), 4000,
+                            use_path_cache=False)
+    assert cached.median_npv == fresh.median_npv
+    assert cached.simulation_runs[5] == fresh.simulation_runs[5]
+
+    # Any other parameter changes the paths and misses
+    run_monte_carlo(MATURE_LOW_MARGIN, base.model_copy(update={"tax_rate_delta_bps": 100}), 4000)
+    assert path_cache.misses == 2
+
+def test_path_cache_is_bounded_by_matrix_bytes():
+    """Path matrices are evicted by total size, and oversized runs are never cached"""
+    cache = PathCache(max_entries=16, max_memory_bytes=1_000_000)
+    small = simulate_sharded(MATURE_LOW_MARGIN, ScenarioParams(), 2000)
+    assert 300_000 < small.nbytes < 500_000
+
+    cache.put("a", small)
+    cache.put("b", small)
+    cache.put("c", small)
+    assert cache.get("a") is None and cache.get("c") is small
+    assert cache.memory_bytes == 2 * small.nbytes <= cache.max_memory_bytes
+    assert cache.evictions == 1
+
+    cache.put("big", simulate_sharded(MATURE_LOW_MARGIN, ScenarioParams(), 20000))
+    assert cache.get("big") is None
+    assert cache.memory_bytes == 2 * small.nbytes
+
+CORRELATION = [[1.0, -0.6, 0.0, 0.3], [-0.6, 1.0, 0.0, 0.0], [0.0, 0.0, 1.0, 0.0], [0.3, 0.0, 0.0, 1.0]]
+
+def test_per_year_drivers_follow_correlation():
+    """Drivers are redrawn every year and correlated within the year"""
+    params = ScenarioParams(driver_model="per_year", driver_correlation=CORRELATION, discount_rate_vol=0.01)
+    shocks = _draw_yearly_shocks(np.random.default_rng(0), 200000, 5)
+    correlated = shocks.reshape(-1, 4) @ np.linalg.cholesky(np.array(CORRELATION)).T
+    assert np.corrcoef(correlated[:, 0], correlated[:, 1])[0, 1] == pytest.approx(-0.6, abs=0.01)
+
+    paths = simulate_yearly(STABLE_TECH, [params], shocks).scenario(0)
+    assert paths.fcf.shape == (200000, 5) and paths.discount_shift.shape == (200000, 5)
+    # Year-over-year revenue growth now varies within a path
+    growth = paths.revenue[:, 1:] / paths.revenue[:, :-1]
+    assert np.std(growth[:, 1] - growth[:, 0]) > 0.02
+
+def test_per_year_without_volatility_matches_static():
+    """With every volatility at zero both driver models are the same deterministic projection"""
+    calm = dict(revenue_growth_bps=150, discount_rate_bps=-100, revenue_growth_vol=0.0, opex_shift_vol=0.0)
+    static = run_monte_carlo(STABLE_TECH, ScenarioParams(**calm), num_simulations=50)
+    per_year = run_monte_carlo(STABLE_TECH, ScenarioParams(driver_model="per_year", **calm), num_simulations=50)
+    assert per_year.median_npv == pytest.approx(static.median_npv, rel=1e-12)
+    assert per_year.fcf_forecast_p50 == pytest.approx(static.fcf_forecast_p50, rel=1e-12)
+
+def test_per_year_batch_matches_individual_runs():
+    scenarios = [
+        ScenarioParams(driver_model="per_year", driver_correlation=CORRELATION, tax_rate_vol=0.02),
+        ScenarioParams(driver_model="per_year", opex_delta_bps=200, discount_rate_vol=0.01),
+    ]
+    batch = run_monte_carlo_batch(HIGH_GROWTH_STARTUP, scenarios, num_simulations=2000)
+    for params, result in zip(scenarios, batch):
+        single = run_monte_carlo(HIGH_GROWTH_STARTUP, params, num_simulations=2000, use_path_cache=False)
+        assert result.median_npv == single.median_npv
+        assert result.revenue_forecast_p50 == single.revenue_forecast_p50
+
+    with pytest.raises(ValueError, match="driver model"):
+        run_monte_carlo_batch(HIGH_GROWTH_STARTUP, [ScenarioParams(), scenarios[0]], num_simulations=100)
+
+@pytest.mark.parametrize("correlation", [
+    [[1.0, 0.5], [0.5, 1.0]],
+    [[1.0, 0.9, 0.9, 0.0], [0.9, 1.0, -0.9, 0.0], [0.9, -0.9, 1.0, 0.0], [0.0, 0.0, 0.0, 1.0]],
+])
+def test_invalid_correlation_rejected(correlation):
+    params = ScenarioParams(driver_model="per_year", driver_correlation=correlation)
+    with pytest.raises(ValueError):
+        run_monte_carlo(STABLE_TECH, params, num_simulations=100)
+
+def test_calculate_npv_uses_discount_factor_vector():
+    assert calculate_npv([110.0, 121.0, 133.1], 0.1) == pytest.approx(300.0, rel=1e-12)
+    assert calculate_npv([], 0.1) == 0.0
+
+def test_base_discount_rate_is_a_scenario_input():
+    """Base rate and delta are interchangeable, and only discounting is redone"""
+    path_cache.clear()
+    via_delta = run_monte_carlo(STABLE_TECH, ScenarioParams(discount_rate_bps=100), 3000)
+    via_base = run_monte_carlo(STABLE_TECH, ScenarioParams(base_discount_rate=0.09), 3000)
+    assert via_base.median_npv == pytest.approx(via_delta.median_npv, rel=1e-12)
+    assert "Discount Rate: 9.00%" in via_base.assumption_log
+    assert path_cache.hits == 1
+
+def test_long_horizon_and_terminal_growth():
+    params = ScenarioParams(forecast_years=30, terminal_growth=0.03)
+    result = run_monte_carlo(MATURE_LOW_MARGIN, params, num_simulations=2000)
+    npvs, _ = reference_npvs_horizon(MATURE_LOW_MARGIN, params, 2000)
+    assert len(result.fcf_forecast_p50) == 30
+    assert result.median_npv == pytest.approx(np.median(npvs), rel=1e-10)
+    assert result.assumption_log[0].startswith("Causal Model: 30-Year")
+
+def test_tail_risk_matches_sorted_paths():
+    """VaR, CVaR and P(NPV<0) agree with a brute-force sort of the same paths"""
+    params = ScenarioParams(opex_delta_bps=600)
+    result = run_monte_carlo(MATURE_LOW_MARGIN, params, num_simulations=4000)
+    npvs = np.sort(reference_npvs_horizon(MATURE_LOW_MARGIN, params, 4000)[0])
+
+    assert result.var_1_npv == pytest.approx(np.percentile(npvs, 1), rel=1e-10)
+    assert result.var_5_npv == pytest.approx(np.percentile(npvs, 5), rel=1e-10)
+    assert result.cvar_1_npv == pytest.approx(npvs[:40].mean(), rel=1e-10)
+    assert result.cvar_5_npv == pytest.approx(npvs[:200].mean(), rel=1e-10)
+    assert result.prob_negative_npv == np.mean(npvs < 0)
+    assert 0.0 < result.prob_negative_npv < 1.0
+    assert result.cvar_1_npv <= result.var_1_npv <= result.var_5_npv <= result.p10_npv
+
+    bands = [result.fcf_fan_chart[b] for b in ("p5", "p10", "p25", "p50", "p75", "p90", "p95")]
+    assert np.all(np.diff(bands, axis=0) >= 0)
+    assert result.fcf_fan_chart["p50"] == result.fcf_forecast_p50
+
+def test_time_budget_bounds_latency_and_reports_paths():
+    params = ScenarioParams()
+    result = run_monte_carlo(STABLE_TECH, params, num_simulations=10**8, time_budget=0.1)
+
+    assert result.num_paths > 2000
+    assert "Time budget" in result.assumption_log[-1]
+    assert set(result.standard_errors) == {"median_npv", "p10_npv", "p90_npv"}
+
+@pytest.mark.parametrize("driver_model", ["static", "per_year"])
+def test_long_horizon_time_budget_reports_paths(driver_model):
+    """Wall time against the budget is gated by the perf suite (monte_carlo_budget_30y_*)"""
+    params = ScenarioParams(driver_model=driver_model, forecast_years=30)
+    result = run_monte_carlo(STABLE_TECH, params, num_simulations=10**6, time_budget=0.2)
+    assert 1000 < result.num_paths < 10**6
+    assert "Time budget" in result.assumption_log[-1]
+
+def test_time_budget_skips_sobol_indices():
+    result = run_monte_carlo(STABLE_TECH, ScenarioParams(), num_simulations=10**6, time_budget=0.05,
+                             sobol_samples=512)
+    assert result.sobol_indices is None
+    assert "Sobol indices skipped" in result.assumption_log[-1]
+
+def test_time_budget_respects_path_cap():
+    result = run_monte_carlo(STABLE_TECH, ScenarioParams(), num_simulations=3000, time_budget=5.0)
+    assert result.num_paths == 3000
+    with pytest.raises(ValueError, match="time_budget"):
+        run_monte_carlo(STABLE_TECH, ScenarioParams(), time_budget=0)
+
+def test_quantile_standard_errors_shrink_with_paths():
+    small = run_monte_carlo(STABLE_TECH, ScenarioParams(), num_simulations=4000)
+    large = run_monte_carlo(STABLE_TECH, ScenarioParams(), num_simulations=40000)
+    for name, se in small.standard_errors.items():
+        assert se > 0
+        assert large.standard_errors[name] / se == pytest.approx(np.sqrt(0.1), rel=0.25)
+
+@pytest.mark.parametrize("n", [1, 2, 7, 1000])
+def test_select_quantiles_matches_percentile(n):
+    values = np.random.default_rng(n).standard_normal((n, 3))
+    qs = [0.0, 0.01, 0.05, 0.5, 0.95, 1.0]
+    quantiles, partitioned = select_quantiles(values, qs, extra_kth=[n // 2])
+    assert np.array_equal(quantiles, np.percentile(values, np.array(qs) * 100, axis=0))
+    assert np.array_equal(np.sort(partitioned[:n // 2 + 1], axis=0), np.sort(values, axis=0)[:n // 2 + 1])
+
+@pytest.mark.parametrize("driver_model", ["static", "per_year"])
+def test_float32_precision_matches_float64(driver_model):
+    """Single-precision paths on the same draws agree to ~1e-6; NPVs stay float64"""
+    kwargs = dict(opex_delta_bps=50, driver_model=driver_model, tax_rate_vol=0.02, discount_rate_vol=0.01)
+    exact = run_monte_carlo(STABLE_TECH, ScenarioParams(**kwargs), num_simulations=20000)
+    lean = run_monte_carlo(STABLE_TECH, ScenarioParams(precision="float32", **kwargs), num_simulations=20000)
+    for name in ("median_npv", "p10_npv", "p90_npv", "var_1_npv", "cvar_5_npv", "median_revenue", "median_fcf"):
+        assert getattr(lean, name) == pytest.approx(getattr(exact, name), rel=1e-5)
+    assert np.allclose(lean.fcf_fan_chart["p95"], exact.fcf_fan_chart["p95"], rtol=1e-5)
+
+def test_float32_paths_are_single_precision():
+    tax_rate = STABLE_TECH.kpis.get("TaxRate", 0.25)
+    drivers = _static_drivers(ScenarioParams(), 1000)
+    exact = simulate_paths(STABLE_TECH, *drivers, tax_rate=tax_rate)
+    lean = simulate_paths(STABLE_TECH, *drivers, tax_rate=tax_rate, dtype=np.float32)
+    assert lean.fcf.dtype == lean.revenue.dtype == np.float32
+    assert np.allclose(lean.fcf, exact.fcf, rtol=1e-5)
+    npv = discount_paths(lean.fcf, 0.08, 0.02)
+    assert npv.dtype == np.float64
+    assert np.allclose(npv, discount_paths(lean.fcf.astype(np.float64), 0.08, 0.02), rtol=1e-12)
+
+def test_batch_rejects_mixed_precision():
+    with pytest.raises(ValueError, match="precision"):
+        run_monte_carlo_batch(STABLE_TECH, [ScenarioParams(), ScenarioParams(precision="float32")], 1000)
+
+def reference_npvs_horizon(base_report, params, num_simulations):
+    """Closed-form check for a custom horizon, terminal growth and base rate"""
+    paths = simulate_paths(base_report, *_static_drivers(params, num_simulations),
+                           tax_rate=base_report.kpis.get("TaxRate", 0.25), forecast_years=params.forecast_years)
+    r = params.base_discount_rate + params.discount_rate_bps / 10000.0
+    g = params.terminal_growth
+    npvs = [calculate_npv(f, r) + f[-1] * (1 + g) / (r - g) / (1 + r) ** len(f) for f in paths.fcf]
+    return np.array(npvs), paths.revenue
+
+def _static_drivers(params, num_simulations):
+    rng = np.random.default_rng(42)
+    return (rng.normal(params.revenue_growth_bps / 10000.0, 0.02, num_simulations),
+            rng.normal(params.opex_delta_bps / 10000.0, 0.01, num_simulations))
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,95 @@
+"""
+Quantile Sketch Tests
+
+Validates the KLL sketch and the streaming aggregation built on it.
+"""
+
+import numpy as np
+import pytest
+from counterfactual_oracle.src.sketches import KLLSketch
+from counterfactual_oracle.src.models import ScenarioParams
+from counterfactual_oracle.src.logic import run_monte_carlo, run_monte_carlo_streaming, StreamingAggregator
+from counterfactual_oracle.tests.test_benchmarks import STABLE_TECH
+
+def true_rank(values, estimate):
+    return np.mean(values < estimate)
+
+def test_sketch_within_rank_error():
+    """Estimated quantiles land within the advertised rank error"""
+    values = np.random.default_rng(0).lognormal(0.0, 1.0, 500000)
+    sketch = KLLSketch(k=200, seed=1)
+    for chunk in np.array_split(values, 13):
+        sketch.update(chunk)
+
+    assert sketch.count == len(values)
+    assert sketch.num_retained() < 2000
+    for q in (0.01, 0.1, 0.5, 0.9, 0.99):
+        assert abs(true_rank(values, sketch.quantile(q)) - q) <= sketch.normalized_rank_error
+
+def test_merged_sketch_covers_both_streams():
+    """Merging two sketches behaves like sketching the concatenated stream"""
+    rng = np.random.default_rng(3)
+    left, right = rng.normal(0, 1, 200000), rng.normal(5, 1, 100000)
+    a, b = KLLSketch(k=200, seed=1), KLLSketch(k=200, seed=2)
+    a.update(left)
+    b.update(right)
+    a.merge(b)
+
+    combined = np.concatenate([left, right])
+    assert a.count == len(combined)
+    assert a.min_value == combined.min() and a.max_value == combined.max()
+    for q in (0.25, 0.5, 0.75):
+        assert abs(true_rank(combined, a.quantile(q)) - q) <= a.normalized_rank_error
+
+def test_sketch_rank_and_tail_mean():
+    values = np.random.default_rng(5).normal(0.0, 1.0, 300000)
+    sketch = KLLSketch(k=200, seed=1)
+    sketch.update(values)
+
+    assert abs(sketch.rank(-1.0) - np.mean(values < -1.0)) <= sketch.normalized_rank_error
+    tail = np.sort(values)[:15000]
+    assert sketch.tail_mean(0.05) == pytest.approx(tail.mean(), rel=0.02)
+
+def test_merge_requires_same_k():
+    with pytest.raises(ValueError, match="Cannot merge"):
+        KLLSketch(k=100).merge(KLLSketch(k=200))
+
+def test_streaming_matches_exact_engine():
+    """Streaming quantiles agree with the exact engine within the reported bounds"""
+    params = ScenarioParams(revenue_growth_bps=150)
+    exact = run_monte_carlo(STABLE_TECH, params, num_simulations=200000)
+    streamed = run_monte_carlo_streaming(STABLE_TECH, params, num_simulations=200000, chunk_size=30000)
+
+    low, high = streamed.quantile_error_bounds["median_npv"]
+    assert low <= exact.median_npv <= high
+    assert streamed.median_npv == pytest.approx(exact.median_npv, rel=0.01)
+    assert streamed.p10_npv == pytest.approx(exact.p10_npv, rel=0.01)
+    assert streamed.quantile_rank_error is not None
+    low, high = streamed.quantile_error_bounds["var_5_npv"]
+    assert low <= exact.var_5_npv <= high
+    assert streamed.cvar_5_npv == pytest.approx(exact.cvar_5_npv, rel=0.02)
+    assert streamed.prob_negative_npv == exact.prob_negative_npv == 0.0
+    assert set(streamed.fcf_fan_chart) == set(exact.fcf_fan_chart)
+    assert len(streamed.fcf_forecast_p50) == 5
+    assert [r.scenario_id for r in streamed.simulation_runs] == list(range(100))
+
+def test_streaming_shards_are_reproducible():
+    """Sharded streaming is deterministic for a given (seed, num_shards)"""
+    params = ScenarioParams()
+    first = run_monte_carlo_streaming(STABLE_TECH, params, 50000, chunk_size=8000, num_shards=3, max_workers=1)
+    second = run_monte_carlo_streaming(STABLE_TECH, params, 50000, chunk_size=8000, num_shards=3, max_workers=2)
+    assert first.median_npv == second.median_npv
+    assert first.quantile_error_bounds == second.quantile_error_bounds
+
+def test_aggregator_sketches_draw_independent_coin_flips():
+    """No two sketches share a compaction stream, within an aggregator or across shards"""
+    shard_seeds = np.random.SeedSequence(42).spawn(2)
+    draws = []
+    for seed in shard_seeds:
+        aggregator = StreamingAggregator(forecast_years=3, seed=seed)
+        sketches = [aggregator.npv] + [s for m in StreamingAggregator.METRICS for s in aggregator.yearly[m]]
+        draws.extend(sketch._rng.random() for sketch in sketches)
+    assert len(set(draws)) == len(draws) == 2 * 10
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])